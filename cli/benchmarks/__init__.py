@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for Daraja CLI
+
+Run with `python -m benchmarks` from the cli/ directory.
+"""
@@ -0,0 +1,122 @@
+"""
+Benchmark runner for Daraja CLI
+
+    python -m benchmarks                  # Run everything, compare to the baseline
+    python -m benchmarks --quick -k logs  # Skip the slow cases, only matching names
+    python -m benchmarks --update-baseline
+
+A baseline is only written by --update-baseline. Runs exit with status 1
+when any case is worse than the baseline by more than --threshold, and with
+status 2 when there is no baseline to compare against.
+"""
+
+import fnmatch
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from . import cases  # noqa: F401  (registers the cases)
+from .harness import (
+    CASES, DEFAULT_THRESHOLD, BenchEnv, compare, default_baseline, load_results, run_case, save_results
+)
+
+console = Console()
+
+DEFAULT_RECORDS = 1_000_000
+
+
+def _format(value: float, unit: str) -> str:
+    if unit == 's':
+        return f"{value:.3f}s"
+    if unit == 'us':
+        return f"{value:,.1f}µs"
+    return f"{value:,.0f} {unit}"
+
+
+@click.command()
+@click.option('-k', 'pattern', help='Only run cases whose name matches this glob or substring')
+@click.option('--quick', is_flag=True, help='Skip the slow cases')
+@click.option('--repeat', type=int, help='Measured runs per case (default: per case)')
+@click.option('--warmup', type=int, help='Discarded runs before measuring (default: per case)')
+@click.option('--threshold', default=DEFAULT_THRESHOLD, show_default=True,
+              help='Fractional slowdown that counts as a regression')
+@click.option('--baseline', type=click.Path(path_type=Path), help='Baseline JSON (default: per machine)')
+@click.option('--update-baseline', is_flag=True, help='Save this run as the new baseline')
+@click.option('--output', '-o', type=click.Path(path_type=Path), help='Also write this run to a JSON file')
+@click.option('--records', default=DEFAULT_RECORDS, show_default=True, help='Records served by the mock API')
+@click.option('--list', 'list_only', is_flag=True, help='List the cases and exit')
+def main(pattern: Optional[str], quick: bool, repeat: Optional[int], warmup: Optional[int], threshold: float,
+         baseline: Optional[Path], update_baseline: bool, output: Optional[Path],
+         records: int, list_only: bool) -> None:
+    """Run the CLI benchmarks and gate on regressions against a baseline."""
+    selected = [
+        bench for bench in CASES.values()
+        if (not quick or bench.quick)
+        and (not pattern or pattern in bench.name or fnmatch.fnmatch(bench.name, pattern))
+    ]
+    if list_only:
+        for bench in CASES.values():
+            console.print(f"{bench.name:<20} [dim]{bench.description}{'' if bench.quick else ' (slow)'}[/dim]", soft_wrap=True)
+        return
+    if not selected:
+        console.print("[yellow]No benchmarks match.[/yellow]")
+        return
+
+    baseline = baseline or default_baseline()
+    previous = load_results(baseline)
+    if not previous and not update_baseline:
+        # A first run saved as the baseline would pass the gate whatever it measured
+        console.print(f"[red]❌ No baseline at {baseline}.[/red]")
+        console.print("[dim]Pass --baseline FILE, or run with --update-baseline to record one.[/dim]")
+        sys.exit(2)
+    results = {}
+    with BenchEnv(records) as env:
+        for bench in selected:
+            with console.status(f"Running {bench.name}..."):
+                results[bench.name] = run_case(bench, env, repeat, warmup)
+            result = results[bench.name]
+            console.print(f"[dim]{bench.name}: {_format(result['value'], bench.unit)} "
+                          f"(median {_format(result['median'], bench.unit)})[/dim]")
+
+    report = compare(results, previous, threshold)
+    table = Table(show_header=True, header_style="bold magenta", title=f"Benchmarks (threshold {threshold:.0%})")
+    table.add_column("Case", style="dim")
+    table.add_column("Best", justify="right")
+    table.add_column("Median", justify="right")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Status")
+    regressions = []
+    for name, result in results.items():
+        row = report[name]
+        if row['change'] is None:
+            table.add_row(name, _format(result['value'], result['unit']), _format(result['median'], result['unit']),
+                          "-", "-", "[dim]new[/dim]")
+            continue
+        better = row['change'] < 0 if not result['higher_is_better'] else row['change'] > 0
+        if row['regression']:
+            regressions.append(name)
+            status = "[red]❌ regression[/red]"
+        else:
+            status = "[green]✅ improved[/green]" if better and abs(row['change']) > threshold else "[green]✅ ok[/green]"
+        table.add_row(name, _format(result['value'], result['unit']), _format(result['median'], result['unit']),
+                      _format(row['baseline'], result['unit']), f"{row['change']:+.1%}", status)
+    console.print(table)
+
+    if output:
+        save_results(output, results, quick)
+    if update_baseline:
+        # Keep baseline entries for cases that were not run this time
+        save_results(baseline, {**previous, **results}, quick)
+        console.print(f"[dim]Baseline saved to {baseline}[/dim]")
+    if regressions and not update_baseline:
+        console.print(f"[red]❌ {len(regressions)} regression(s): {', '.join(regressions)}[/red]")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
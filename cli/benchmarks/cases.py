@@ -0,0 +1,205 @@
+"""
+Benchmark cases for the CLI hot paths
+
+Network cases run against the bundled mock API server, so results depend
+only on this machine.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from click.testing import CliRunner
+from rich.console import Console
+
+from .harness import BenchEnv, case, timer
+
+CLI = [sys.executable, '-m', 'daraja_cli.main']
+SYNC_RECORDS = 50_000
+REPLAYS = 2_000
+TAIL_POLLS = 200
+TAIL_PAGE = 100
+
+
+def _since(env: BenchEnv, records: int) -> str:
+    """Timestamp that leaves the newest `records` synthetic logs after it."""
+    dataset = env.server.dataset
+    return datetime.fromtimestamp(dataset.timestamp_of(max(0, dataset.base - records))).isoformat()
+
+
+def _ttl_days(env: BenchEnv, records: int) -> float:
+    """Cache TTL whose first sync reaches back exactly `records` logs."""
+    dataset = env.server.dataset
+    return (time.time() - dataset.timestamp_of(max(0, dataset.base - records))) / 86400
+
+
+def _cold_start(env: BenchEnv, args: List[str]) -> float:
+    child_env = dict(os.environ, HOME=str(env.home))
+    with timer() as elapsed:
+        subprocess.run(CLI + args, env=child_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return elapsed[0]
+
+
+@case('cold_start_version', unit='s')
+def cold_start_version(env: BenchEnv) -> float:
+    """Process start to exit for `daraja version`."""
+    return _cold_start(env, ['version'])
+
+
+@case('cold_start_help', unit='s')
+def cold_start_help(env: BenchEnv) -> float:
+    """Process start to exit for `daraja --help`."""
+    return _cold_start(env, ['--help'])
+
+
+def _save_bench_profile(env: BenchEnv) -> None:
+    from daraja_cli.utils.config import save_profile
+    save_profile(env.PROFILE, {'api_key': 'bench-key', 'api_url': 'http://127.0.0.1:9',
+                               'user_id': 'bench-user', 'endpoints': {'dev': 'http://127.0.0.1:9/hook'}})
+
+
+@case('load_profile_cold', unit='us')
+def load_profile_cold(env: BenchEnv) -> float:
+    """load_profile with the config file re-read and credentials looked up each time."""
+    from daraja_cli.utils import config as cfg
+    _save_bench_profile(env)
+    loops = 200
+    with timer() as elapsed:
+        for _ in range(loops):
+            cfg._store.invalidate()
+            cfg._credentials.clear()
+            cfg.load_profile(env.PROFILE)
+    return elapsed[0] / loops * 1e6
+
+
+@case('load_profile_warm', unit='us')
+def load_profile_warm(env: BenchEnv) -> float:
+    """load_profile when the parsed config and credential are memoized."""
+    from daraja_cli.utils import config as cfg
+    _save_bench_profile(env)
+    cfg.load_profile(env.PROFILE)
+    loops = 2000
+    with timer() as elapsed:
+        for _ in range(loops):
+            cfg.load_profile(env.PROFILE)
+    return elapsed[0] / loops * 1e6
+
+
+_cached_homes: Dict[int, Path] = {}
+
+
+def _cache_home(env: BenchEnv, records: int) -> Path:
+    """A HOME whose log cache holds the newest `records` logs (built once per size)."""
+    if records not in _cached_homes:
+        from daraja_cli.utils.api import DarajaAPI
+        from daraja_cli.utils.cache import LogCache
+        home = env.fresh_home(f'cache-{records}')
+        os.environ['HOME'] = str(home)
+        try:
+            with DarajaAPI(env.config()) as api, \
+                    LogCache(env.PROFILE, ttl_days=_ttl_days(env, records), max_rows=records * 2) as cache:
+                cache.sync(api)
+        finally:
+            os.environ['HOME'] = str(env.home)
+        _cached_homes[records] = home
+    return _cached_homes[records]
+
+
+def _show_logs(env: BenchEnv, records: int) -> float:
+    from daraja_cli.commands.monitor import monitor
+    home = _cache_home(env, records)
+    os.environ['HOME'] = str(home)
+    try:
+        obj = {'config': env.config(), 'api': None}
+        with timer() as elapsed:
+            result = CliRunner().invoke(monitor, ['logs', '-n', str(records), '--offline'], obj=obj)
+    finally:
+        os.environ['HOME'] = str(env.home)
+    if result.exit_code != 0 or 'Showing' not in result.output:
+        raise RuntimeError(f"monitor logs failed: {result.output[-500:]}")
+    return elapsed[0]
+
+
+@case('show_logs_10k', unit='s', repeat=5)
+def show_logs_10k(env: BenchEnv) -> float:
+    """`monitor logs -n 10000 --offline`: cache query plus table rendering."""
+    return _show_logs(env, 10_000)
+
+
+@case('show_logs_100k', unit='s', repeat=1, warmup=0, quick=False)
+def show_logs_100k(env: BenchEnv) -> float:
+    """`monitor logs -n 100000 --offline`: cache query plus table rendering."""
+    return _show_logs(env, 100_000)
+
+
+@case('tail_dedupe_poll', unit='us')
+def tail_dedupe_poll(env: BenchEnv) -> float:
+    """One follow poll of 100 logs (90 already seen) against a full seen-set."""
+    from daraja_cli.commands import monitor
+    from daraja_cli.commands.monitor import FOLLOW_SEEN_LIMIT, _emit_new_log
+    from daraja_cli.utils.mockserver import MockDataset
+    dataset = MockDataset(records=FOLLOW_SEEN_LIMIT + TAIL_POLLS * TAIL_PAGE, seed=1)
+    logs = [dataset.record(i) for i in range(dataset.base)]
+    seen: 'OrderedDict[str, None]' = OrderedDict((log['webhook_id'], None) for log in logs[:FOLLOW_SEEN_LIMIT])
+    polls = []
+    for n in range(TAIL_POLLS):
+        new = FOLLOW_SEEN_LIMIT + n * (TAIL_PAGE // 10)
+        polls.append(logs[new - TAIL_PAGE + TAIL_PAGE // 10:new + TAIL_PAGE // 10])
+    # Render the printed lines into a null file, as a real terminal would
+    # consume them, rather than into a buffer that grows with every run
+    with open(os.devnull, 'w') as sink:
+        saved, monitor.console = monitor.console, Console(file=sink, width=120)
+        try:
+            with timer() as elapsed:
+                for page in polls:
+                    for log in page:
+                        _emit_new_log(log, seen)
+        finally:
+            monitor.console = saved
+    return elapsed[0] / TAIL_POLLS * 1e6
+
+
+@case('history_sync', unit='records/s', higher_is_better=True, repeat=5)
+def history_sync(env: BenchEnv) -> float:
+    """First log cache sync of 50k records from the mock API."""
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.cache import LogCache
+    path = env.fresh_home('sync') / 'logs.db'
+    with DarajaAPI(env.config()) as api, \
+            LogCache(env.PROFILE, path=path, ttl_days=_ttl_days(env, SYNC_RECORDS)) as cache:
+        with timer() as elapsed:
+            written = cache.sync(api)
+    return written / elapsed[0]
+
+
+@case('export_jsonl', unit='records/s', higher_is_better=True, repeat=5)
+def export_jsonl(env: BenchEnv) -> float:
+    """Export 50k records from the mock API to JSONL with checkpoints."""
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.export import export_records, make_writer
+    output = env.fresh_home('export') / 'logs.jsonl'
+    with DarajaAPI(env.config()) as api:
+        pager = api.iter_webhook_logs(since=_since(env, SYNC_RECORDS), page_size=500)
+        with timer() as elapsed:
+            written = export_records(pager, make_writer('jsonl', output), {})
+    return written / elapsed[0]
+
+
+@case('bulk_replay', unit='replays/s', higher_is_better=True, repeat=5)
+def bulk_replay(env: BenchEnv) -> float:
+    """2,000 replays through the bulk engine (8 workers) against the mock API."""
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.bulk import run_bulk
+    dataset = env.server.dataset
+    ids = [dataset.webhook_id(i) for i in range(REPLAYS)]
+    with DarajaAPI(env.config(pool_size=8)) as api:
+        with timer() as elapsed:
+            summary = run_bulk(ids, api.replay_webhook, concurrency=8)
+    if summary.failed:
+        raise RuntimeError(f"{summary.failed} replays failed: {summary.errors}")
+    return summary.succeeded / elapsed[0]
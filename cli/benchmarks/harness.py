@@ -0,0 +1,203 @@
+"""
+Benchmark harness
+
+Cases register themselves with @case. Each run of a case returns one
+measurement. After `warmup` discarded runs, the best of `repeat` runs is
+compared against a JSON baseline saved by an earlier run, and anything worse
+than the threshold counts as a regression. The median is kept alongside it
+to show how noisy the case was.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_THRESHOLD = 0.15
+BASELINE_DIR = Path(__file__).parent / 'baselines'
+
+
+class Case:
+    """One benchmark: `fn(env)` returns a single measurement in `unit`."""
+
+    def __init__(self, name: str, fn: Callable[['BenchEnv'], float], unit: str,
+                 higher_is_better: bool, repeat: int, warmup: int, quick: bool, description: str):
+        self.name = name
+        self.fn = fn
+        self.unit = unit
+        self.higher_is_better = higher_is_better
+        self.repeat = repeat
+        self.warmup = warmup
+        self.quick = quick
+        self.description = description
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, unit: str, higher_is_better: bool = False, repeat: int = 9, warmup: int = 1,
+         quick: bool = True) -> Callable[[Callable[['BenchEnv'], float]], Callable[['BenchEnv'], float]]:
+    """Register a benchmark. `quick=False` leaves it out of --quick runs."""
+    def register(fn: Callable[['BenchEnv'], float]) -> Callable[['BenchEnv'], float]:
+        CASES[name] = Case(name, fn, unit, higher_is_better, repeat, warmup, quick,
+                           (fn.__doc__ or '').strip().splitlines()[0] if fn.__doc__ else '')
+        return fn
+    return register
+
+
+@contextmanager
+def timer() -> Iterator[List[float]]:
+    """Time a block; the elapsed seconds are in result[0] afterwards."""
+    result: List[float] = []
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.append(time.perf_counter() - start)
+
+
+class _MemoryKeyring:
+    """Keyring backend held in memory, so runs never touch the real one."""
+
+    def __init__(self) -> None:
+        self.passwords: Dict[Any, str] = {}
+
+    def get_password(self, service: str, name: str) -> Optional[str]:
+        return self.passwords.get((service, name))
+
+    def set_password(self, service: str, name: str, value: str) -> None:
+        self.passwords[(service, name)] = value
+
+    def delete_password(self, service: str, name: str) -> None:
+        self.passwords.pop((service, name), None)
+
+
+class BenchEnv:
+    """A throwaway HOME with a profile, plus a mock API server started on demand."""
+
+    PROFILE = 'bench'
+
+    def __init__(self, records: int) -> None:
+        self.records = records
+        self.home = Path(tempfile.mkdtemp(prefix='daraja-bench-'))
+        self._old_home = os.environ.get('HOME')
+        self._server: Any = None
+
+    def __enter__(self) -> 'BenchEnv':
+        from daraja_cli.utils import config as cfg
+        os.environ['HOME'] = str(self.home)
+        cfg._keyring, cfg._keyring_loaded = _MemoryKeyring(), True
+        cfg._credentials.clear()
+        cfg._store.invalidate()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        from daraja_cli.utils import config as cfg
+        if self._server is not None:
+            self._server.shutdown()
+        if self._old_home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = self._old_home
+        cfg._credentials.clear()
+        cfg._store.invalidate()
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    @property
+    def server(self) -> Any:
+        if self._server is None:
+            from daraja_cli.utils.mockserver import MockDataset, MockServer
+            # Fixed seed and clock offset, so every run pages the same records
+            self._server = MockServer(MockDataset(records=self.records, seed=1)).start_in_thread()
+        return self._server
+
+    def config(self, **extra: Any) -> Dict[str, Any]:
+        """A profile pointing at the mock server."""
+        config = {
+            'api_key': 'bench-key',
+            'api_url': self.server.url,
+            'user_id': self.server.user_id,
+            'profile': self.PROFILE,
+            'current_environment': 'dev',
+            'endpoints': dict(self.server.dataset.endpoints),
+        }
+        config.update(extra)
+        return config
+
+    def fresh_home(self, name: str) -> Path:
+        """An empty directory to use as HOME for one measurement."""
+        path = self.home / name
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+
+
+def machine() -> Dict[str, Any]:
+    return {
+        'node': platform.node(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def default_baseline() -> Path:
+    """Baselines are per machine and Python version; timings do not transfer."""
+    info = machine()
+    return BASELINE_DIR / f"{info['node']}-py{info['python']}.json"
+
+
+def run_case(bench: Case, env: BenchEnv, repeat: Optional[int] = None,
+             warmup: Optional[int] = None) -> Dict[str, Any]:
+    """Run a case; its value is the best sample, which is the least disturbed by noise."""
+    for _ in range(bench.warmup if warmup is None else warmup):
+        bench.fn(env)
+    samples = [bench.fn(env) for _ in range(repeat or bench.repeat)]
+    return {
+        'value': max(samples) if bench.higher_is_better else min(samples),
+        'median': statistics.median(samples),
+        'unit': bench.unit,
+        'higher_is_better': bench.higher_is_better,
+        'samples': samples,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> Dict[str, Dict[str, Any]]:
+    """Change against the baseline per case, flagging regressions beyond `threshold`."""
+    report = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get('value'):
+            report[name] = {'change': None, 'regression': False}
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        worse = -change if result['higher_is_better'] else change
+        report[name] = {'change': change, 'baseline': base['value'], 'regression': worse > threshold}
+    return report
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+
+def save_results(path: Path, results: Dict[str, Dict[str, Any]], quick: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'machine': machine(),
+            'quick': quick,
+            'results': results,
+        }, f, indent=2)
+        f.write('\n')
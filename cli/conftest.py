@@ -0,0 +1,161 @@
+"""
+Shared pytest fixtures for the CLI tests
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def _private_home(tmp_path_factory, monkeypatch):
+    """Keep every test out of the real ~/.daraja (config, log and response caches)."""
+    monkeypatch.setenv('HOME', str(tmp_path_factory.mktemp('home')))
+
+class FakeKeyring:
+    """In-memory keyring backend that counts lookups"""
+
+    def __init__(self):
+        self.passwords = {}
+        self.lookups = 0
+
+    def get_password(self, service, name):
+        self.lookups += 1
+        return self.passwords.get((service, name))
+
+    def set_password(self, service, name, value):
+        self.passwords[(service, name)] = value
+
+    def delete_password(self, service, name):
+        self.passwords.pop((service, name), None)
+
+def isolate_config(home):
+    """Point the config helpers at `home` with a fake keyring (for worker processes)"""
+    import os
+    from daraja_cli.utils import config as cfg
+
+    os.environ['HOME'] = str(home)
+    cfg._keyring, cfg._keyring_loaded = FakeKeyring(), True
+    cfg._credentials.clear()
+    cfg._store.invalidate()
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Config, keyring and caches under tmp_path; yields tmp_path as HOME."""
+    from daraja_cli.utils import config as cfg
+
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(cfg, '_keyring', FakeKeyring())
+    monkeypatch.setattr(cfg, '_keyring_loaded', True)
+    cfg._credentials.clear()
+    cfg._store.invalidate()
+    yield tmp_path
+    cfg._credentials.clear()
+    cfg._store.invalidate()
+
+@pytest.fixture
+def json_server():
+    """Start keep-alive HTTP servers answering from a {path: body or callable(handler)} map.
+
+    A callable route may return `(status, body)`. Each server records POST
+    bodies in `server.posted` and DELETE paths in `server.deleted`, and is
+    shut down when the test ends.
+    """
+    servers = []
+
+    def start(routes, delay=0.0):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                time.sleep(delay)
+                route = routes.get(self.path.split('?', 1)[0], {})
+                reply = route(self) if callable(route) else route
+                status, reply = reply if isinstance(reply, tuple) else (200, reply)
+                body = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.posted = json.loads(self.rfile.read(length) or b'null')
+                server.posted.append(self.posted)
+                self.do_GET()
+
+            def do_DELETE(self):
+                server.deleted.append(self.path)
+                self.do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.posted = []
+        server.deleted = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def mock_server():
+    """Start the bundled mock API in a thread; shut down when the test ends."""
+    from daraja_cli.utils.mockserver import MockDataset, MockServer
+
+    servers = []
+
+    def start(dataset=None, **kwargs):
+        server = MockServer(dataset or MockDataset(records=1000), **kwargs).start_in_thread()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+class FakeLogAPI:
+    """Serves `records` (oldest first) as the cursor-paged webhook logs endpoint.
+
+    With `overlap`, each page repeats the cursor entry, as some servers do.
+    `calls` records the cursor, and `windows` the `since`, passed to each
+    `iter_webhook_logs()`.
+    """
+
+    user_id = 'u1'
+
+    def __init__(self, records, overlap=False):
+        self.records = records
+        self.overlap = overlap
+        self.calls = []
+        self.windows = []
+
+    def iter_webhook_logs(self, environment=None, after=None, since=None, page_size=100):
+        from daraja_cli.utils.api import LogIterator
+        self.calls.append(after)
+        self.windows.append(since)
+        return LogIterator(self, environment, after=after, since=since, page_size=page_size)
+
+    def _make_request(self, method, endpoint):
+        query = parse_qs(urlparse(endpoint).query)
+        limit = int(query['limit'][0])
+        after = query.get('after', [None])[0]
+        start = 0
+        if after:
+            ids = [record['webhook_id'] for record in self.records]
+            start = ids.index(after) + (0 if self.overlap else 1)
+        return {'logs': self.records[start:start + limit], 'has_more': start + limit < len(self.records)}
+
+@pytest.fixture
+def fake_log_api():
+    """The FakeLogAPI class, for tests that page over in-memory records."""
+    return FakeLogAPI
@@ -8,7 +8,7 @@ from rich.table import Table
 from rich.prompt import Prompt
 from rich.panel import Panel
 
-from ..utils.config import load_config, save_config, ConfigError
+from ..utils.config import config_batch, load_config, save_config, ConfigError
 
 console = Console()
 
@@ -78,18 +78,22 @@ def set_endpoint(ctx: click.Context, environment: str, url: str) -> None:
     
     config_data['endpoints'][environment] = url
     
+    # If this is the first endpoint, make it current
+    made_current = config_data.get('current_environment') is None
+    if made_current:
+        config_data['current_environment'] = environment
+    
     try:
-        save_config(config_data)
-        console.print(f"[green]✅ Set {environment} endpoint to:[/green] {url}")
-        
-        # If this is the first endpoint, make it current
-        if config_data.get('current_environment') is None:
-            config_data['current_environment'] = environment
+        with config_batch():
             save_config(config_data)
-            console.print(f"[blue]ℹ️  Set {environment} as current environment[/blue]")
-            
     except Exception as e:
         console.print(f"[red]❌ Failed to save configuration: {e}[/red]")
+        return
+    
+    # Only report success once the batch has been flushed to disk
+    console.print(f"[green]✅ Set {environment} endpoint to:[/green] {url}")
+    if made_current:
+        console.print(f"[blue]ℹ️  Set {environment} as current environment[/blue]")
 
 @config.command('get-url')  
 @click.pass_context
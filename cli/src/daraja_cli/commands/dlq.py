@@ -0,0 +1,314 @@
+"""
+Dead-letter queue commands for Daraja CLI
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from ..utils.api import DLQ_BULK_LIMIT, DarajaAPI, APIError
+from ..utils.bulk import BulkResult, BulkSummary
+from ..utils.dlq import batched, filter_jobs, job_filter, job_summary
+from ..utils.progress import print_bulk_summary, run_bulk_with_progress
+from ..utils.times import parse_since, parse_timestamp
+
+console = Console()
+
+# Bulk retries are processed one job at a time on the server, so a couple
+# of requests in flight is enough to keep it busy
+DEFAULT_BATCH_CONCURRENCY = 2
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_LIST_LIMIT = 50
+
+
+@click.group()
+def dlq() -> None:
+    """Dead-letter queue inspection and recovery."""
+    pass
+
+
+def _filter_options(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Job filters shared by `dlq list` and `dlq retry`."""
+    options = [
+        click.option('--category', help='Only jobs whose last error has this category (filtered by the server)'),
+        click.option('--user', 'user_id', help='Only jobs for this user id (filtered by the server)'),
+        click.option('--event-type', help='Only jobs for this event type'),
+        click.option('--older-than', callback=parse_since, help='Only jobs added before a time (ISO timestamp, or 30m/12h/7d ago)'),
+        click.option('--newer-than', callback=parse_since, help='Only jobs added after a time'),
+        click.option('--grep', 'contains', help='Only jobs whose error message contains this text'),
+        click.option('--page-size', default=DEFAULT_PAGE_SIZE, show_default=True, help='Jobs fetched per API page'),
+    ]
+    for option in reversed(options):
+        fn = option(fn)
+    return fn
+
+
+class _Scan:
+    """Lazily pages DLQ jobs and applies the client-side filters, counting what it scanned."""
+
+    def __init__(self, api: DarajaAPI, category: Optional[str], user_id: Optional[str],
+                 event_type: Optional[str], older_than: Optional[str], newer_than: Optional[str],
+                 contains: Optional[str], page_size: int):
+        self.api = api
+        self.category = category
+        self.user_id = user_id
+        self.page_size = page_size
+        self.scanned = 0
+        self.predicate = job_filter(
+            event_type=event_type,
+            before=parse_timestamp(older_than) if older_than else None,
+            after=parse_timestamp(newer_than) if newer_than else None,
+            contains=contains,
+        )
+
+    def _counted(self) -> Iterator[Dict[str, Any]]:
+        for job in self.api.iter_dlq_jobs(self.page_size, self.category, self.user_id):
+            self.scanned += 1
+            yield job
+
+    def jobs(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        return filter_jobs(self._counted(), self.predicate, limit)
+
+
+def _get_api(ctx: click.Context) -> Optional[DarajaAPI]:
+    api: Optional[DarajaAPI] = ctx.obj.get('api')
+    if not api:
+        console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+    return api
+
+
+def _format_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M') if ts else '-'
+
+
+def _format_age(ms: float) -> str:
+    hours = ms / 3_600_000
+    return f"{hours / 24:.1f} days" if hours >= 48 else f"{hours:.1f} hours"
+
+
+@dlq.command()
+@click.pass_context
+def stats(ctx: click.Context) -> None:
+    """Show dead-letter queue totals by error category and user."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    try:
+        with console.status("[bold blue]Fetching DLQ stats..."):
+            data = api.get_dlq_stats()
+    except APIError as e:
+        console.print(f"[red]❌ Failed to fetch DLQ stats: {e}[/red]")
+        return
+
+    total = data.get('totalJobs', 0)
+    oldest = data.get('oldestJob')
+    oldest_str = (f"{oldest.get('id')} ({_format_age(oldest.get('age', 0))} old, "
+                  f"{oldest.get('errorCategory', 'unknown')})") if oldest else 'N/A'
+    color = "green" if not total else "yellow" if total <= 100 else "red"
+    console.print(Panel.fit(
+        f"[bold]Jobs in DLQ:[/bold] [{color}]{total:,}[/{color}]\n"
+        f"[bold]Oldest Job:[/bold] {oldest_str}",
+        title="Dead-Letter Queue"
+    ))
+
+    categories = data.get('jobsByErrorCategory', {})
+    if categories:
+        table = Table(show_header=True, header_style="bold red")
+        table.add_column("Error Category", style="dim")
+        table.add_column("Jobs", justify="right")
+        table.add_column("Percentage", justify="right")
+        for name, count in sorted(categories.items(), key=lambda kv: -kv[1]):
+            table.add_row(name, f"{count:,}", f"{count / total * 100 if total else 0:.1f}%")
+        console.print(table)
+
+    users = data.get('jobsByUser', {})
+    if len(users) > 1:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("User", style="dim")
+        table.add_column("Jobs", justify="right")
+        for name, count in sorted(users.items(), key=lambda kv: -kv[1])[:10]:
+            table.add_row(name, f"{count:,}")
+        console.print(table)
+
+
+@dlq.command('list')
+@_filter_options
+@click.option('--limit', '-n', type=int, help='Maximum jobs to show (default 50, all with --ids-only; 0 for all)')
+@click.option('--ids-only', is_flag=True, help='Print matching job ids only, one per line')
+@click.pass_context
+def list_jobs(ctx: click.Context, category: Optional[str], user_id: Optional[str], event_type: Optional[str],
+              older_than: Optional[str], newer_than: Optional[str], contains: Optional[str],
+              page_size: int, limit: Optional[int], ids_only: bool) -> None:
+    """List dead-letter jobs, newest first."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    if limit is None:
+        limit = 0 if ids_only else DEFAULT_LIST_LIMIT
+    scan = _Scan(api, category, user_id, event_type, older_than, newer_than, contains, page_size)
+    try:
+        if ids_only:
+            # Stream ids as pages arrive so the output can be piped into `dlq retry --ids-file -`
+            for job in scan.jobs(limit or None):
+                click.echo(job_summary(job)['id'])
+            return
+        with console.status("[bold blue]Fetching DLQ jobs..."):
+            jobs = [job_summary(job) for job in scan.jobs(limit or None)]
+    except APIError as e:
+        console.print(f"[red]❌ Failed to fetch DLQ jobs: {e}[/red]")
+        return
+
+    if not jobs:
+        console.print(f"[green]✅ No matching DLQ jobs ({scan.scanned:,} scanned)[/green]")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Job ID", style="dim")
+    table.add_column("Added", width=16)
+    table.add_column("Category")
+    table.add_column("Event")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Error", overflow="ellipsis", max_width=60)
+    for job in jobs:
+        table.add_row(job['id'], _format_time(job['added_at']), job['error_category'],
+                      job['event_type'], str(job['attempts']), job['error'])
+    console.print(table)
+    console.print(f"\n[dim]Showing {len(jobs):,} jobs ({scan.scanned:,} scanned)[/dim]")
+
+
+def _retry_in_batches(api: DarajaAPI, ids: List[str], batch_size: int, concurrency: int,
+                      rate: Optional[float]) -> BulkSummary:
+    """Retry jobs through the bulk endpoint; the returned summary counts jobs, not requests.
+
+    Batches are sent once. The server removes each job from the DLQ as it
+    retries it, so re-sending a batch after a timeout would report the jobs
+    it already retried as not found.
+    """
+    jobs = BulkSummary(total=len(ids))
+
+    def tally(result: BulkResult, _: BulkSummary) -> None:
+        batch: Tuple[str, ...] = result.item
+        if not result.ok:
+            for job_id in batch:
+                jobs.add(BulkResult(job_id, False, 1, result.elapsed_ms, error=result.error))
+            return
+        data = result.response or {}
+        for job_id in data.get('successful', []):
+            jobs.add(BulkResult(str(job_id), True, 1, result.elapsed_ms))
+        for failure in data.get('failed', []):
+            jobs.add(BulkResult(str(failure.get('id')), False, 1, result.elapsed_ms,
+                                error=failure.get('error') or 'Unknown error'))
+
+    batches = [tuple(batch) for batch in batched(ids, batch_size)]
+    run_bulk_with_progress(
+        batches, lambda batch: api.retry_dlq_jobs(list(batch)), "Retrying DLQ jobs",
+        total=len(ids), tally=jobs, on_result=tally,
+        concurrency=concurrency, rate=rate, retries=0,
+    )
+    return jobs
+
+
+@dlq.command()
+@click.argument('job_ids', nargs=-1)
+@click.option('--ids-file', type=click.File('r'), help="File with one job id per line ('-' for stdin)")
+@click.option('--all', 'retry_all', is_flag=True, help='Retry every job matching the filters')
+@_filter_options
+@click.option('--batch-size', default=DLQ_BULK_LIMIT, show_default=True, help=f'Jobs per bulk request (max {DLQ_BULK_LIMIT})')
+@click.option('--concurrency', '-c', default=DEFAULT_BATCH_CONCURRENCY, show_default=True, help='Bulk requests in flight')
+@click.option('--rate', type=float, help='Maximum bulk requests per second')
+@click.option('--dry-run', is_flag=True, help='Only show how many jobs would be retried')
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+@click.pass_context
+def retry(ctx: click.Context, job_ids: Tuple[str, ...], ids_file: Optional[Any], retry_all: bool,
+          category: Optional[str], user_id: Optional[str], event_type: Optional[str],
+          older_than: Optional[str], newer_than: Optional[str], contains: Optional[str], page_size: int,
+          batch_size: int, concurrency: int, rate: Optional[float],
+          dry_run: bool, yes: bool) -> None:
+    """Move dead-letter jobs back onto the retry queue.
+
+    Pass job ids, an --ids-file, or --all with optional filters.
+    """
+    api = _get_api(ctx)
+    if not api:
+        return
+    filtered = retry_all or any((category, user_id, event_type, older_than, newer_than, contains))
+    if sum([bool(job_ids), ids_file is not None, bool(filtered)]) != 1:
+        console.print("[red]❌ Use exactly one of: job ids, --ids-file, or --all/filters.[/red]")
+        return
+    if ids_file is not None and ids_file.name == '<stdin>' and not (yes or dry_run):
+        # The ids use up stdin, so there is nothing left to answer a prompt
+        console.print("[red]❌ Reading ids from stdin needs --yes (or --dry-run).[/red]")
+        return
+
+    if len(job_ids) == 1 and not dry_run:
+        try:
+            with console.status(f"[bold blue]Retrying job {job_ids[0]}..."):
+                data = api.retry_dlq_job(job_ids[0])
+            console.print(f"[green]✅ Job {job_ids[0]} queued for retry as {data.get('newJobId', '?')}[/green]")
+        except APIError as e:
+            console.print(f"[red]❌ Failed to retry job: {e}[/red]")
+        return
+
+    try:
+        if job_ids:
+            ids = list(job_ids)
+        elif ids_file is not None:
+            ids = [line.strip() for line in ids_file if line.strip() and not line.startswith('#')]
+        else:
+            # Retried jobs leave the DLQ and shift later pages, so collect ids before retrying
+            scan = _Scan(api, category, user_id, event_type, older_than, newer_than, contains, page_size)
+            with console.status("[bold blue]Collecting matching DLQ jobs...") as status:
+                ids = []
+                for job in scan.jobs():
+                    ids.append(str(job.get('id')))
+                    if len(ids) % page_size == 0:
+                        status.update(f"[bold blue]Collecting matching DLQ jobs... {len(ids):,} of {scan.scanned:,}")
+        ids = list(dict.fromkeys(ids))
+
+        if not ids:
+            console.print("[green]✅ No matching DLQ jobs to retry[/green]")
+            return
+        requests_needed = -(-len(ids) // max(1, min(batch_size, DLQ_BULK_LIMIT)))
+        if dry_run:
+            console.print(f"[blue]ℹ️  Would retry {len(ids):,} jobs in {requests_needed:,} bulk requests[/blue]")
+            return
+        if not yes and not click.confirm(f"Retry {len(ids):,} DLQ jobs ({requests_needed:,} bulk requests)?"):
+            return
+
+        summary = _retry_in_batches(api, ids, batch_size, concurrency, rate)
+        print_bulk_summary(summary, "DLQ Retry")
+    except KeyboardInterrupt:
+        console.print("\n[yellow]⏸️  Retry interrupted. Jobs already retried have left the DLQ.[/yellow]")
+    except APIError as e:
+        console.print(f"[red]❌ Failed to collect DLQ jobs: {e}[/red]")
+
+
+@dlq.command()
+@click.option('--days', '-d', type=click.IntRange(1), default=7, show_default=True, help='Delete jobs older than this many days')
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+@click.pass_context
+def purge(ctx: click.Context, days: int, yes: bool) -> None:
+    """Delete old dead-letter jobs."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    if not yes and not click.confirm(f"Permanently delete DLQ jobs older than {days} days?"):
+        return
+    try:
+        start = time.perf_counter()
+        with console.status(f"[bold blue]Deleting DLQ jobs older than {days} days..."):
+            data = api.clear_old_dlq_jobs(days)
+        elapsed = time.perf_counter() - start
+    except APIError as e:
+        console.print(f"[red]❌ Failed to purge DLQ: {e}[/red]")
+        return
+    cleared = data.get('clearedCount', 0)
+    console.print(
+        f"[green]✅ Deleted {cleared:,} DLQ jobs older than {days} days[/green] "
+        f"[dim]in {elapsed:.1f}s ({cleared / elapsed if elapsed > 0 else 0:,.0f} jobs/s)[/dim]"
+    )
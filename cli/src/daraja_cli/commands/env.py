@@ -2,13 +2,16 @@
 Environment management commands for Daraja CLI
 """
 
+import time
+from typing import Optional
+
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
 from ..utils.config import load_config, save_config, ConfigError
-from ..utils.api import DarajaAPI, APIError
+from ..utils.health import DEFAULT_PROBE_TIMEOUT, HealthCache, ProbeResult, probe_all
 
 console = Console()
 
@@ -18,8 +21,11 @@ def env() -> None:
     pass
 
 @env.command('list')
+@click.option('--no-check', is_flag=True, help='Skip endpoint health checks')
+@click.option('--refresh', is_flag=True, help='Ignore cached health results')
+@click.option('--timeout', default=DEFAULT_PROBE_TIMEOUT, show_default=True, help='Per-probe timeout in seconds')
 @click.pass_context
-def list_environments(ctx: click.Context) -> None:
+def list_environments(ctx: click.Context, no_check: bool, refresh: bool, timeout: float) -> None:
     """List all configured environments."""
     config_data = ctx.obj.get('config')
     
@@ -37,18 +43,27 @@ def list_environments(ctx: click.Context) -> None:
     
     console.print("[bold blue]🌍 Configured Environments[/bold blue]")
     
+    health = {}
+    if not no_check:
+        with console.status(f"Checking {len(endpoints)} endpoint(s)..."):
+            health = probe_all(endpoints.values(), timeout=timeout,
+                               cache=HealthCache.for_config(config_data), refresh=refresh)
+    
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("Environment", style="dim")
     table.add_column("Endpoint URL")
     table.add_column("Status", justify="center")
+    if health:
+        table.add_column("Response", justify="right")
     table.add_column("Current", justify="center")
     
     for env_name, url in endpoints.items():
-        # Status check (simplified for now), so do implement actual health check
-        status_icon = "🟢"  # TODO: Implement actual health check
         current_icon = "✅" if env_name == current_env else "⚪"
-        
-        table.add_row(env_name, url, status_icon, current_icon)
+        result = health.get(url)
+        if result is None:
+            table.add_row(env_name, url, "⚪", current_icon)
+        else:
+            table.add_row(env_name, url, result.icon, _describe_probe(result), current_icon)
     
     console.print(table)
     
@@ -87,12 +102,22 @@ def switch(ctx: click.Context, environment: str) -> None:
     except Exception as e:
         console.print(f"[red]❌ Failed to switch environment: {e}[/red]")
 
+def _describe_probe(result: ProbeResult) -> str:
+    """Short status text for a probe: HTTP code and time, or the error."""
+    if result.status_code is None:
+        return f"[red]{result.error or 'unreachable'}[/red]"
+    return f"{result.status_code} in {result.total_ms:.0f}ms"
+
+def _format_phase(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}ms"
+
 @env.command()
+@click.option('--refresh', is_flag=True, help='Ignore cached health results')
+@click.option('--timeout', default=DEFAULT_PROBE_TIMEOUT, show_default=True, help='Probe timeout in seconds')
 @click.pass_context
-def status(ctx: click.Context) -> None:
+def status(ctx: click.Context, refresh: bool, timeout: float) -> None:
     """Show current environment status."""
     config_data = ctx.obj.get('config')
-    api = ctx.obj.get('api')
     
     if not config_data:
         console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
@@ -111,24 +136,37 @@ def status(ctx: click.Context) -> None:
     
     endpoint_url = endpoints[current_env]
     
+    with console.status("Checking environment health..."):
+        result = probe_all([endpoint_url], timeout=timeout,
+                           cache=HealthCache.for_config(config_data), refresh=refresh)[endpoint_url]
+    
+    state_text = {
+        'up': "[green]Healthy[/green]",
+        'degraded': "[yellow]Degraded[/yellow]",
+        'down': "[red]Unreachable[/red]",
+    }[result.state]
+    
     console.print(Panel.fit(
         f"[bold]Current Environment Status[/bold]\n\n"
         f"[bold]Environment:[/bold] {current_env}\n"
         f"[bold]Endpoint:[/bold] {endpoint_url}\n"
-        f"[bold]Status:[/bold] [green]Active[/green]",
+        f"[bold]Status:[/bold] {result.icon} {state_text} ({_describe_probe(result)})",
         title="Environment Status"
     ))
     
-    # Try to get environment-specific stats if API is available
-    if api:
-        try:
-            with console.status("Checking environment health..."):
-                # TODO: Implement environment-specific health check
-                console.print("\n[dim]Environment health check: [green]✅ Healthy[/green][/dim]")
-        except APIError:
-            console.print("\n[dim]Environment health check: [yellow]⚠️  Unable to verify[/yellow][/dim]")
-        except Exception:
-            pass
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Phase", style="dim")
+    table.add_column("Time", justify="right")
+    table.add_row("DNS lookup", _format_phase(result.dns_ms))
+    table.add_row("TCP connect", _format_phase(result.connect_ms))
+    table.add_row("TLS handshake", _format_phase(result.tls_ms))
+    table.add_row("Time to first byte", _format_phase(result.ttfb_ms))
+    table.add_row("[bold]Total[/bold]", f"[bold]{_format_phase(result.total_ms)}[/bold]")
+    console.print(table)
+    
+    if time.time() - result.checked_at > 1:
+        console.print(f"[dim]Cached result from {int(time.time() - result.checked_at)}s ago. "
+                      f"Use --refresh to probe again.[/dim]")
 
 @env.command()
 @click.argument('environment')
@@ -0,0 +1,129 @@
+"""
+Local webhook receiver command for Daraja CLI
+"""
+
+import asyncio
+import time
+from typing import IO, Any, Dict, Optional
+from urllib.parse import urlparse
+
+import click
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from . import config as config_commands
+from ..utils.receiver import WebhookReceiver
+from ..utils.stats import summarize
+
+console = Console()
+
+DEFAULT_PORT = 8787
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '0.0.0.0', '::1')
+
+def _endpoint_port(url: Optional[str]) -> Optional[int]:
+    """Port of a configured endpoint if it points at this machine."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.hostname not in LOCAL_HOSTS:
+        return None
+    return parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Interface to bind')
+@click.option('--port', '-p', type=int, help=f'Port to bind (default: from the environment endpoint, else {DEFAULT_PORT})')
+@click.option('--environment', '-e', help='Environment whose endpoint this receiver stands in for')
+@click.option('--register', is_flag=True, help="Point the environment's endpoint at this receiver")
+@click.option('--record', type=click.File('a'), help='Append every event to a JSONL file')
+@click.option('--buffer', 'ring_size', default=10000, show_default=True, help='Events kept in memory')
+@click.option('--latency', default=0.0, show_default=True, help='Injected response delay in milliseconds')
+@click.option('--jitter', default=0.0, show_default=True, help='Random +/- variation on the delay in milliseconds')
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0.0, show_default=True, help='Fraction of callbacks to reject (0-1)')
+@click.option('--error-status', default=500, show_default=True, help='HTTP status for rejected callbacks')
+@click.option('--seed', type=int, help='Random seed for reproducible error injection')
+@click.option('--duration', '-d', type=float, help='Stop after this many seconds')
+@click.pass_context
+def listen(ctx: click.Context, host: str, port: Optional[int], environment: Optional[str], register: bool,
+           record: Optional[IO[str]], ring_size: int, latency: float, jitter: float, error_rate: float,
+           error_status: int, seed: Optional[int], duration: Optional[float]) -> None:
+    """Run a local webhook receiver that acks and records callbacks."""
+    config_data = ctx.obj.get('config')
+    endpoints = (config_data or {}).get('endpoints', {})
+    environment = environment or (config_data or {}).get('current_environment')
+
+    if port is None:
+        port = _endpoint_port(endpoints.get(environment)) if environment and not register else None
+        port = port or DEFAULT_PORT
+
+    receiver = WebhookReceiver(
+        host=host, port=port, ring_size=ring_size, record_file=record,
+        latency_ms=latency, jitter_ms=jitter, error_rate=error_rate,
+        error_status=error_status, seed=seed,
+    )
+
+    try:
+        asyncio.run(_serve(ctx, receiver, config_data, environment if register else None, duration))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        console.print(f"[red]❌ Could not listen on {host}:{port}: {e}[/red]")
+        return
+
+    _print_summary(receiver)
+
+async def _serve(ctx: click.Context, receiver: WebhookReceiver, config_data: Optional[Dict[str, Any]],
+                 register: Optional[str], duration: Optional[float]) -> None:
+    await receiver.start()
+    console.print(f"[bold blue]👂 Listening on[/bold blue] {receiver.url}")
+    if register:
+        if config_data:
+            ctx.invoke(config_commands.set_endpoint, environment=register, url=receiver.url)
+        else:
+            console.print("[yellow]⚠️  Not configured, so the endpoint was not registered.[/yellow]")
+    console.print("[dim]Press Ctrl+C to stop[/dim]\n")
+
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        with Live(_render(receiver), console=console, refresh_per_second=4, transient=False) as live:
+            while deadline is None or time.monotonic() < deadline:
+                await asyncio.sleep(0.25)
+                live.update(_render(receiver))
+    finally:
+        await receiver.stop()
+
+def _render(receiver: WebhookReceiver) -> Group:
+    """Live view: counts per event type and timing."""
+    stats = receiver.stats
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Event Type", style="dim")
+    table.add_column("Count", justify="right")
+    table.add_column("Share", justify="right")
+    for event_type, count in sorted(stats.by_type.items(), key=lambda kv: -kv[1]):
+        table.add_row(event_type, f"{count:,}", f"{count / stats.total * 100:.1f}%")
+
+    gaps = summarize(stats.interarrival_ms)
+    acks = summarize(stats.ack_us)
+    line = (
+        f"[bold]Received:[/bold] {stats.total:,}  "
+        f"[bold]Rate:[/bold] {stats.rate:,.1f}/s  "
+        f"[bold]Rejected:[/bold] {stats.injected_errors:,}\n"
+        f"[bold]Inter-arrival:[/bold] p50 {gaps['p50']:.1f}ms  p99 {gaps['p99']:.1f}ms  "
+        f"[bold]Ack:[/bold] p50 {acks['p50']:.0f}µs  p99 {acks['p99']:.0f}µs"
+    )
+    return Group(line, table)
+
+def _print_summary(receiver: WebhookReceiver) -> None:
+    """Final totals once the receiver stops."""
+    stats = receiver.stats
+    gaps = summarize(stats.interarrival_ms)
+    console.print()
+    console.print(Panel.fit(
+        f"[bold]Callbacks:[/bold] {stats.total:,} ({stats.bytes:,} bytes)\n"
+        f"[bold]Rejected:[/bold] {stats.injected_errors:,}\n"
+        f"[bold]Average Rate:[/bold] {stats.rate:,.1f}/s\n"
+        f"[bold]Inter-arrival p50/p99:[/bold] {gaps['p50']:.1f}ms / {gaps['p99']:.1f}ms\n"
+        f"[bold]Events in Buffer:[/bold] {len(receiver.events):,}",
+        title="Receiver Summary"
+    ))
@@ -0,0 +1,115 @@
+"""
+Mock API server command for Daraja CLI
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from ..utils.mockserver import (
+    DEFAULT_DAYS, DEFAULT_RECORDS, DEFAULT_USER_ID, MAX_PAGE_SIZE, MockDataset, MockServer
+)
+
+console = Console()
+
+DEFAULT_PORT = 8788
+MOCK_API_KEY = 'mock-api-key'
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Interface to bind')
+@click.option('--port', '-p', default=DEFAULT_PORT, show_default=True, help='Port to bind (0 for any free port)')
+@click.option('--records', '-n', default=DEFAULT_RECORDS, show_default=True, help='Synthetic delivery logs to serve')
+@click.option('--days', default=DEFAULT_DAYS, show_default=True, help='Days of history the records are spread over')
+@click.option('--seed', default=0, show_default=True, help='Dataset seed; the same seed always gives the same records')
+@click.option('--failure-rate', type=click.FloatRange(0, 1), default=0.05, show_default=True, help='Fraction of failed deliveries')
+@click.option('--rate', default=0.0, show_default=True, help='New deliveries arriving per second while running')
+@click.option('--page-limit', default=MAX_PAGE_SIZE, show_default=True, help='Largest page of logs served')
+@click.option('--latency', default=0.0, show_default=True, help='Injected response delay in milliseconds')
+@click.option('--jitter', default=0.0, show_default=True, help='Random +/- variation on the delay in milliseconds')
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0.0, show_default=True, help='Fraction of requests to fail (0-1)')
+@click.option('--error-status', default=500, show_default=True, help='HTTP status for failed requests')
+@click.option('--user-id', default=DEFAULT_USER_ID, show_default=True, help='User id the API answers for')
+@click.option('--save-profile', help='Save a profile pointing at this server under this name')
+@click.option('--duration', '-d', type=float, help='Stop after this many seconds')
+def mock(host: str, port: int, records: int, days: float, seed: int, failure_rate: float, rate: float,
+         page_limit: int, latency: float, jitter: float, error_rate: float, error_status: int,
+         user_id: str, save_profile: Optional[str], duration: Optional[float]) -> None:
+    """Serve a local mock of the Daraja API from synthetic data."""
+    dataset = MockDataset(records=records, days=days, seed=seed, failure_rate=failure_rate, rate=rate)
+    server = MockServer(
+        dataset, host=host, port=port, user_id=user_id, latency_ms=latency, jitter_ms=jitter,
+        error_rate=error_rate, error_status=error_status, max_page_size=page_limit, seed=seed,
+    )
+    started = time.perf_counter()
+    try:
+        asyncio.run(_serve(server, save_profile, duration))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        console.print(f"[red]❌ Could not listen on {host}:{port}: {e}[/red]")
+        return
+    _print_summary(server, time.perf_counter() - started)
+
+async def _serve(server: MockServer, save_profile: Optional[str], duration: Optional[float]) -> None:
+    await server.start()
+    dataset = server.dataset
+    console.print(Panel.fit(
+        f"[bold]URL:[/bold] {server.url}\n"
+        f"[bold]User ID:[/bold] {server.user_id}\n"
+        f"[bold]Records:[/bold] {dataset.base:,} over {dataset.span / 86400:g} days"
+        + (f", +{dataset.rate:g}/s" if dataset.rate else "") + "\n"
+        f"[bold]Latency:[/bold] {server.latency_ms:g}ms ±{server.jitter_ms:g}ms · "
+        f"[bold]Errors:[/bold] {server.error_rate:.0%} (HTTP {server.error_status})",
+        title="🧪 Mock Daraja API"
+    ))
+    if save_profile:
+        _save_profile(server, save_profile)
+    console.print("[dim]Press Ctrl+C to stop[/dim]")
+    try:
+        if duration:
+            await asyncio.sleep(duration)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def _save_profile(server: MockServer, name: str) -> None:
+    from ..utils.config import save_profile, ConfigError
+    try:
+        save_profile(name, {
+            'email': 'mock@example.com',
+            'api_key': MOCK_API_KEY,
+            'api_url': server.url,
+            'user_id': server.user_id,
+            'user_name': 'Mock User',
+            'permanent_url': f"{server.url}/webhook/{server.user_id}",
+            'current_environment': server.dataset.environments[0],
+            'endpoints': dict(server.dataset.endpoints),
+        })
+    except ConfigError as e:
+        console.print(f"[red]❌ Could not save profile: {e}[/red]")
+        return
+    console.print(f"[green]✅ Saved profile '{name}'.[/green] [dim]Run 'daraja auth use {name}' to point the CLI here.[/dim]")
+
+def _print_summary(server: MockServer, elapsed: float) -> None:
+    """Request totals once the server stops."""
+    console.print()
+    console.print(Panel.fit(
+        f"[bold]Requests:[/bold] {server.requests:,} ({server.requests / elapsed if elapsed > 0 else 0:,.1f}/s)\n"
+        f"[bold]Not Modified (304):[/bold] {server.not_modified:,}\n"
+        f"[bold]Injected Errors:[/bold] {server.injected_errors:,}\n"
+        f"[bold]Records Added:[/bold] {len(server.dataset.live):,}",
+        title="Mock API Summary"
+    ))
+    if server.by_route:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Route", style="dim")
+        table.add_column("Requests", justify="right")
+        for route, count in sorted(server.by_route.items(), key=lambda kv: -kv[1]):
+            table.add_row(route, f"{count:,}")
+        console.print(table)
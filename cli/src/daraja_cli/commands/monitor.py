@@ -3,28 +3,71 @@ Monitoring and logging commands for Daraja CLI
 """
 
 import click
-from rich.console import Console
+from click.core import ParameterSource
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.live import Live
 from rich.spinner import Spinner
+from rich.progress import (
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+import hashlib
+import json
 import time
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
 
-from ..utils.config import load_config, ConfigError
-from ..utils.api import DarajaAPI, APIError
+from ..utils.config import load_config, load_profile, list_profiles, get_config_dir, ConfigError
+from ..utils.api import DarajaAPI, APIError, StreamUnavailable, log_cursor
+from ..utils.async_api import fan_out_profiles
+from ..utils.bulk import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RETRIES,
+    Checkpoint,
+)
+from ..utils.cache import LogCache, CacheError
+from ..utils.corpus import is_corpus
+from ..utils.dashboard import DEFAULT_WINDOW, DashboardState
+from ..utils.metrics import GROUP_KEYS, LogColumns, MetricsError, aggregate
+from ..utils.records import DeliveryLog
+from ..utils.dispatch import send_corpus
+from ..utils.progress import print_bulk_summary, run_bulk_with_progress
+from ..utils.times import check_since, format_ago, parse_since, parse_timestamp, resolve_since
+from ..utils.export import (
+    FORMATS as EXPORT_FORMATS,
+    ExportError,
+    export_records,
+    load_checkpoint,
+    make_writer,
+    until_filter,
+)
 
 console = Console()
 
+# Follow mode: page size per poll and how many recent ids to remember for dedupe
+FOLLOW_PAGE_SIZE = 100
+FOLLOW_SEEN_LIMIT = 5000
+
 @click.group()
 def monitor() -> None:
     """Monitoring and logging commands."""
     pass
 
 @monitor.command()
+@click.option('--all-profiles', is_flag=True, help='Show status for every saved profile concurrently')
 @click.pass_context
-def status(ctx: click.Context) -> None:
+def status(ctx: click.Context, all_profiles: bool) -> None:
     """Show webhook status summary."""
+    if all_profiles:
+        _show_all_profiles_status()
+        return
+    
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
     
@@ -72,21 +115,182 @@ def status(ctx: click.Context) -> None:
     except Exception as e:
         console.print(f"[red]❌ Unexpected error: {e}[/red]")
 
+def _show_all_profiles_status() -> None:
+    """Fetch webhook status for every profile in parallel."""
+    try:
+        profiles = {name: load_profile(name) for name in list_profiles()}
+    except ConfigError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    
+    if not profiles:
+        console.print("[yellow]⚠️  No profiles saved yet.[/yellow]")
+        return
+    
+    with console.status(f"[bold blue]Fetching status for {len(profiles)} profiles..."):
+        results = fan_out_profiles(profiles, 'get_webhook_status')
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Profile", style="dim")
+    table.add_column("Total", justify="right")
+    table.add_column("Successful", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Success Rate", justify="right")
+    table.add_column("Avg Response", justify="right")
+    
+    for name, result in results.items():
+        if isinstance(result, APIError):
+            table.add_row(name, f"[red]❌ {result}[/red]", "-", "-", "-", "-")
+            continue
+        table.add_row(
+            name,
+            str(result.get('total_webhooks', 0)),
+            f"[green]{result.get('successful', 0)}[/green]",
+            f"[red]{result.get('failed', 0)}[/red]",
+            f"{result.get('success_rate', 0):.1f}%",
+            f"{result.get('avg_response_time', 0):.0f}ms"
+        )
+    
+    console.print(table)
+
+@monitor.command('top')
+@click.option('--environment', '-e', help='Only show one environment')
+@click.option('--interval', default=2.0, show_default=True, help='Seconds between polls for new logs')
+@click.option('--queue-interval', default=10.0, show_default=True, help='Seconds between queue stat polls')
+@click.option('--window', default=DEFAULT_WINDOW, show_default=True, help='Rolling window in seconds')
+@click.option('--fps', default=4.0, show_default=True, help='Maximum redraws per second')
+@click.option('--once', is_flag=True, help='Draw one frame and exit')
+@click.pass_context
+def top(ctx: click.Context, environment: Optional[str], interval: float, queue_interval: float,
+        window: int, fps: float, once: bool) -> None:
+    """Live dashboard of delivery rate, success and latency per environment."""
+    api = ctx.obj.get('api')
+    if not api:
+        console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+        return
+    
+    state = DashboardState(window=window)
+    since = datetime.fromtimestamp(time.time() - window, timezone.utc).isoformat(timespec='seconds')
+    pager = api.iter_webhook_logs(environment, since=since, page_size=FOLLOW_PAGE_SIZE)
+    # None once the server has shown it has no queue metrics
+    next_queue_poll: Optional[float] = 0.0
+    
+    def poll() -> None:
+        nonlocal next_queue_poll
+        try:
+            # The first drain fills the window; later ones fetch only the delta
+            state.ingest(pager.drain())
+            state.log_error = None
+        except APIError as e:
+            state.log_error = str(e)
+        if next_queue_poll is not None and time.monotonic() >= next_queue_poll:
+            try:
+                state.set_queue(api.get_queue_stats())
+                next_queue_poll = time.monotonic() + queue_interval
+            except APIError as e:
+                state.set_queue(None, str(e))
+                # Not every deployment exposes queue metrics; stop asking
+                next_queue_poll = None if e.status_code == 404 else time.monotonic() + queue_interval
+        state.updated = time.time()
+    
+    with console.status("[bold blue]Loading recent deliveries..."):
+        poll()
+    if once:
+        console.print(_render_top(state, api))
+        return
+    
+    min_frame = 1.0 / fps if fps > 0 else 0.0
+    try:
+        with Live(_render_top(state, api), console=console, auto_refresh=False) as live:
+            drawn_version = state.version
+            last_draw = time.monotonic()
+            while True:
+                time.sleep(max(interval, min_frame))
+                poll()
+                now = time.monotonic()
+                # Redraw on new data, or once per bucket so old deliveries age out
+                stale = state.version != drawn_version or now - last_draw >= state.bucket
+                if stale and now - last_draw >= min_frame:
+                    live.update(_render_top(state, api), refresh=True)
+                    drawn_version = state.version
+                    last_draw = now
+    except KeyboardInterrupt:
+        console.print("\n[yellow]📊 Dashboard stopped[/yellow]")
+        _print_session_stats(api)
+
+def _render_top(state: DashboardState, api: DarajaAPI) -> Group:
+    """One frame of the `monitor top` view."""
+    now = time.time()
+    if state.queue is not None:
+        queue = state.queue
+        counts = queue.get('counts', {})
+        paused = " [bold yellow]PAUSED[/bold yellow]" if queue.get('isPaused') else ""
+        queue_text = (
+            f"[bold]Queue:[/bold] {counts.get('waiting', 0):,} waiting · "
+            f"{counts.get('active', 0):,} active · {counts.get('delayed', 0):,} delayed · "
+            f"[red]{counts.get('failed', 0):,} failed[/red]{paused}\n"
+            f"[bold]Workers:[/bold] {queue.get('processingRate', 0):,.0f} processed/min · "
+            f"{queue.get('failureRate', 0):,.0f} failed/min · "
+            f"avg job {queue.get('averageJobDuration', 0):,.0f}ms"
+        )
+        if state.queue_error:
+            queue_text += f"\n[yellow]⚠️  Stale: {state.queue_error}[/yellow]"
+    else:
+        queue_text = f"[dim]Queue stats unavailable: {state.queue_error or 'not loaded'}[/dim]"
+    
+    window_label = f"{state.window / 60:g}m" if state.window % 60 == 0 else f"{state.window:g}s"
+    table = Table(show_header=True, header_style="bold magenta", expand=False)
+    table.add_column("Environment", style="bold")
+    table.add_column(f"Deliveries ({window_label})", justify="right")
+    table.add_column("Rate", justify="right")
+    table.add_column("Success", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p90", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("Last", justify="right", style="dim")
+    for env, rollup in state.rows(now).items():
+        summary = rollup.latency.summary(percentiles=(50, 90, 99))
+        rate = rollup.success_rate
+        color = "green" if rate >= 99 else "yellow" if rate >= 95 else "red"
+        last_seen = state.environments[env].last_seen
+        table.add_row(
+            env,
+            f"{rollup.count:,}",
+            f"{rollup.count / state.window * 60:,.1f}/min",
+            f"[{color}]{rate:.1f}%[/{color}]" if rollup.count else "-",
+            f"{summary['p50']:.0f}ms" if summary['count'] else "-",
+            f"{summary['p90']:.0f}ms" if summary['count'] else "-",
+            f"{summary['p99']:.0f}ms" if summary['count'] else "-",
+            format_ago(now - last_seen) if last_seen else "-",
+        )
+    
+    updated = datetime.fromtimestamp(state.updated or now).strftime('%H:%M:%S')
+    footer = f"[dim]Updated {updated} · {api.stats.requests} API requests · Ctrl+C to exit[/dim]"
+    if state.log_error:
+        footer = f"[red]❌ Error fetching logs: {state.log_error}[/red]\n" + footer
+    return Group(Panel.fit(queue_text, title="Daraja Top"), table, footer)
+
 @monitor.command('test')
 @click.option('--environment', '-e', required=True, help='Environment to send test webhook')
-@click.option('--payload-file', '-p', type=click.Path(exists=True), help='JSON file with payload for test')
+@click.option('--payload-file', '-p', type=click.Path(exists=True), help='JSON payload file, or a JSONL file or directory of many')
+@click.option('--concurrency', '-c', default=DEFAULT_CONCURRENCY, show_default=True, help='Corpus: parallel sends')
+@click.option('--rate', type=float, help='Corpus: maximum sends per second')
+@click.option('--results', type=click.File('w'), help='Corpus: write one JSON result per payload to this file')
 @click.pass_context
-def test_webhook(ctx: click.Context, environment: str, payload_file: str) -> None:
+def test_webhook(ctx: click.Context, environment: str, payload_file: str, concurrency: int,
+                 rate: Optional[float], results: Optional[TextIO]) -> None:
     """Send a test webhook to the specified environment."""
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
     if not config_data or not api:
         console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
         return
+    if payload_file and is_corpus(Path(payload_file)):
+        send_corpus(api, environment, Path(payload_file), concurrency=concurrency, rate=rate, results=results)
+        return
     payload = None
     if payload_file:
         try:
-            import json
             with open(payload_file, 'r') as f:
                 payload = json.load(f)
         except Exception as e:
@@ -102,38 +306,120 @@ def test_webhook(ctx: click.Context, environment: str, payload_file: str) -> Non
         console.print(f"[red]❌ Unexpected error: {e}[/red]")
 
 @monitor.command('replay')
-@click.option('--webhook-id', '-w', required=True, help='ID of the webhook to replay')
+@click.option('--webhook-id', '-w', help='ID of the webhook to replay')
+@click.option('--ids-file', type=click.File('r'), help="File with one webhook id per line ('-' for stdin)")
+@click.option('--from-history', is_flag=True, help='Replay deliveries matching the history filters below')
+@click.option('--status', '-s', 'status_filter', default='failed', show_default=True, help='History filter: delivery status')
+@click.option('--environment', '-e', help='History filter: environment')
+@click.option('--since', callback=check_since, help='History filter: since a time (ISO timestamp, or 30m/12h/7d ago)')
+@click.option('--until', callback=check_since, help='History filter: until a time')
+@click.option('--concurrency', '-c', default=DEFAULT_CONCURRENCY, show_default=True, help='Parallel replay workers')
+@click.option('--rate', type=float, help='Maximum replays per second')
+@click.option('--retries', default=DEFAULT_RETRIES, show_default=True, help='Retries per webhook on rate limits and failed connections')
+@click.option('--retry-unsafe', is_flag=True, help='Also retry timeouts and 5xx errors (may deliver a webhook twice)')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='File recording replayed ids (default: one per profile and input, removed once all succeed)')
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
 @click.pass_context
-def replay(ctx: click.Context, webhook_id: str) -> None:
-    """Replay a specific webhook delivery."""
+def replay(ctx: click.Context, webhook_id: Optional[str], ids_file: Optional[Any], from_history: bool,
+           status_filter: str, environment: Optional[str], since: Optional[str], until: Optional[str],
+           concurrency: int, rate: Optional[float], retries: int, retry_unsafe: bool, checkpoint: Optional[str],
+           yes: bool) -> None:
+    """Replay one webhook delivery, or many in bulk."""
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
     if not config_data or not api:
         console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
         return
+    
+    sources = [bool(webhook_id), ids_file is not None, from_history]
+    if sum(sources) != 1:
+        console.print("[red]❌ Use exactly one of --webhook-id, --ids-file or --from-history.[/red]")
+        return
+    
+    if webhook_id:
+        try:
+            with console.status(f"[bold blue]Replaying webhook {webhook_id}..."):
+                result = api.replay_webhook(webhook_id)
+            console.print(Panel.fit(f"✅ Replay result:\n{result}" , title="Replay Webhook"))
+        except APIError as e:
+            console.print(f"[red]❌ Failed to replay webhook: {e}[/red]")
+        except Exception as e:
+            console.print(f"[red]❌ Unexpected error: {e}[/red]")
+        return
+    
     try:
-        with console.status(f"[bold blue]Replaying webhook {webhook_id}..."):
-            result = api.replay_webhook(webhook_id)
-        console.print(Panel.fit(f"✅ Replay result:\n{result}" , title="Replay Webhook"))
+        if ids_file is not None:
+            ids = [line.strip() for line in ids_file if line.strip() and not line.startswith('#')]
+        else:
+            with console.status("[bold blue]Collecting matching deliveries..."):
+                pager = api.iter_webhook_logs(environment, since=resolve_since(since), page_size=500)
+                ids = [log_cursor(log) for log in until_filter(pager, resolve_since(until))
+                       if log.get('status') == status_filter and log_cursor(log)]
+        
+        # Keep first occurrence order while dropping duplicates
+        ids = list(dict.fromkeys(ids))
+        if ids_file is not None:
+            source = None if ids_file.name == '<stdin>' else str(Path(ids_file.name).resolve())
+        else:
+            source = json.dumps(['history', status_filter, environment, since, until])
+        done = Checkpoint(Path(checkpoint) if checkpoint else _replay_checkpoint(config_data, source))
+        todo = [i for i in ids if i not in done]
+        skipped = len(ids) - len(todo)
+        
+        if not todo:
+            console.print(f"[green]✅ Nothing to replay ({skipped:,} already replayed)[/green]")
+            return
+        if skipped:
+            console.print(f"[blue]ℹ️  Skipping {skipped:,} webhooks already replayed (checkpoint: {done.path})[/blue]")
+        if not yes and not click.confirm(f"Replay {len(todo):,} webhooks?"):
+            return
+        
+        summary = run_bulk_with_progress(
+            todo, api.replay_webhook, "Replaying webhooks",
+            concurrency=concurrency, rate=rate, retries=retries, retry_unsafe=retry_unsafe, checkpoint=done,
+        )
+        summary.skipped = skipped
+        print_bulk_summary(summary, "Replay")
+        if not checkpoint and not summary.failed and done.path is not None:
+            # Finished: a later replay of the same ids is a new request, not a resume
+            done.path.unlink(missing_ok=True)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]⏸️  Replay interrupted. Re-run the same command to continue.[/yellow]")
     except APIError as e:
-        console.print(f"[red]❌ Failed to replay webhook: {e}[/red]")
-    except Exception as e:
-        console.print(f"[red]❌ Unexpected error: {e}[/red]")
+        console.print(f"[red]❌ Failed to collect webhooks to replay: {e}[/red]")
+    except OSError as e:
+        console.print(f"[red]❌ Checkpoint error: {e}[/red]")
+
+def _replay_checkpoint(config_data: Dict[str, Any], source: Optional[str]) -> Optional[Path]:
+    """Default checkpoint for a bulk replay, keyed by profile and input; None for stdin."""
+    if source is None:
+        return None
+    profile = config_data.get('profile') or 'default'
+    digest = hashlib.sha256(f"{profile}\0{source}".encode()).hexdigest()[:16]
+    directory = get_config_dir() / 'replay'
+    directory.mkdir(exist_ok=True)
+    return directory / f"{profile}-{digest}.done"
 
 @monitor.command('history')
 @click.option('--limit', '-n', default=50, help='Number of history entries to show')
 @click.option('--environment', '-e', help='Filter by environment')
+@click.option('--status', '-s', 'status_filter', help='Filter by delivery status')
+@click.option('--since', callback=parse_since, help='Only entries since a time (ISO timestamp, or 30m/12h/7d ago)')
+@click.option('--offline', is_flag=True, help='Answer from the local log cache without syncing')
+@click.option('--no-cache', is_flag=True, help='Fetch from the API, bypassing the local log cache')
 @click.pass_context
-def history(ctx: click.Context, limit: int, environment: str) -> None:
+def history(ctx: click.Context, limit: int, environment: str, status_filter: Optional[str],
+            since: Optional[str], offline: bool, no_cache: bool) -> None:
     """Browse webhook history."""
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
-    if not config_data or not api:
+    if not config_data or (not api and not offline):
         console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
         return
     try:
         with console.status(f"[bold blue]Fetching webhook history..."):
-            logs_data = api.get_webhook_logs(limit, environment)
+            logs_data = _fetch_logs(config_data, api, limit, environment, since,
+                                    status_filter, use_cache=not no_cache, offline=offline)
         if not logs_data:
             console.print("[yellow]📝 No history entries found[/yellow]")
             return
@@ -143,44 +429,235 @@ def history(ctx: click.Context, limit: int, environment: str) -> None:
         table.add_column("Environment", width=10)
         table.add_column("Status", justify="center", width=8)
         table.add_column("Webhook ID", style="dim")
-        for log in reversed(logs_data):
-            ts = datetime.fromisoformat(log.get('timestamp', ''))
+        for record in reversed(logs_data):
             table.add_row(
-                ts.strftime('%Y-%m-%d %H:%M:%S'),
-                log.get('environment', 'N/A'),
-                log.get('status', 'unknown'),
-                log.get('webhook_id', 'N/A')
+                record.strftime('%Y-%m-%d %H:%M:%S'),
+                record.environment,
+                record.status,
+                record.webhook_id or 'N/A'
             )
         console.print(table)
         console.print(f"\n[dim]Showing {len(logs_data)} history entries[/dim]")
     except APIError as e:
         console.print(f"[red]❌ Failed to fetch history: {e}[/red]")
+    except CacheError as e:
+        console.print(f"[red]❌ {e}[/red]")
     except Exception as e:
         console.print(f"[red]❌ Unexpected error: {e}[/red]")
+
+@monitor.command('export')
+@click.option('--output', '-o', required=True, type=click.Path(dir_okay=True, writable=True), help='Output file (a directory for parquet)')
+@click.option('--format', '-f', 'fmt', type=click.Choice(EXPORT_FORMATS), help='Output format (default: from file extension, else jsonl)')
+@click.option('--environment', '-e', help='Filter by environment')
+@click.option('--since', callback=check_since, help='Export entries since a time (ISO timestamp, or 30m/12h/7d ago)')
+@click.option('--until', callback=check_since, help='Stop at entries after this time')
+@click.option('--fields', help='Comma-separated columns for csv/parquet')
+@click.option('--page-size', default=500, show_default=True, help='Records fetched per API page')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint and start over')
+@click.pass_context
+def export(ctx: click.Context, output: str, fmt: Optional[str], environment: Optional[str],
+           since: Optional[str], until: Optional[str], fields: Optional[str], page_size: int,
+           restart: bool) -> None:
+    """Export delivery history to JSONL, CSV or Parquet, resumably."""
+    config_data = ctx.obj.get('config')
+    api = ctx.obj.get('api')
+    if not config_data or not api:
+        console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+        return
+    
+    output_path = Path(output)
+    if not fmt:
+        suffix = output_path.suffix.lstrip('.').lower()
+        fmt = suffix if suffix in EXPORT_FORMATS else 'jsonl'
+    field_list = [f.strip() for f in fields.split(',')] if fields else None
+    # Stored in the checkpoint; a resume must be asked for with the same options
+    options: Dict[str, Any] = {
+        'format': fmt,
+        'environment': environment,
+        'since': since,
+        'until': until,
+        'fields': field_list,
+    }
+    
+    try:
+        state = None if restart else load_checkpoint(output_path)
+        if state and state.get('options') != options:
+            console.print("[red]❌ A checkpoint exists for different export options. Use --restart to start over.[/red]")
+            return
+        if state and state.get('complete'):
+            console.print(f"[green]✅ Export already complete ({state['count']:,} records). Use --restart to export again.[/green]")
+            return
+        if state:
+            console.print(f"[blue]ℹ️  Resuming export after {state['count']:,} records[/blue]")
+        else:
+            # Relative times are resolved once, so a resumed export keeps its window
+            state = {'options': options, 'count': 0, 'cursor': None,
+                     'since': resolve_since(since), 'until': resolve_since(until)}
+        until = state.get('until')
+        
+        writer = make_writer(fmt, output_path, field_list)
+        pager = api.iter_webhook_logs(environment, after=state['cursor'],
+                                      since=None if state['cursor'] else state.get('since'), page_size=page_size)
+        
+        start = time.perf_counter()
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            TextColumn("[bold]{task.completed:,.0f}[/bold] records"),
+            TextColumn("[dim]{task.fields[rate]}[/dim]"),
+            TimeElapsedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task(f"Exporting to {output_path.name}", total=None,
+                                     completed=state['count'], rate='')
+            base = state['count']
+            
+            def on_progress(count: int) -> None:
+                elapsed = time.perf_counter() - start
+                rate = (count - base) / elapsed if elapsed > 0 else 0
+                progress.update(task, completed=count, rate=f"{rate:,.0f} rec/s")
+            
+            written = export_records(pager, writer, state, until_filter(pager, until), on_progress)
+        
+        elapsed = time.perf_counter() - start
+        rate = written / elapsed if elapsed > 0 else 0
+        console.print(f"[green]✅ Exported {written:,} records ({state['count']:,} total) "
+                      f"in {elapsed:.1f}s · {rate:,.0f} records/s[/green]")
+        for gap in pager.gaps:
+            console.print(f"[yellow]⚠️  Gap detected ({gap['reason']}) after {gap['after']}[/yellow]")
+    except KeyboardInterrupt:
+        console.print("\n[yellow]⏸️  Export interrupted. Re-run the same command to resume.[/yellow]")
+    except ExportError as e:
+        console.print(f"[red]❌ {e}[/red]")
+    except APIError as e:
+        console.print(f"[red]❌ Export stopped: {e}. Re-run the same command to resume.[/red]")
+    except OSError as e:
+        console.print(f"[red]❌ Failed to write export: {e}[/red]")
+
+@monitor.command('cache')
+@click.option('--sync', 'do_sync', is_flag=True, help='Sync new logs into the cache now')
+@click.option('--prune', is_flag=True, help='Apply TTL and size eviction now')
+@click.option('--clear', is_flag=True, help='Delete all cached logs and API responses for this profile')
+@click.pass_context
+def cache_cmd(ctx: click.Context, do_sync: bool, prune: bool, clear: bool) -> None:
+    """Inspect and maintain the local log and response caches."""
+    from ..utils.httpcache import ResponseCache
+    config_data = ctx.obj.get('config')
+    api = ctx.obj.get('api')
+    if not config_data:
+        console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+        return
+    responses = ResponseCache.for_config(config_data)
+    try:
+        with LogCache.for_config(config_data) as cache:
+            if clear:
+                cache.clear()
+                responses.invalidate()
+                console.print("[green]✅ Log and response caches cleared[/green]")
+            if do_sync:
+                if not api:
+                    console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+                    return
+                with console.status("[bold blue]Syncing log cache..."):
+                    written = cache.sync(api)
+                console.print(f"[green]✅ Synced {written:,} log entries[/green]")
+            if prune:
+                removed = cache.evict()
+                console.print(f"[green]✅ Evicted {removed:,} log entries[/green]")
+            
+            last_sync = cache.last_sync()
+            last_sync_str = datetime.fromtimestamp(last_sync).strftime('%Y-%m-%d %H:%M:%S') if last_sync else 'Never'
+            console.print(Panel.fit(
+                f"[bold]Profile:[/bold] {cache.profile}\n"
+                f"[bold]Entries:[/bold] {cache.count():,} (max {cache.max_rows:,})\n"
+                f"[bold]Retention:[/bold] {cache.ttl_days:g} days\n"
+                f"[bold]Last Sync:[/bold] {last_sync_str}\n"
+                f"[bold]Location:[/bold] {cache.path}",
+                title="Log Cache"
+            ))
+        usage = responses.usage()
+        console.print(Panel.fit(
+            f"[bold]Entries:[/bold] {usage['entries']:,} ({usage['bytes'] / 1024:,.1f} KB, "
+            f"max {responses.max_bytes / 1024 / 1024:g} MB shared)\n"
+            f"[bold]TTLs:[/bold] {', '.join(f'{k} {v:g}s' for k, v in responses.ttls.items())}\n"
+            f"[bold]Location:[/bold] {responses.path}",
+            title="Response Cache"
+        ))
+    except APIError as e:
+        console.print(f"[red]❌ Failed to sync log cache: {e}[/red]")
+    except CacheError as e:
+        console.print(f"[red]❌ {e}[/red]")
+    finally:
+        responses.close()
+
 @monitor.command()
 @click.option('--tail', '-f', is_flag=True, help='Follow logs in real-time')
 @click.option('--limit', '-n', default=20, help='Number of log entries to show')
 @click.option('--environment', '-e', help='Filter by environment')
+@click.option('--since', callback=parse_since, help='Only entries since a time (ISO timestamp, or 30m/12h/7d ago)')
+@click.option('--no-stream', is_flag=True, help='Follow by polling instead of streaming')
+@click.option('--interval', default=2.0, show_default=True, help='Polling interval in seconds when not streaming')
+@click.option('--offline', is_flag=True, help='Answer from the local log cache without syncing')
+@click.option('--no-cache', is_flag=True, help='Fetch from the API, bypassing the local log cache')
 @click.pass_context
-def logs(ctx: click.Context, tail: bool, limit: int, environment: str) -> None:
+def logs(ctx: click.Context, tail: bool, limit: int, environment: str, since: Optional[str],
+         no_stream: bool, interval: float, offline: bool, no_cache: bool) -> None:
     """Show webhook delivery logs."""
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
     
-    if not config_data or not api:
+    if not config_data or (not api and not (offline and not tail)):
         console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
         return
     
     if tail:
-        _follow_logs(api, environment)
+        _follow_logs(api, environment, stream=not no_stream, interval=interval)
     else:
-        _show_logs(api, limit, environment)
+        _show_logs(config_data, api, limit, environment, since, use_cache=not no_cache, offline=offline)
 
-def _show_logs(api: DarajaAPI, limit: int, environment: str) -> None:
+def _fetch_logs(config_data: Dict[str, Any], api: Optional[DarajaAPI], limit: int,
+                environment: Optional[str], since: Optional[str], status: Optional[str] = None,
+                use_cache: bool = True, offline: bool = False) -> List[DeliveryLog]:
+    """Fetch the latest `limit` logs (newest first) as compact records.
+    
+    By default the local log cache is synced with the new delta and queried.
+    If the cache is unavailable, logs come straight from the API.
+    """
+    if use_cache or offline:
+        try:
+            with LogCache.for_config(config_data) as cache:
+                if not offline and api is not None:
+                    try:
+                        cache.sync(api)
+                    except APIError as e:
+                        if not cache.count():
+                            raise
+                        console.print(f"[yellow]⚠️  Sync failed ({e}), showing cached logs[/yellow]")
+                return cache.query_records(limit, environment, status, since)
+        except CacheError as e:
+            if offline:
+                raise
+            console.print(f"[yellow]⚠️  {e}, fetching from the API[/yellow]")
+    
+    if api is None:
+        raise CacheError("Not configured for the API and no log cache to read. Run 'daraja login' first.")
+    entries = api.get_webhook_logs(limit, environment, since=since)
+    if since:
+        # Servers that ignore `since` return the newest page regardless
+        cutoff = parse_timestamp(since)
+        entries = [entry for entry in entries if parse_timestamp(entry.get('timestamp')) >= cutoff]
+    records = DeliveryLog.from_dicts(entries)
+    if status:
+        records = [record for record in records if record.status == status]
+    return records
+
+def _show_logs(config_data: Dict[str, Any], api: Optional[DarajaAPI], limit: int, environment: str,
+               since: Optional[str] = None, use_cache: bool = True, offline: bool = False) -> None:
     """Show recent logs."""
     try:
         with console.status("[bold blue]Fetching logs..."):
-            logs_data = api.get_webhook_logs(limit, environment)
+            logs_data = _fetch_logs(config_data, api, limit, environment, since,
+                                    use_cache=use_cache, offline=offline)
         
         if not logs_data:
             console.print("[yellow]📝 No logs found[/yellow]")
@@ -195,11 +672,8 @@ def _show_logs(api: DarajaAPI, limit: int, environment: str) -> None:
         table.add_column("Duration", justify="right", width=10)
         table.add_column("Webhook ID", style="dim")
         
-        for log in logs_data:
-            timestamp = datetime.fromisoformat(log.get('timestamp', ''))
-            time_str = timestamp.strftime('%H:%M:%S %d/%m')
-            
-            status = log.get('status', 'unknown')
+        for record in logs_data:
+            status = record.status
             if status == 'delivered':
                 status_icon = "✅"
                 status_color = "green"
@@ -213,17 +687,13 @@ def _show_logs(api: DarajaAPI, limit: int, environment: str) -> None:
                 status_icon = "❓"
                 status_color = "dim"
             
-            response_code = log.get('response_code', '-')
-            duration = f"{log.get('duration_ms', 0)}ms"
-            webhook_id = log.get('webhook_id', 'N/A')[:12] + '...'
-            
             table.add_row(
-                time_str,
-                log.get('environment', 'N/A'),
+                record.strftime('%H:%M:%S %d/%m'),
+                record.environment,
                 f"[{status_color}]{status_icon}[/{status_color}]",
-                str(response_code),
-                duration,
-                webhook_id
+                str(record.response_code) if record.response_code is not None else '-',
+                f"{record.duration_ms or 0}ms",
+                (record.webhook_id or 'N/A')[:12] + '...'
             )
         
         console.print(table)
@@ -231,77 +701,145 @@ def _show_logs(api: DarajaAPI, limit: int, environment: str) -> None:
         
     except APIError as e:
         console.print(f"[red]❌ Failed to fetch logs: {e}[/red]")
+    except CacheError as e:
+        console.print(f"[red]❌ {e}[/red]")
     except Exception as e:
         console.print(f"[red]❌ Unexpected error: {e}[/red]")
 
-def _follow_logs(api: DarajaAPI, environment: str) -> None:
-    """Follow logs in real-time."""
+def _follow_logs(api: DarajaAPI, environment: str, stream: bool = True, interval: float = 2.0) -> None:
+    """Follow logs in real-time.
+    
+    Consumes the server-sent events stream when available and falls back to
+    cursor-based polling, resuming from the last webhook id seen.
+    """
     console.print("[bold blue]📝 Following logs... (Press Ctrl+C to stop)[/bold blue]")
     
+    seen: 'OrderedDict[str, None]' = OrderedDict()
+    cursor = None
+    
     try:
-        last_timestamp = datetime.now()
-        
-        while True:
+        if stream:
             try:
-                # Fetch recent logs since last check
-                logs_data = api.get_webhook_logs(10, environment)
-                
-                # Filter for new logs
-                new_logs = []
-                for log in logs_data:
-                    log_time = datetime.fromisoformat(log.get('timestamp', ''))
-                    if log_time > last_timestamp:
-                        new_logs.append(log)
-                        last_timestamp = log_time
-                
-                # Display new logs
-                for log in reversed(new_logs):  # Show in chronological order
-                    timestamp = datetime.fromisoformat(log.get('timestamp', ''))
-                    time_str = timestamp.strftime('%H:%M:%S')
-                    
-                    status = log.get('status', 'unknown')
-                    if status == 'delivered':
-                        status_icon = "✅"
-                        status_color = "green"
-                    elif status == 'failed':
-                        status_icon = "❌"
-                        status_color = "red"
-                    else:
-                        status_icon = "⏳"
-                        status_color = "yellow"
-                    
-                    env = log.get('environment', 'N/A')
-                    response_code = log.get('response_code', '-')
-                    duration = log.get('duration_ms', 0)
-                    
-                    console.print(
-                        f"[dim]{time_str}[/dim] "
-                        f"[bold]{env}[/bold] "
-                        f"[{status_color}]{status_icon}[/{status_color}] "
-                        f"HTTP {response_code} "
-                        f"[dim]({duration}ms)[/dim]"
-                    )
-                
-                time.sleep(2)  # Poll every 2 seconds
-                
-            except KeyboardInterrupt:
-                console.print("\n[yellow]📝 Stopped following logs[/yellow]")
-                break
+                for log in api.stream_webhook_logs(environment):
+                    cursor = _emit_new_log(log, seen) or cursor
+            except StreamUnavailable:
+                console.print("[dim]Log streaming not available, polling for new entries[/dim]")
             except APIError as e:
-                console.print(f"[red]❌ Error fetching logs: {e}[/red]")
-                time.sleep(5)  # Wait longer on error
-            except Exception as e:
-                console.print(f"[red]❌ Unexpected error: {e}[/red]")
-                time.sleep(5)
-                
+                console.print(f"[yellow]⚠️  Log stream lost ({e}), polling for new entries[/yellow]")
+        
+        _poll_logs(api, environment, seen, cursor, interval)
     except KeyboardInterrupt:
         console.print("\n[yellow]📝 Stopped following logs[/yellow]")
+        _print_session_stats(api)
+
+def _poll_logs(api: DarajaAPI, environment: str, seen: 'OrderedDict[str, None]',
+               cursor: Optional[str], interval: float) -> None:
+    """Poll for logs newer than the cursor, fetching only the new delta."""
+    pager = None
+    reported_gaps = 0
+    while True:
+        try:
+            if pager is None:
+                started = api.iter_webhook_logs(environment, after=cursor, page_size=FOLLOW_PAGE_SIZE)
+                if cursor is None:
+                    # Start from the newest existing entry so only new deliveries print
+                    started.start_at_latest()
+                pager = started
+            
+            # drain() pages through bursts until caught up
+            for log in pager.drain():
+                _emit_new_log(log, seen)
+            
+            for gap in pager.gaps[reported_gaps:]:
+                missing = f"{gap['missing']} entries" if gap['missing'] else "some entries"
+                console.print(f"[yellow]⚠️  Gap detected ({gap['reason']}): {missing} may be missing[/yellow]")
+            reported_gaps = len(pager.gaps)
+            
+            time.sleep(interval)
+        except APIError as e:
+            console.print(f"[red]❌ Error fetching logs: {e}[/red]")
+            if e.status_code in (401, 403):
+                return  # Retrying will not fix credentials
+            time.sleep(5)  # Wait longer on error
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            console.print(f"[red]❌ Unexpected error: {e}[/red]")
+            time.sleep(5)
+
+def _emit_new_log(log: Dict[str, Any], seen: 'OrderedDict[str, None]') -> Optional[str]:
+    """Print a log line unless already shown; returns its cursor if new."""
+    log_id = log_cursor(log)
+    if log_id is not None:
+        if log_id in seen:
+            return None
+        seen[log_id] = None
+        if len(seen) > FOLLOW_SEEN_LIMIT:
+            seen.popitem(last=False)
+    
+    # Parsed only for entries that are actually printed
+    record = DeliveryLog.from_dict(log)
+    status = record.status
+    if status == 'delivered':
+        status_icon = "✅"
+        status_color = "green"
+    elif status == 'failed':
+        status_icon = "❌"
+        status_color = "red"
+    else:
+        status_icon = "⏳"
+        status_color = "yellow"
+    
+    console.print(
+        f"[dim]{record.strftime('%H:%M:%S', '--:--:--')}[/dim] "
+        f"[bold]{record.environment}[/bold] "
+        f"[{status_color}]{status_icon}[/{status_color}] "
+        f"HTTP {record.response_code if record.response_code is not None else '-'} "
+        f"[dim]({record.duration_ms or 0}ms)[/dim]"
+    )
+    return log_id
+
+def _print_session_stats(api: DarajaAPI) -> None:
+    """Print connection reuse and timing stats for a long-running session."""
+    stats = api.get_stats()
+    if not stats['requests']:
+        return
+    console.print(
+        f"[dim]{stats['requests']} requests over {stats['connections_opened']} connection(s) "
+        f"({stats['connections_reused']} reused) · "
+        f"first {stats['first_ms']:.0f}ms, warm avg {stats['warm_avg_ms']:.0f}ms, "
+        f"max {stats['max_ms']:.0f}ms[/dim]"
+    )
+
+def _parse_group_by(ctx: click.Context, param: click.Parameter, value: str) -> List[str]:
+    """Click callback for a comma-separated list of GROUP_KEYS."""
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in GROUP_KEYS]
+    if unknown:
+        raise click.BadParameter(f"Unknown key(s) {', '.join(unknown)}. Choose from {', '.join(GROUP_KEYS)}.")
+    return keys
 
 @monitor.command()
-@click.option('--days', '-d', default=7, help='Number of days to show metrics for')
+@click.option('--days', '-d', default=7, help='Number of days to show metrics for (with --input: only if given)')
+@click.option('--local', is_flag=True, help='Aggregate cached or exported logs on this machine')
+@click.option('--input', '-i', 'input_path', type=click.Path(exists=True), help='Local: read a jsonl/csv/parquet export instead of the log cache')
+@click.option('--by', 'group_by', default='day', show_default=True, callback=_parse_group_by,
+              help=f"Local: comma-separated grouping ({', '.join(GROUP_KEYS)})")
+@click.option('--since', callback=parse_since, help='Local: window start (default: --days ago)')
+@click.option('--until', callback=parse_since, help='Local: window end')
+@click.option('--environment', '-e', help='Local: filter by environment')
+@click.option('--status', '-s', 'status_filter', help='Local: filter by delivery status')
+@click.option('--offline', is_flag=True, help='Local: use the log cache without syncing it first')
 @click.pass_context
-def metrics(ctx: click.Context, days: int) -> None:
+def metrics(ctx: click.Context, days: int, local: bool, input_path: Optional[str], group_by: List[str],
+            since: Optional[str], until: Optional[str], environment: Optional[str],
+            status_filter: Optional[str], offline: bool) -> None:
     """Show detailed webhook metrics."""
+    if local or input_path:
+        _show_local_metrics(ctx, days, input_path, group_by, since, until, environment,
+                            status_filter, offline)
+        return
+    
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
     
@@ -371,3 +909,81 @@ def metrics(ctx: click.Context, days: int) -> None:
         console.print(f"[red]❌ Failed to fetch metrics: {e}[/red]")
     except Exception as e:
         console.print(f"[red]❌ Unexpected error: {e}[/red]")
+
+def _show_local_metrics(ctx: click.Context, days: int, input_path: Optional[str], group_by: List[str],
+                        since: Optional[str], until: Optional[str], environment: Optional[str],
+                        status_filter: Optional[str], offline: bool) -> None:
+    """Aggregate delivery logs locally and print the rollup."""
+    window_start: Optional[float] = None
+    if since:
+        window_start = parse_timestamp(since)
+    elif not input_path or ctx.get_parameter_source('days') is not ParameterSource.DEFAULT:
+        # An export is a window already chosen; only narrow it when asked to
+        window_start = time.time() - days * 86400
+    window_end = parse_timestamp(until) if until else None
+    try:
+        if input_path:
+            with console.status(f"[bold blue]Loading {input_path}..."):
+                columns = LogColumns.from_export(Path(input_path))
+        else:
+            config_data = ctx.obj.get('config')
+            api = None if offline else ctx.obj.get('api')
+            if not config_data or (not api and not offline):
+                console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+                return
+            with LogCache.for_config(config_data) as cache:
+                if api is not None:
+                    with console.status("[bold blue]Syncing log cache..."):
+                        try:
+                            cache.sync(api)
+                        except APIError as e:
+                            console.print(f"[yellow]⚠️  Sync failed ({e}), using cached logs[/yellow]")
+                with console.status("[bold blue]Loading cached logs..."):
+                    columns = LogColumns.from_cache(cache, window_start, window_end)
+        result = aggregate(columns, group_by, window_start, window_end, environment, status_filter)
+    except (CacheError, MetricsError) as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    
+    total = result.total
+    if not total.count:
+        console.print("[yellow]📝 No deliveries in this window[/yellow]")
+        return
+    
+    latency = total.latency.summary(percentiles=(50, 90, 99))
+    start_str = datetime.fromtimestamp(window_start).strftime('%Y-%m-%d %H:%M') if window_start else 'first record'
+    end_str = datetime.fromtimestamp(window_end).strftime('%Y-%m-%d %H:%M') if window_end else 'now'
+    console.print(Panel.fit(
+        f"[bold]Window:[/bold] {start_str} → {end_str}\n\n"
+        f"[bold]Total Webhooks:[/bold] {total.count:,}\n"
+        f"[bold]Successful:[/bold] [green]{total.delivered:,}[/green]\n"
+        f"[bold]Failed:[/bold] [red]{total.failed:,}[/red]\n"
+        f"[bold]Success Rate:[/bold] {total.success_rate:.2f}%\n\n"
+        f"[bold]Response Time:[/bold] p50 {latency['p50']:.0f}ms · p90 {latency['p90']:.0f}ms · "
+        f"p99 {latency['p99']:.0f}ms · max {latency['max']:.0f}ms\n\n"
+        f"[dim]{result.rows:,} of {len(columns):,} records aggregated in "
+        f"{result.elapsed * 1000:.0f}ms ({result.engine})[/dim]",
+        title="Local Metrics"
+    ))
+    
+    if not group_by:
+        return
+    table = Table(show_header=True, header_style="bold magenta")
+    for name in group_by:
+        table.add_column(name.title(), style="dim")
+    table.add_column("Webhooks", justify="right")
+    table.add_column("Success Rate", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p90", justify="right")
+    table.add_column("p99", justify="right")
+    for key, rollup in result.sorted():
+        summary = rollup.latency.summary(percentiles=(50, 90, 99))
+        table.add_row(
+            *key,
+            f"{rollup.count:,}",
+            f"{rollup.success_rate:.1f}%",
+            f"{summary['p50']:.0f}ms" if summary['count'] else '-',
+            f"{summary['p90']:.0f}ms" if summary['count'] else '-',
+            f"{summary['p99']:.0f}ms" if summary['count'] else '-',
+        )
+    console.print(table)
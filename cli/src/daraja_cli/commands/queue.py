@@ -0,0 +1,319 @@
+"""
+Delivery queue commands for Daraja CLI
+"""
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+import click
+from rich.console import Console, Group, RenderableType
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from ..utils.api import DarajaAPI, APIError, StreamUnavailable
+from ..utils.charts import sparkline
+from ..utils.times import format_ago, parse_timestamp
+
+console = Console()
+
+DEFAULT_HISTORY = 60
+DEFAULT_CHART_WIDTH = 40
+
+# Chart rows: label and the path to the value in a queue metrics snapshot
+SERIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('Waiting', ('queue', 'counts', 'waiting')),
+    ('Active', ('queue', 'counts', 'active')),
+    ('Delayed', ('queue', 'counts', 'delayed')),
+    ('Failed', ('queue', 'counts', 'failed')),
+    ('Processed/min', ('performance', 'throughput', 'processedPerMinute')),
+    ('Failed/min', ('performance', 'throughput', 'failedPerMinute')),
+    ('Avg job (ms)', ('performance', 'averageProcessingTime')),
+)
+
+WORKER_STATUS_STYLES = {'active': 'green', 'idle': 'dim', 'stalled': 'red'}
+
+@click.group()
+def queue() -> None:
+    """Delivery queue inspection and control."""
+    pass
+
+def _get_api(ctx: click.Context) -> Optional[DarajaAPI]:
+    api: Optional[DarajaAPI] = ctx.obj.get('api')
+    if not api:
+        console.print("[red]❌ Not configured. Run 'daraja login' first.[/red]")
+    return api
+
+def _value(snapshot: Dict[str, Any], path: Sequence[str]) -> float:
+    node: Any = snapshot
+    for key in path:
+        node = node.get(key) if isinstance(node, dict) else None
+    return float(node) if isinstance(node, (int, float)) else 0.0
+
+def _snapshot(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """History entries wrap the metrics as {timestamp, data}; streamed ones do not."""
+    data = entry.get('data')
+    if not isinstance(data, dict):
+        return entry
+    return data if 'timestamp' in data else dict(data, timestamp=entry.get('timestamp'))
+
+def _render_stats(stats: Dict[str, Any]) -> Panel:
+    counts = stats.get('counts', {})
+    state = "[bold yellow]PAUSED[/bold yellow]" if stats.get('isPaused') else "[green]running[/green]"
+    text = (
+        f"[bold]Status:[/bold] {state}\n"
+        f"[bold]Jobs:[/bold] {counts.get('waiting', 0):,} waiting · {counts.get('active', 0):,} active · "
+        f"{counts.get('delayed', 0):,} delayed · {counts.get('completed', 0):,} completed · "
+        f"[red]{counts.get('failed', 0):,} failed[/red]\n"
+        f"[bold]Throughput:[/bold] {stats.get('processingRate', 0):,.0f} processed/min · "
+        f"{stats.get('failureRate', 0):,.0f} failed/min · avg job {stats.get('averageJobDuration', 0):,.0f}ms"
+    )
+    oldest = stats.get('oldestJob')
+    if oldest:
+        waited = time.time() - parse_timestamp(oldest.get('timestamp'))
+        text += f"\n[bold]Oldest waiting:[/bold] {oldest.get('id')} (queued {format_ago(waited)})"
+    failures = stats.get('recentFailures') or []
+    if failures:
+        text += "\n\n[bold]Recent failures:[/bold]"
+        for failure in failures[:5]:
+            text += (f"\n  [dim]{failure.get('jobId')}[/dim] after {failure.get('attempts', 0)} attempts: "
+                     f"{str(failure.get('error', ''))[:80]}")
+    return Panel.fit(text, title="Delivery Queue")
+
+def _render_workers(data: Dict[str, Any], rates: Optional[Dict[str, float]] = None) -> RenderableType:
+    workers = data.get('workers', [])
+    summary = data.get('summary', {})
+    caption = (f"{summary.get('total', len(workers))} workers: {summary.get('active', 0)} active, "
+               f"{summary.get('idle', 0)} idle, {summary.get('stalled', 0)} stalled")
+    if not workers:
+        return Panel.fit(f"[dim]No workers are processing jobs right now ({caption})[/dim]", title="Workers")
+
+    now = time.time()
+    table = Table(show_header=True, header_style="bold magenta", caption=caption)
+    table.add_column("Worker", style="dim")
+    table.add_column("Status")
+    table.add_column("Current Job")
+    table.add_column("Progress", justify="right")
+    table.add_column("Running", justify="right")
+    table.add_column("Processed", justify="right")
+    table.add_column("Failed", justify="right")
+    if rates is not None:
+        table.add_column("Jobs/min", justify="right")
+    table.add_column("Last Activity", justify="right")
+    for worker in workers:
+        status = worker.get('status', 'unknown')
+        style = WORKER_STATUS_STYLES.get(status, 'yellow')
+        job = worker.get('currentJob') or {}
+        started = parse_timestamp(job.get('startedAt')) if job else 0
+        progress = job.get('progress', 0)
+        row = [
+            str(worker.get('workerId')),
+            f"[{style}]{status}[/{style}]",
+            f"{job.get('id', '-')} [dim]{job.get('name', '')}[/dim]" if job else "-",
+            f"{progress}%" if isinstance(progress, (int, float)) and job else "-",
+            f"{now - started:,.1f}s" if started else "-",
+            f"{worker.get('processedJobs', 0):,}",
+            f"{worker.get('failedJobs', 0):,}",
+        ]
+        if rates is not None:
+            rate = rates.get(str(worker.get('workerId')))
+            row.append(f"{rate:,.1f}" if rate is not None else "-")
+        last = parse_timestamp(worker.get('lastActivity'))
+        row.append(format_ago(max(0.0, now - last)) if last else "-")
+        table.add_row(*row)
+    return table
+
+def _render_history(entries: Iterable[Dict[str, Any]], width: int) -> RenderableType:
+    snapshots = [_snapshot(entry) for entry in entries]
+    if not snapshots:
+        return Panel.fit("[dim]No queue history yet. The service records a sample each time queue metrics are read.[/dim]",
+                         title="Queue History")
+
+    first = parse_timestamp(snapshots[0].get('timestamp'))
+    last = parse_timestamp(snapshots[-1].get('timestamp'))
+    span = f" over {(last - first) / 60:,.1f} min" if first and last > first else ""
+    table = Table(show_header=True, header_style="bold magenta",
+                  caption=f"{len(snapshots)} samples{span}")
+    table.add_column("Metric", style="dim")
+    table.add_column("History", no_wrap=True)
+    table.add_column("Min", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Now", justify="right")
+    for label, path in SERIES:
+        values = [_value(snapshot, path) for snapshot in snapshots]
+        table.add_row(label, f"[cyan]{sparkline(values, width)}[/cyan]",
+                      f"{min(values):,.0f}", f"{max(values):,.0f}", f"[bold]{values[-1]:,.0f}[/bold]")
+    return table
+
+def _worker_rates(before: Dict[str, Any], after: Dict[str, Any], seconds: float) -> Dict[str, float]:
+    """Jobs per minute for each worker seen in both samples."""
+    processed = {str(w.get('workerId')): w.get('processedJobs', 0) + w.get('failedJobs', 0)
+                 for w in before.get('workers', [])}
+    rates = {}
+    for worker in after.get('workers', []):
+        worker_id = str(worker.get('workerId'))
+        if worker_id in processed:
+            done = worker.get('processedJobs', 0) + worker.get('failedJobs', 0) - processed[worker_id]
+            rates[worker_id] = max(0, done) / seconds * 60
+    return rates
+
+@queue.command()
+@click.option('--limit', '-n', default=DEFAULT_HISTORY, show_default=True, help='History samples to chart')
+@click.option('--width', default=DEFAULT_CHART_WIDTH, show_default=True, help='Chart width in characters')
+@click.pass_context
+def status(ctx: click.Context, limit: int, width: int) -> None:
+    """Show queue stats, workers and depth history, fetched concurrently."""
+    api = _get_api(ctx)
+    if not api:
+        return
+
+    sections: Dict[str, Tuple[str, Callable[[], Any], Callable[[Any], RenderableType]]] = {
+        'stats': ("queue stats", api.get_queue_stats, _render_stats),
+        'workers': ("workers", api.get_queue_workers, _render_workers),
+        'history': ("history", lambda: api.get_queue_history(limit), lambda h: _render_history(h, width)),
+    }
+    views: Dict[str, RenderableType] = {
+        name: f"[dim]⏳ Loading {label}...[/dim]" for name, (label, _, _) in sections.items()
+    }
+
+    def frame() -> Group:
+        return Group(*views.values())
+
+    # Each section is drawn as soon as its request returns
+    with Live(frame(), console=console, auto_refresh=False) as live:
+        with ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix='daraja-queue') as pool:
+            futures = {pool.submit(fetch): name for name, (_, fetch, _) in sections.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                label, _, render = sections[name]
+                try:
+                    views[name] = render(future.result())
+                except APIError as e:
+                    views[name] = f"[red]❌ Failed to fetch {label}: {e}[/red]"
+                live.update(frame(), refresh=True)
+
+@queue.command()
+@click.option('--sample', type=float, default=0, help='Seconds between two samples, to show jobs/min per worker')
+@click.pass_context
+def workers(ctx: click.Context, sample: float) -> None:
+    """Show workers, their active jobs and throughput."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    try:
+        with console.status("[bold blue]Fetching workers..."):
+            data = api.get_queue_workers()
+        rates = None
+        if sample > 0:
+            with console.status(f"[bold blue]Sampling throughput for {sample:g}s..."):
+                start = time.perf_counter()
+                time.sleep(sample)
+                later = api.get_queue_workers()
+                rates = _worker_rates(data, later, time.perf_counter() - start)
+            data = later
+    except APIError as e:
+        console.print(f"[red]❌ Failed to fetch workers: {e}[/red]")
+        return
+    console.print(_render_workers(data, rates))
+
+@queue.command()
+@click.option('--limit', '-n', default=DEFAULT_HISTORY, show_default=True, help='History samples to chart')
+@click.option('--width', default=DEFAULT_CHART_WIDTH * 2, show_default=True, help='Chart width in characters')
+@click.pass_context
+def history(ctx: click.Context, limit: int, width: int) -> None:
+    """Chart queue depth and throughput history."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    try:
+        with console.status("[bold blue]Fetching queue history..."):
+            entries = api.get_queue_history(limit)
+    except APIError as e:
+        console.print(f"[red]❌ Failed to fetch queue history: {e}[/red]")
+        return
+    console.print(_render_history(entries, width))
+
+@queue.command()
+@click.option('--width', default=DEFAULT_CHART_WIDTH * 2, show_default=True, help='Chart width in characters')
+@click.pass_context
+def watch(ctx: click.Context, width: int) -> None:
+    """Chart queue metrics live from the real-time stream (Ctrl+C to exit)."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    samples: Deque[Dict[str, Any]] = deque(maxlen=max(width, 1))
+    try:
+        samples.extend(_snapshot(entry) for entry in api.get_queue_history(width))
+    except APIError:
+        pass  # history only seeds the chart; the stream fills it in
+
+    def frame() -> Group:
+        latest = samples[-1] if samples else {}
+        state = latest.get('queue', {})
+        paused = " [bold yellow]PAUSED[/bold yellow]" if state.get('isPaused') else ""
+        return Group(
+            Panel.fit(f"[bold]Queue:[/bold] {state.get('name', '-')}{paused}  "
+                      f"[dim]{len(samples)} samples · updates every few seconds[/dim]",
+                      title="Queue Watch"),
+            _render_history(samples, width),
+        )
+
+    try:
+        with Live(frame(), console=console, auto_refresh=False) as live:
+            for snapshot in api.stream_queue_metrics():
+                samples.append(snapshot)
+                live.update(frame(), refresh=True)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]📊 Watch stopped[/yellow]")
+    except StreamUnavailable:
+        console.print("[yellow]⚠️  Real-time metrics are not available. Use 'daraja queue history' instead.[/yellow]")
+    except APIError as e:
+        console.print(f"[red]❌ Queue metrics stream failed: {e}[/red]")
+
+@queue.command()
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+@click.pass_context
+def pause(ctx: click.Context, yes: bool) -> None:
+    """Stop workers from picking up new deliveries."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    if not yes and not click.confirm("Pause webhook delivery? Jobs will wait in the queue until 'daraja queue resume'."):
+        return
+    try:
+        api.pause_queue()
+    except APIError as e:
+        console.print(f"[red]❌ Failed to pause queue: {e}[/red]")
+        return
+    console.print("[yellow]⏸️  Queue paused[/yellow]")
+    counts = _queue_counts(api)
+    if counts is not None:
+        console.print(f"[dim]{counts.get('waiting', 0):,} waiting, {counts.get('active', 0):,} still active[/dim]")
+
+@queue.command()
+@click.pass_context
+def resume(ctx: click.Context) -> None:
+    """Let workers pick up deliveries again."""
+    api = _get_api(ctx)
+    if not api:
+        return
+    try:
+        api.resume_queue()
+    except APIError as e:
+        console.print(f"[red]❌ Failed to resume queue: {e}[/red]")
+        return
+    console.print("[green]▶️  Queue resumed[/green]")
+    counts = _queue_counts(api)
+    if counts is not None:
+        console.print(f"[dim]{counts.get('waiting', 0):,} waiting[/dim]")
+
+def _queue_counts(api: DarajaAPI) -> Optional[Dict[str, Any]]:
+    """Job counts after a pause or resume; the state change already succeeded."""
+    try:
+        counts: Dict[str, Any] = api.get_queue_stats().get('counts', {})
+        return counts
+    except APIError as e:
+        console.print(f"[yellow]⚠️  Could not fetch queue counts: {e}[/yellow]")
+        return None
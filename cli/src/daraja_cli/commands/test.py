@@ -6,14 +6,25 @@ But this should be a good starting point for testing webhooks and endpoints
 
 import click
 import json
+import sys
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.table import Table
+from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
 
 from ..utils.config import load_config, ConfigError
 from ..utils.api import DarajaAPI, APIError
+from ..utils.bench import WORKER_TIMEOUT_MS, BenchResult, EndpointBenchmark
+from ..utils.bulk import DEFAULT_CONCURRENCY
+from ..utils.dispatch import send_corpus
+from ..utils.corpus import CorpusReader, is_corpus
+from ..utils.loadgen import PROFILES as LOAD_PROFILES, LoadGenerator, LoadResult, schedule as load_schedule
+from ..utils.payloads import PAYLOAD_TYPES
+from ..utils.stats import log_histogram
+from ..utils.validation import DEFAULT_CHUNK_SIZE, TYPE_ALIASES, ValidationReport, validate_records
 
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional, TextIO, Tuple
 
 console = Console()
 
@@ -24,9 +35,13 @@ def test() -> None:
 
 @test.command()
 @click.option('--environment', '-e', help='Environment to test (dev/staging/prod)')
-@click.option('--payload', help='Custom JSON payload file')
+@click.option('--payload', help='Custom JSON payload file, or a JSONL file or directory of many')
+@click.option('--concurrency', '-c', default=DEFAULT_CONCURRENCY, show_default=True, help='Corpus: parallel sends')
+@click.option('--rate', type=float, help='Corpus: maximum sends per second')
+@click.option('--results', type=click.File('w'), help='Corpus: write one JSON result per payload to this file')
 @click.pass_context
-def webhook(ctx: click.Context, environment: str, payload: str) -> None:
+def webhook(ctx: click.Context, environment: str, payload: str, concurrency: int,
+            rate: Optional[float], results: Optional[TextIO]) -> None:
     """Send a test webhook to our endpoint."""
     config_data = ctx.obj.get('config')
     api = ctx.obj.get('api')
@@ -47,6 +62,14 @@ def webhook(ctx: click.Context, environment: str, payload: str) -> None:
     
     endpoint_url = endpoints[environment]
     
+    if payload and is_corpus(Path(payload)):
+        if not Path(payload).exists():
+            console.print(f"[red]❌ Payload corpus not found: {payload}[/red]")
+            return
+        console.print(f"[dim]Endpoint:[/dim] {endpoint_url}")
+        send_corpus(api, environment, Path(payload), concurrency=concurrency, rate=rate, results=results)
+        return
+    
     # Load custom payload if provided
     test_payload = None
     if payload:
@@ -95,10 +118,109 @@ def webhook(ctx: click.Context, environment: str, payload: str) -> None:
             progress.stop()
             console.print(f"[red]❌ Unexpected error: {e}[/red]")
 
+@test.command()
+@click.option('--url', help='Target URL (default: your permanent webhook URL)')
+@click.option('--type', 'payload_type', type=click.Choice(PAYLOAD_TYPES), default='mixed', show_default=True, help='Callback payload type')
+@click.option('--pattern', type=click.Choice(LOAD_PROFILES), default='constant', show_default=True, help='Arrival pattern')
+@click.option('--rate', '-r', default=10.0, show_default=True, help='Requests per second (start rate for ramp, baseline for burst)')
+@click.option('--ramp-to', type=float, help='Final requests per second for the ramp pattern')
+@click.option('--burst-size', default=50, show_default=True, help='Requests per burst for the burst pattern')
+@click.option('--burst-interval', type=click.FloatRange(0, min_open=True), default=5.0, show_default=True,
+              help='Seconds between bursts')
+@click.option('--duration', '-d', default=30.0, show_default=True, help='Test duration in seconds')
+@click.option('--concurrency', '-c', default=20, show_default=True, help='Maximum in-flight requests')
+@click.option('--timeout', default=30.0, show_default=True, help='Per-request timeout in seconds')
+@click.option('--seed', type=int, help='Random seed for reproducible payloads')
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+@click.pass_context
+def load(ctx: click.Context, url: Optional[str], payload_type: str, pattern: str, rate: float,
+         ramp_to: Optional[float], burst_size: int, burst_interval: float, duration: float,
+         concurrency: int, timeout: float, seed: Optional[int], yes: bool) -> None:
+    """Load test a webhook receiver with synthetic M-Pesa callbacks."""
+    config_data = ctx.obj.get('config') or {}
+    target = url or config_data.get('permanent_url')
+    if not target:
+        console.print("[red]❌ No target. Pass --url or run 'daraja login' to use your permanent URL.[/red]")
+        return
+    
+    console.print("[bold blue]🚀 Load testing webhook receiver[/bold blue]")
+    console.print(f"[dim]Target:[/dim] {target}")
+    console.print(f"[dim]Pattern:[/dim] {pattern} · {rate:g} rps"
+                  + (f" → {ramp_to:g} rps" if pattern == 'ramp' and ramp_to is not None else "")
+                  + (f" + {burst_size} every {burst_interval:g}s" if pattern == 'burst' else "")
+                  + f" · {duration:g}s · concurrency {concurrency}")
+    
+    if not url and not yes and not click.confirm("This sends real traffic through your permanent URL. Continue?"):
+        return
+    
+    generator = LoadGenerator(target, payload_type, concurrency, timeout, seed)
+    offsets = load_schedule(pattern, rate, duration, ramp_to, burst_size, burst_interval)
+    
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.fields[sent]:,} sent · {task.fields[rps]:,.1f} rps · [red]{task.fields[errors]:,} errors[/red]"),
+            TimeElapsedColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("Sending callbacks...", total=duration, sent=0, rps=0.0, errors=0)
+            
+            def on_tick(result: LoadResult) -> None:
+                progress.update(task, completed=min(result.elapsed, duration), sent=result.sent,
+                                rps=result.rps, errors=result.errors)
+            
+            result = generator.run(offsets, on_tick)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]⏹️  Load test stopped[/yellow]")
+        return
+    finally:
+        generator.close()
+    
+    _print_load_report(result)
+
+def _print_load_report(result: LoadResult) -> None:
+    """Print throughput, latency percentiles and status breakdown."""
+    latency = result.latency_summary()
+    console.print(Panel.fit(
+        f"[bold]Requests:[/bold] {result.sent:,} in {result.elapsed:.1f}s\n"
+        f"[bold]Achieved RPS:[/bold] {result.rps:,.1f}\n"
+        f"[bold]Errors:[/bold] [red]{result.errors:,}[/red] ({result.error_rate:.2f}%)\n"
+        f"[bold]Late Starts:[/bold] {result.late:,}\n\n"
+        f"[bold]Latency p50:[/bold] {latency['p50']:.0f}ms\n"
+        f"[bold]Latency p95:[/bold] {latency['p95']:.0f}ms\n"
+        f"[bold]Latency p99:[/bold] {latency['p99']:.0f}ms\n"
+        f"[bold]Latency max:[/bold] {latency['max']:.0f}ms",
+        title="Load Test Results"
+    ))
+    if result.late:
+        console.print("[dim]Late starts mean the concurrency limit, not the schedule, set the pace. "
+                      "Raise --concurrency for an accurate rate.[/dim]")
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Status", style="dim")
+    table.add_column("Count", justify="right")
+    table.add_column("Share", justify="right")
+    for status, count in sorted(result.status_codes.items(), key=lambda kv: -kv[1]):
+        table.add_row(status, f"{count:,}", f"{count / result.sent * 100:.1f}%")
+    console.print(table)
+
 @test.command()
 @click.argument('url')
-def endpoint(url: str) -> None:
-    """Test if an endpoint is reachable."""
+@click.option('--requests', '-n', 'requests_count', type=click.IntRange(1), help='Benchmark: number of measured POSTs')
+@click.option('--concurrency', '-c', default=1, show_default=True, help='Benchmark: parallel connections')
+@click.option('--warmup', default=5, show_default=True, help='Benchmark: requests sent before measuring')
+@click.option('--type', 'payload_type', type=click.Choice(PAYLOAD_TYPES), default='mixed', show_default=True, help='Benchmark: callback payload type')
+@click.option('--timeout', default=WORKER_TIMEOUT_MS / 1000, show_default=True, help='Benchmark: per-request timeout in seconds')
+@click.option('--seed', type=int, help='Benchmark: random seed for reproducible payloads')
+def endpoint(url: str, requests_count: Optional[int], concurrency: int, warmup: int,
+             payload_type: str, timeout: float, seed: Optional[int]) -> None:
+    """Test if an endpoint is reachable, or benchmark it with -n."""
+    if requests_count:
+        _benchmark_endpoint(url, requests_count, concurrency, warmup, payload_type, timeout, seed)
+        return
+    
     console.print(f"[bold blue]🔍 Testing endpoint reachability[/bold blue]")
     console.print(f"[dim]URL:[/dim] {url}")
     
@@ -154,6 +276,186 @@ def endpoint(url: str) -> None:
             progress.stop()
             console.print(f"[red]❌ Test failed: {e}[/red]")
 
+def _benchmark_endpoint(url: str, requests_count: int, concurrency: int, warmup: int,
+                        payload_type: str, timeout: float, seed: Optional[int]) -> None:
+    """Run the benchmark with a progress bar and print the report."""
+    console.print("[bold blue]⏱️  Benchmarking endpoint[/bold blue]")
+    console.print(f"[dim]URL:[/dim] {url}")
+    console.print(f"[dim]{requests_count:,} {payload_type} callbacks over {concurrency} connection(s), "
+                  f"{warmup} warmup[/dim]")
+    
+    benchmark = EndpointBenchmark(url, payload_type, concurrency=concurrency, timeout=timeout, seed=seed)
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed}/{task.total}"),
+        TimeElapsedColumn(),
+        console=console
+    ) as progress:
+        # Each connection's first (cold) request comes on top of warmup and measured ones
+        task = progress.add_task("Sending callbacks...", total=requests_count + warmup + concurrency)
+        
+        def on_progress(result: BenchResult) -> None:
+            progress.update(task, completed=sum(result.status_codes.values()))
+        
+        try:
+            result = benchmark.run(requests_count, warmup=warmup, on_progress=on_progress)
+        except KeyboardInterrupt:
+            console.print("[yellow]⚠️  Benchmark interrupted[/yellow]")
+            return
+    
+    _print_benchmark_report(result)
+
+def _print_benchmark_report(result: BenchResult) -> None:
+    """Print cold/warm latency, percentiles, a histogram and the timeout verdict."""
+    warm = result.warm_summary()
+    cold = result.cold_summary()
+    
+    console.print(Panel.fit(
+        f"[bold]Measured:[/bold] {result.measured:,} in {result.elapsed:.1f}s "
+        f"({result.measured / result.elapsed if result.elapsed else 0:,.1f}/s)\n"
+        f"[bold]Warmup:[/bold] {result.warmup:,}\n"
+        f"[bold]Errors:[/bold] [red]{result.error_count:,}[/red] "
+        f"({result.timeouts:,} timeouts, {result.server_errors:,} server 5xx)\n"
+        f"[bold]Cold (new connection):[/bold] {cold['count']} samples, "
+        f"mean {cold['mean']:.1f}ms, max {cold['max']:.1f}ms",
+        title="Endpoint Benchmark"
+    ))
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Connection", style="dim")
+    for column in ("min", "mean", "p50", "p90", "p99", "max"):
+        table.add_column(column, justify="right")
+    table.add_row("warm", *(f"{warm[k]:.1f}ms" for k in ("min", "mean", "p50", "p90", "p99", "max")))
+    if cold['count']:
+        table.add_row("cold", f"{cold['min']:.1f}ms", f"{cold['mean']:.1f}ms", f"{cold['p50']:.1f}ms",
+                      f"{cold['p90']:.1f}ms", f"{cold['p99']:.1f}ms", f"{cold['max']:.1f}ms")
+    console.print(table)
+    
+    buckets = log_histogram(result.warm)
+    if buckets:
+        console.print("\n[bold]Warm latency histogram[/bold]")
+        peak = max(count for _, _, count in buckets)
+        for low, high, count in buckets:
+            bar = "█" * max(1 if count else 0, round(count / peak * 40))
+            console.print(f"  {low:>9.2f} – {high:<9.2f}ms │ [cyan]{bar}[/cyan] {count}")
+    
+    if result.status_codes:
+        codes = ", ".join(f"{code}: {count}" for code, count in sorted(result.status_codes.items()))
+        console.print(f"\n[dim]Responses:[/dim] {codes}")
+    
+    timeout_s = WORKER_TIMEOUT_MS / 1000
+    if not result.warm and not result.cold and not result.timeouts:
+        console.print("[red]❌ No successful responses - endpoint not reachable[/red]")
+        return
+    over = result.over()
+    worst = max(warm['max'], cold['max'])
+    if over or result.server_errors:
+        if over:
+            console.print(f"[red]❌ {over} request(s) timed out or took longer than the worker's "
+                          f"{timeout_s:g}s delivery timeout; those webhooks would be retried.[/red]")
+        if result.server_errors:
+            console.print(f"[red]❌ {result.server_errors} request(s) got a 5xx response; "
+                          f"the worker would retry those webhooks.[/red]")
+    elif warm['p99'] > WORKER_TIMEOUT_MS / 2 or worst > WORKER_TIMEOUT_MS / 2:
+        console.print(f"[yellow]⚠️  Slowest response {worst / 1000:.1f}s is over half the worker's "
+                      f"{timeout_s:g}s delivery timeout.[/yellow]")
+    else:
+        console.print(f"[green]✅ All responses well inside the worker's {timeout_s:g}s delivery timeout "
+                      f"(slowest {worst:.0f}ms).[/green]")
+
+@test.command()
+@click.argument('source', type=click.Path(exists=True, allow_dash=True))
+@click.option('--type', 'payload_type', type=click.Choice(sorted(TYPE_ALIASES)), help='Validate everything against one schema instead of detecting it (timeout is only checked this way)')
+@click.option('--workers', '-w', type=click.IntRange(1), help='Worker processes (default: CPU count)')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Records per work unit')
+@click.option('--show', 'show_samples', default=10, show_default=True, help='Invalid records to list')
+def payload(source: str, payload_type: Optional[str], workers: Optional[int], chunk_size: int,
+            show_samples: int) -> None:
+    """Validate callback payloads offline (JSON, JSONL, a directory, or '-' for stdin).
+
+    Exits with status 1 when any record is invalid, so it can gate CI.
+    """
+    records: Iterator[Tuple[str, str]]
+    if source == '-':
+        records = ((f"stdin:{n}", line) for n, line in enumerate(sys.stdin, 1) if line.strip())
+        total = None
+    else:
+        reader = CorpusReader(Path(source))
+        records = reader.iter_raw()
+        total = reader.count() or None
+    
+    console.print("[bold blue]🔍 Validating callback payloads[/bold blue]")
+    console.print(f"[dim]Source:[/dim] {source}")
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed:,} records"),
+        TextColumn("[dim]{task.fields[rate]}[/dim]"),
+        console=console
+    ) as progress:
+        task = progress.add_task("Validating...", total=total, rate='')
+        
+        def on_progress(report: ValidationReport) -> None:
+            progress.update(task, completed=report.total, rate=f"{report.throughput:,.0f}/s")
+        
+        try:
+            report = validate_records(
+                records, workers=workers, chunk_size=chunk_size,
+                expected=TYPE_ALIASES[payload_type] if payload_type else None,
+                on_progress=on_progress,
+            )
+        except KeyboardInterrupt:
+            console.print("[yellow]⚠️  Validation interrupted[/yellow]")
+            return
+        progress.update(task, completed=report.total, total=report.total)
+    
+    _print_validation_report(report, show_samples)
+    if report.invalid:
+        sys.exit(1)
+
+def _print_validation_report(report: ValidationReport, show_samples: int) -> None:
+    """Totals, per-type counts, per-field error counts and sample failures."""
+    color = "green" if not report.invalid else "red"
+    console.print(Panel.fit(
+        f"[bold]Records:[/bold] {report.total:,}\n"
+        f"[bold]Valid:[/bold] [green]{report.valid:,}[/green]\n"
+        f"[bold]Invalid:[/bold] [{color}]{report.invalid:,}[/{color}]"
+        f" ({report.parse_errors:,} unparseable)\n\n"
+        f"[bold]Duration:[/bold] {report.elapsed:.2f}s\n"
+        f"[bold]Throughput:[/bold] {report.throughput:,.0f} records/s",
+        title="Payload Validation"
+    ))
+    
+    types = sorted(set(report.by_type) | set(report.invalid_by_type))
+    if types:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Event Type", style="dim")
+        table.add_column("Valid", justify="right")
+        table.add_column("Invalid", justify="right")
+        for name in types:
+            table.add_row(name, f"[green]{report.by_type.get(name, 0):,}[/green]",
+                          f"[red]{report.invalid_by_type.get(name, 0):,}[/red]")
+        console.print(table)
+    
+    if report.field_errors:
+        errors = Table(show_header=True, header_style="bold red")
+        errors.add_column("Field", style="dim")
+        errors.add_column("Problem")
+        errors.add_column("Count", justify="right")
+        for error, count in sorted(report.field_errors.items(), key=lambda kv: -kv[1]):
+            field, _, problem = error.partition(': ')
+            errors.add_row(field, problem, f"{count:,}")
+        console.print(errors)
+    
+    if report.samples and show_samples:
+        console.print("\n[bold]Invalid records:[/bold]")
+        for record_id, message in report.samples[:show_samples]:
+            console.print(f"  [dim]{record_id}[/dim] {message}")
+
 @test.command()
 @click.pass_context
 def validate(ctx: click.Context) -> None:
@@ -2,51 +2,163 @@
 Daraja CLI - Command-line interface for Daraja Developer Toolkit
 
 Main entry point for the CLI application.
+
+Startup is kept cheap: command modules are imported only when dispatched,
+and the profile and API client are built the first time a command asks
+for them.
 """
 
+import importlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
 import click
-from rich.console import Console
-from rich.panel import Panel
 
-from .commands import auth, config, test, monitor, env
-from .utils.config import load_profile, load_config, ConfigError
-from .utils.api import DarajaAPI
+# Command name -> ("module:attribute" relative to daraja_cli.commands, short
+# help). The help is listed by `daraja --help` without importing the module.
+LAZY_COMMANDS = {
+    'auth': ('auth:auth', 'Authentication commands.'),
+    'config': ('config:config', 'Configuration management commands.'),
+    'test': ('test:test', 'Testing and validation commands.'),
+    'monitor': ('monitor:monitor', 'Monitoring and logging commands.'),
+    'env': ('env:env', 'Environment management commands.'),
+    'listen': ('listen:listen', 'Run a local webhook receiver that acks and records callbacks.'),
+    'dlq': ('dlq:dlq', 'Dead-letter queue inspection and recovery.'),
+    'queue': ('queue:queue', 'Delivery queue inspection and control.'),
+    'mock': ('mock:mock', 'Serve a local mock of the Daraja API from synthetic data.'),
+}
+
+class LazyGroup(click.Group):
+    """Click group that imports subcommand modules on first use."""
+
+    def __init__(self, *args: Any, lazy_commands: Optional[Dict[str, Tuple[str, str]]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in self.lazy_commands:
+            command = self._load(cmd_name)
+        return command
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """List commands, using the static help for those not imported yet."""
+        names = [name for name in self.list_commands(ctx)
+                 if name not in self.commands or not self.commands[name].hidden]
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            # A bare Command stands in for an unloaded one, to shorten its help the same way
+            command = self.commands.get(name) or click.Command(name, help=self.lazy_commands[name][1])
+            rows.append((name, command.get_short_help_str(limit)))
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, attr = self.lazy_commands[cmd_name][0].split(':')
+        module = importlib.import_module(f'{__package__}.commands.{module_name}')
+        command: click.Command = getattr(module, attr)
+        # Cache it as a regular subcommand so the import happens once
+        self.add_command(command, cmd_name)
+        return command
+
+class CliState(dict):
+    """ctx.obj that loads the profile and API client on first access.
+
+    Commands keep using ctx.obj.get('config') and ctx.obj.get('api');
+    commands that need neither never touch keyring, the config file or
+    requests.
+    """
+
+    LAZY_KEYS = ('config', 'api')
 
-console = Console()
+    def _resolve(self, key: str) -> None:
+        if key in self or key not in self.LAZY_KEYS:
+            return
+        if 'config' not in self:
+            from .utils.config import load_profile, ConfigError
+            try:
+                self['config'] = load_profile()
+            except ConfigError:
+                # Config not available - that's okay for init/login commands
+                self['config'] = None
+                self['api'] = None
+                return
+        if key == 'api':
+            # Built from the profile already loaded for 'config', if any
+            config_data = super().get('config')
+            if config_data is None:
+                self['api'] = None
+                return
+            from .utils.api import DarajaAPI
+            self['api'] = DarajaAPI(config_data)
+
+    def __getitem__(self, key: str) -> Any:
+        self._resolve(key)
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._resolve(key)
+        return super().get(key, default)
+
+def _instrument(ctx: click.Context, param: click.Parameter, value: Any) -> None:
+    """Start tracing or profiling as soon as the flag is parsed.
 
-@click.group()
+    The options are eager, so this runs before the subcommand module is
+    imported; without the flags nothing is imported or patched.
+    """
+    if not value:
+        return
+    from .utils import trace
+    if param.name == 'trace':
+        trace.enable(summary=True)
+    elif param.name == 'trace_file':
+        trace.enable(output=value)
+    else:
+        trace.enable(profile=value)
+    ctx.call_on_close(lambda: trace.finish(' '.join(filter(None, ['daraja', ctx.invoked_subcommand]))))
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
 @click.version_option(version="0.1.0", prog_name="daraja")
+@click.option('--trace', is_flag=True, is_eager=True, expose_value=False, callback=_instrument,
+              help='Print where the time went: imports, keyring, config, network, rendering')
+@click.option('--trace-file', type=click.Path(dir_okay=False, path_type=Path), is_eager=True,
+              expose_value=False, callback=_instrument, help='Write a Chrome trace JSON of the run')
+@click.option('--cprofile', metavar='FILE', is_eager=True, expose_value=False, callback=_instrument,
+              help="Run under cProfile and save stats to FILE ('-' prints the top functions)")
 @click.pass_context
 def cli(ctx: click.Context) -> None:
     """
     Daraja Developer Toolkit CLI
-    
+
     Never lose another M-Pesa webhook again! 🇰🇪
-    
+
     Use 'daraja --help' to see available commands.
     """
-    ctx.ensure_object(dict)
-    
-    # Try to load config for commands that need it
-    try:
-        config_data = load_profile()
-        ctx.obj['config'] = config_data
-        ctx.obj['api'] = DarajaAPI(config_data)
-    except ConfigError:
-        # Config not available - that's okay for init/login commands
-        ctx.obj['config'] = None
-        ctx.obj['api'] = None
+    if ctx.obj is None:
+        ctx.obj = CliState()
 
 @cli.command()
 @click.pass_context
 def init(ctx: click.Context) -> None:
     """Initialize Daraja in your current project."""
+    from rich.console import Console
+    from rich.panel import Panel
+    from .commands import auth
+    from .utils.config import load_config, ConfigError
+
+    console = Console()
     console.print(Panel.fit(
         "[bold green]🚀 Welcome to Daraja Developer Toolkit![/bold green]\n\n"
         "Let's set up your M-Pesa webhook proxy...",
         title="Daraja Init"
     ))
-    
+
     # Check if already initialized
     try:
         load_config()
@@ -55,23 +167,16 @@ def init(ctx: click.Context) -> None:
             return
     except ConfigError:
         pass
-    
+
     console.print("\n[bold]Step 1:[/bold] Let's get you logged in...")
     ctx.invoke(auth.login)
 
 @cli.command()
 def version() -> None:
     """Show version information."""
-    console.print("[bold green]Daraja CLI v0.1.0[/bold green]")
-    console.print("Part of Daraja Developer Toolkit")
-    console.print("Made with ❤️ in Kenya 🇰🇪")
-
-# Add command groups
-cli.add_command(auth.auth)
-cli.add_command(config.config)
-cli.add_command(test.test)
-cli.add_command(monitor.monitor)
-cli.add_command(env.env)
+    click.secho("Daraja CLI v0.1.0", fg="green", bold=True)
+    click.echo("Part of Daraja Developer Toolkit")
+    click.echo("Made with ❤️ in Kenya 🇰🇪")
 
 if __name__ == "__main__":
     cli()
@@ -3,24 +3,371 @@ API client for Daraja Developer Toolkit
 """
 
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Iterable, Iterator, Set
+from urllib.parse import quote, urlencode
 import json
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .httpcache import ResponseCache
+
+# Transport defaults, overridable per profile in config.json
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+# Streaming defaults: servers are expected to send a heartbeat well inside
+# the read timeout, and clients reconnect after `retry` ms (SSE default 3s)
+STREAM_READ_TIMEOUT = 60
+STREAM_RETRY_MS = 3000
+STREAM_MAX_FAILURES = 5
+
+# The webhook service rejects bulk DLQ retries larger than this
+DLQ_BULK_LIMIT = 100
 
 class APIError(Exception):
     """API related errors"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, not_sent: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        # True when no connection was made, so the server never saw the request
+        self.not_sent = not_sent
+
+class StreamUnavailable(APIError):
+    """The server does not offer a streaming endpoint for this resource"""
     pass
 
+def _never_connected(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether a connection error happened before anything was sent."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+def _json_object(value: Any) -> Dict[str, Any]:
+    """A decoded JSON body that must be an object."""
+    if not isinstance(value, dict):
+        raise APIError(f"Unexpected response: expected a JSON object, got {type(value).__name__}")
+    return value
+
+def _json_list(value: Any) -> List[Dict[str, Any]]:
+    """A decoded JSON field that must be a list of records."""
+    if not isinstance(value, list):
+        raise APIError(f"Unexpected response: expected a JSON array, got {type(value).__name__}")
+    return value
+
+def log_cursor(log: Dict[str, Any]) -> Optional[str]:
+    """Return the id used to resume or dedupe a webhook log entry."""
+    value = log.get('id') or log.get('webhook_id')
+    return str(value) if value is not None else None
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse a text/event-stream line iterator into event dicts.
+    
+    Each event has 'event', 'data' and optionally 'id' and 'retry' keys,
+    following the WHATWG server-sent events dispatch rules.
+    """
+    event: Dict[str, Any] = {}
+    data: List[str] = []
+    for line in lines:
+        if line is None:
+            continue
+        if line == '':
+            if data or 'retry' in event:
+                event.setdefault('event', 'message')
+                event['data'] = '\n'.join(data)
+                yield event
+            event, data = {}, []
+            continue
+        if line.startswith(':'):
+            continue  # comment / heartbeat
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'data':
+            data.append(value)
+        elif field == 'event':
+            event['event'] = value
+        elif field == 'id':
+            event['id'] = value
+        elif field == 'retry' and value.isdigit():
+            event['retry'] = int(value)
+
+class RequestStats:
+    """Per-request timing statistics for a DarajaAPI session."""
+    
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms = 0.0
+        self.first_ms: Optional[float] = None
+        self.by_endpoint: Dict[str, List[float]] = {}
+        # Bulk commands share one client across worker threads
+        self._lock = threading.Lock()
+    
+    def record(self, method: str, endpoint: str, elapsed_ms: float, ok: bool = True) -> None:
+        """Record the duration of a single request."""
+        with self._lock:
+            self._record(method, endpoint, elapsed_ms, ok)
+    
+    def _record(self, method: str, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        if self.first_ms is None:
+            self.first_ms = elapsed_ms
+        if self.min_ms is None or elapsed_ms < self.min_ms:
+            self.min_ms = elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        # Group by path without query string so polling loops share a bucket
+        key = f"{method.upper()} {endpoint.split('?', 1)[0]}"
+        self.by_endpoint.setdefault(key, [0, 0.0])
+        self.by_endpoint[key][0] += 1
+        self.by_endpoint[key][1] += elapsed_ms
+    
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.requests if self.requests else 0.0
+    
+    def summary(self, connections: int = 0) -> Dict[str, Any]:
+        """Return a JSON-serialisable summary of the recorded requests."""
+        warm = self.requests - 1
+        warm_avg = (self.total_ms - (self.first_ms or 0.0)) / warm if warm > 0 else 0.0
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'connections_opened': connections,
+            'connections_reused': max(self.requests - connections, 0),
+            'avg_ms': round(self.avg_ms, 1),
+            'min_ms': round(self.min_ms or 0.0, 1),
+            'max_ms': round(self.max_ms, 1),
+            'first_ms': round(self.first_ms or 0.0, 1),
+            'warm_avg_ms': round(warm_avg, 1),
+            'by_endpoint': {
+                k: {'count': int(v[0]), 'avg_ms': round(v[1] / v[0], 1)}
+                for k, v in self.by_endpoint.items()
+            },
+        }
+
+class LogIterator:
+    """Forward-paging, exactly-once iterator over webhook delivery logs.
+    
+    Pages oldest-to-newest by webhook id cursor. Iterating drains every
+    entry currently available; call `drain()` again later to fetch only the
+    new delta. `cursor` can be persisted and passed back as `after` to
+    resume. Gaps are recorded in `gaps` when the server's `seq` numbers
+    jump, or when it reports the cursor as expired (HTTP 410).
+    """
+    
+    SEEN_LIMIT = 10000
+    
+    def __init__(self, api: 'DarajaAPI', environment: Optional[str] = None,
+                 after: Optional[str] = None, since: Optional[str] = None,
+                 page_size: int = 100):
+        self.api = api
+        self.environment = environment
+        self.cursor = after
+        self.since = since
+        self.page_size = page_size
+        self.last_seq: Optional[int] = None
+        self.gaps: List[Dict[str, Any]] = []
+        self.pages = 0
+        self._seen: Dict[str, None] = {}
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.drain()
+    
+    def start_at_latest(self) -> 'LogIterator':
+        """Position the cursor at the newest existing entry."""
+        latest = self.api.get_webhook_logs(1, self.environment)
+        if latest:
+            self.cursor = log_cursor(latest[0])
+            self.last_seq = _log_seq(latest[0])
+            if self.cursor:
+                self._remember(self.cursor)
+        return self
+    
+    def drain(self) -> Iterator[Dict[str, Any]]:
+        """Yield every entry newer than the cursor, one page at a time."""
+        while True:
+            page = self._fetch_page()
+            entries = page.get('logs', [])
+            self.pages += 1
+            
+            # Servers that ignore order=asc return newest first
+            if len(entries) > 1 and str(entries[0].get('timestamp', '')) > str(entries[-1].get('timestamp', '')):
+                entries = entries[::-1]
+            
+            new_count = 0
+            for entry in entries:
+                entry_id = log_cursor(entry)
+                if entry_id is not None:
+                    if entry_id in self._seen:
+                        continue
+                    self._remember(entry_id)
+                self._check_seq(entry)
+                new_count += 1
+                if entry_id is not None:
+                    self.cursor = entry_id
+                yield entry
+            
+            next_cursor = page.get('next_cursor')
+            if next_cursor:
+                self.cursor = str(next_cursor)
+            has_more = page.get('has_more', len(entries) >= self.page_size)
+            # Stop when exhausted, or when a page brought nothing new
+            # (a server ignoring the cursor would otherwise loop forever)
+            if not has_more or not new_count:
+                return
+    
+    def _fetch_page(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {'limit': self.page_size, 'order': 'asc'}
+        if self.environment:
+            params['environment'] = self.environment
+        if self.cursor:
+            params['after'] = self.cursor
+        elif self.since:
+            params['since'] = self.since
+        endpoint = f'/user/{self.api.user_id}/webhook/logs?{urlencode(params)}'
+        try:
+            return self.api._make_request('GET', endpoint)
+        except APIError as e:
+            if e.status_code != 410 or not self.cursor:
+                raise
+            # Cursor fell out of the server's retention window: record the
+            # gap and resume from the oldest entry still available
+            self.gaps.append({'after': self.cursor, 'missing': None, 'reason': 'cursor expired'})
+            self.cursor = None
+            self.last_seq = None
+            return self._fetch_page()
+    
+    def _check_seq(self, entry: Dict[str, Any]) -> None:
+        seq = _log_seq(entry)
+        if seq is None:
+            return
+        if self.last_seq is not None and seq > self.last_seq + 1:
+            self.gaps.append({
+                'after': self.cursor,
+                'missing': seq - self.last_seq - 1,
+                'reason': 'sequence gap',
+            })
+        if self.last_seq is None or seq > self.last_seq:
+            self.last_seq = seq
+    
+    def _remember(self, entry_id: str) -> None:
+        self._seen[entry_id] = None
+        if len(self._seen) > self.SEEN_LIMIT:
+            # dicts keep insertion order, so this drops the oldest id
+            del self._seen[next(iter(self._seen))]
+
+def _log_seq(log: Dict[str, Any]) -> Optional[int]:
+    seq = log.get('seq')
+    return seq if isinstance(seq, int) else None
+
+def build_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+) -> requests.Session:
+    """Build a keep-alive session with a bounded connection pool and retries.
+    
+    Retries only cover idempotent methods and transient gateway errors; the
+    final response is handed back to the caller instead of raising, so the
+    normal status handling in DarajaAPI still applies.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
 class DarajaAPI:
     """Client for Daraja API"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session: Optional[requests.Session] = None):
         self.config = config
         self.api_url = config.get('api_url', 'https://api.daraja-toolkit.com')
         self.api_key = config.get('api_key')
         self.user_id = config.get('user_id')
+        self.timeout = config.get('timeout', DEFAULT_TIMEOUT)
         
         if not self.api_key:
             raise APIError("API key not configured")
+        
+        self.session = session or build_session(
+            pool_size=config.get('pool_size', DEFAULT_POOL_SIZE),
+            max_retries=config.get('max_retries', DEFAULT_MAX_RETRIES),
+            backoff_factor=config.get('backoff_factor', DEFAULT_BACKOFF_FACTOR),
+        )
+        self.stats = RequestStats()
+        self.cache_responses = config.get('response_cache', True)
+        self._response_cache: Optional['ResponseCache'] = None
+        self._response_cache_lock = threading.Lock()
+    
+    @property
+    def response_cache(self) -> Optional['ResponseCache']:
+        """The persistent ResponseCache, opened on first use; None when disabled."""
+        if self._response_cache is None and self.cache_responses:
+            # Bulk workers share one client; only the first of them opens the file
+            with self._response_cache_lock:
+                if self._response_cache is None:
+                    from .httpcache import ResponseCache
+                    self._response_cache = ResponseCache.for_config(self.config)
+        return self._response_cache
+    
+    def __enter__(self) -> 'DarajaAPI':
+        return self
+    
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+        if self._response_cache is not None:
+            self._response_cache.close()
+    
+    def connections_opened(self) -> int:
+        """Number of TCP connections the pool has opened so far."""
+        total = 0
+        # The same adapter is mounted for http:// and https://
+        adapters = {id(a): a for a in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = getattr(adapter, 'poolmanager', None)
+            if pools is None:
+                continue
+            for key in list(pools.pools.keys()):
+                pool = pools.pools.get(key)
+                if pool is not None:
+                    total += getattr(pool, 'num_connections', 0)
+        return total
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Timing statistics for every request made by this client."""
+        return self.stats.summary(self.connections_opened())
     
     def _get_headers(self) -> Dict[str, str]:
         """Get standard headers for API requests."""
@@ -30,74 +377,192 @@ class DarajaAPI:
             'User-Agent': 'Daraja-CLI/0.1.0'
         }
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make an API request."""
+    def _check_response(self, response: requests.Response) -> None:
+        """Raise APIError for error responses."""
+        code = response.status_code
+        if code == 401:
+            raise APIError("Authentication failed. Please check your API key.", code)
+        elif code == 403:
+            raise APIError("Access forbidden. Please check your permissions.", code)
+        elif code == 404:
+            raise APIError("Resource not found.", code)
+        elif code >= 500:
+            raise APIError("Server error. Please try again later.", code)
+        elif code >= 400:
+            try:
+                error_data = response.json()
+                # Webhook-service routes report {success: false, error}
+                error_message = error_data.get('message') or error_data.get('error') or 'Unknown error'
+            except ValueError:
+                raise APIError(f"API error: HTTP {code}", code)
+            raise APIError(f"API error: {error_message}", code)
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None,
+                      cache: Optional[str] = None, invalidate: bool = False) -> Dict[str, Any]:
+        """Make an API request.
+        
+        `cache` names a read endpoint (a key of httpcache.DEFAULT_TTLS) whose
+        GET responses may be served from, and kept in, the response cache.
+        `invalidate` marks a write that can change those responses; a
+        successful one drops the profile's cached entries.
+        """
         url = f"{self.api_url}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise APIError(f"Unsupported HTTP method: {method}")
+        
+        # Headers go on each request so several clients can share one session
         headers = self._get_headers()
         
+        response_cache = self.response_cache if cache and method == 'GET' else None
+        cached = response_cache.get(url, response_cache.ttl(cache)) if response_cache is not None and cache else None
+        if cached is not None:
+            if cached.fresh:
+                return _json_object(cached.body)
+            headers.update(cached.validators())
+        
+        start = time.perf_counter()
+        ok = False
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
+            if method in ('POST', 'PUT'):
+                response = self.session.request(method, url, headers=headers, json=data, timeout=self.timeout)
             else:
-                raise APIError(f"Unsupported HTTP method: {method}")
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout)
+            ok = response.status_code < 400
             
-            # Handle response
-            if response.status_code == 401:
-                raise APIError("Authentication failed. Please check your API key.")
-            elif response.status_code == 403:
-                raise APIError("Access forbidden. Please check your permissions.")
-            elif response.status_code == 404:
-                raise APIError("Resource not found.")
-            elif response.status_code >= 500:
-                raise APIError("Server error. Please try again later.")
-            elif response.status_code >= 400:
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get('message', 'Unknown error')
-                    raise APIError(f"API error: {error_message}")
-                except json.JSONDecodeError:
-                    raise APIError(f"API error: HTTP {response.status_code}")
+            if cached is not None and response_cache is not None and response.status_code == 304:
+                response_cache.refresh(url, cached, response.headers)
+                return _json_object(cached.body)
+            
+            self._check_response(response)
+            
+            if invalidate and self.response_cache is not None:
+                self.response_cache.invalidate()
             
             # Success response
             if response.status_code == 204:
                 return {}
             
-            return response.json()
+            body = _json_object(response.json())
+            if response_cache is not None:
+                response_cache.store(url, response.text, response.headers)
+            return body
             
-        except requests.exceptions.ConnectionError:
-            raise APIError("Connection failed. Please check your internet connection.")
+        except requests.exceptions.ConnectionError as e:
+            raise APIError("Connection failed. Please check your internet connection.",
+                           not_sent=_never_connected(e))
         except requests.exceptions.Timeout:
             raise APIError("Request timed out. Please try again.")
         except requests.exceptions.RequestException as e:
             raise APIError(f"Network error: {e}")
+        finally:
+            self.stats.record(method, endpoint, (time.perf_counter() - start) * 1000, ok)
     
     def get_user_info(self) -> Dict[str, Any]:
         """Get current user information."""
-        return self._make_request('GET', '/user/me')
+        return self._make_request('GET', '/user/me', cache='user')
     
     def get_webhook_status(self) -> Dict[str, Any]:
         """Get webhook status and statistics."""
-        return self._make_request('GET', f'/user/{self.user_id}/webhook/status')
+        return self._make_request('GET', f'/user/{self.user_id}/webhook/status', cache='status')
     
-    def get_webhook_logs(self, limit: int = 50, environment: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get webhook delivery logs."""
-        params = {'limit': limit}
+    def get_webhook_logs(self, limit: int = 50, environment: Optional[str] = None,
+                         after: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get webhook delivery logs, newest first.
+        
+        `after` is a webhook id cursor; only entries newer than it are returned.
+        `since` is an ISO timestamp bounding how far back the page may reach.
+        """
+        params: Dict[str, Any] = {'limit': limit}
         if environment:
             params['environment'] = environment
+        if after:
+            params['after'] = after
+        elif since:
+            params['since'] = since
         
-        endpoint = f'/user/{self.user_id}/webhook/logs'
-        if params:
-            query_string = '&'.join([f'{k}={v}' for k, v in params.items()])
-            endpoint += f'?{query_string}'
-        
+        endpoint = f'/user/{self.user_id}/webhook/logs?{urlencode(params)}'
         response = self._make_request('GET', endpoint)
-        return response.get('logs', [])
+        return _json_list(response.get('logs', []))
+    
+    def iter_webhook_logs(self, environment: Optional[str] = None, after: Optional[str] = None,
+                          since: Optional[str] = None, page_size: int = 100) -> LogIterator:
+        """Iterate logs oldest-to-newest from a cursor or timestamp, exactly once."""
+        return LogIterator(self, environment, after=after, since=since, page_size=page_size)
+    
+    def stream_webhook_logs(self, environment: Optional[str] = None,
+                            last_event_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield webhook log entries from the server-sent events stream.
+        
+        Reconnects automatically, resuming from the last seen event id via
+        Last-Event-ID. Raises StreamUnavailable if the server has no stream
+        endpoint, or APIError after repeated consecutive failures.
+        """
+        endpoint = f'/user/{self.user_id}/webhook/logs/stream'
+        if environment:
+            endpoint += f'?{urlencode({"environment": environment})}'
+        return self._stream_json(endpoint, 'Log', ('message', 'log'), last_event_id)
+    
+    def _stream_json(self, endpoint: str, label: str, events: Iterable[str],
+                     last_event_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the JSON objects sent as `events` on a server-sent events endpoint."""
+        url = f"{self.api_url}{endpoint}"
+        events = set(events)
+        
+        retry_ms = STREAM_RETRY_MS
+        failures = 0
+        while True:
+            headers = self._get_headers()
+            headers['Accept'] = 'text/event-stream'
+            headers['Cache-Control'] = 'no-cache'
+            if last_event_id:
+                headers['Last-Event-ID'] = last_event_id
+            
+            start = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, headers=headers, stream=True,
+                    timeout=(self.timeout, STREAM_READ_TIMEOUT)
+                )
+            except requests.exceptions.RequestException as e:
+                self.stats.record('GET', endpoint, (time.perf_counter() - start) * 1000, False)
+                failures += 1
+                if failures >= STREAM_MAX_FAILURES:
+                    raise APIError(f"{label} stream unavailable: {e}")
+                time.sleep(retry_ms / 1000 * failures)
+                continue
+            
+            self.stats.record('GET', endpoint, (time.perf_counter() - start) * 1000, response.status_code < 400)
+            with response:
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code in (404, 405, 406, 501) or (
+                    response.status_code == 200 and not content_type.startswith('text/event-stream')
+                ):
+                    raise StreamUnavailable(f"Server does not support {label.lower()} streaming")
+                self._check_response(response)
+                
+                try:
+                    for event in iter_sse(response.iter_lines(decode_unicode=True)):
+                        if 'retry' in event:
+                            retry_ms = event['retry']
+                        if event.get('id'):
+                            last_event_id = event['id']
+                        if event['event'] not in events or not event['data']:
+                            continue
+                        failures = 0
+                        try:
+                            item = json.loads(event['data'])
+                        except json.JSONDecodeError:
+                            continue
+                        if isinstance(item, dict):
+                            yield item
+                except requests.exceptions.RequestException:
+                    pass  # dropped or idle connection, reconnect below
+            
+            failures += 1
+            if failures >= STREAM_MAX_FAILURES:
+                raise APIError(f"{label} stream disconnected repeatedly")
+            time.sleep(retry_ms / 1000)
     
     def send_test_webhook(self, environment: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Send a test webhook to the specified environment."""
@@ -105,7 +570,7 @@ class DarajaAPI:
             'environment': environment,
             'payload': payload
         }
-        return self._make_request('POST', f'/user/{self.user_id}/webhook/test', data)
+        return self._make_request('POST', f'/user/{self.user_id}/webhook/test', data, invalidate=True)
     
     def update_endpoint(self, environment: str, url: str) -> Dict[str, Any]:
         """Update endpoint URL for an environment."""
@@ -113,19 +578,97 @@ class DarajaAPI:
             'environment': environment,
             'url': url
         }
-        return self._make_request('PUT', f'/user/{self.user_id}/endpoints', data)
+        return self._make_request('PUT', f'/user/{self.user_id}/endpoints', data, invalidate=True)
     
     def get_environments(self) -> List[Dict[str, Any]]:
         """Get all configured environments."""
-        response = self._make_request('GET', f'/user/{self.user_id}/environments')
-        return response.get('environments', [])
+        response = self._make_request('GET', f'/user/{self.user_id}/environments', cache='environments')
+        return _json_list(response.get('environments', []))
     
     def get_metrics(self, days: int = 7) -> Dict[str, Any]:
         """Get webhook metrics for the specified number of days."""
         endpoint = f'/user/{self.user_id}/metrics?days={days}'
-        return self._make_request('GET', endpoint)
+        return self._make_request('GET', endpoint, cache='metrics')
     
     def replay_webhook(self, webhook_id: str) -> Dict[str, Any]:
         """Replay a specific webhook delivery."""
         data = {'webhook_id': webhook_id}
-        return self._make_request('POST', f'/user/{self.user_id}/webhook/replay', data)
+        return self._make_request('POST', f'/user/{self.user_id}/webhook/replay', data, invalidate=True)
+    
+    def _service_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Call a webhook-service route, unwrapping its {success, data} envelope."""
+        response = self._make_request(method, endpoint, data)
+        if 'data' in response:
+            return _json_object(response['data'])
+        return response
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get delivery queue counts and throughput."""
+        return self._service_request('GET', '/api/metrics/queue/stats')
+    
+    def get_queue_workers(self) -> Dict[str, Any]:
+        """Get the workers processing the delivery queue and their current jobs."""
+        return self._service_request('GET', '/api/metrics/workers')
+    
+    def get_queue_history(self, limit: int = 50, metric_type: str = 'queue_metrics') -> List[Dict[str, Any]]:
+        """Get recent queue metric snapshots, oldest first."""
+        endpoint = f"/api/metrics/history?{urlencode({'limit': limit, 'type': metric_type})}"
+        return _json_list(self._service_request('GET', endpoint).get('history', []))
+    
+    def pause_queue(self) -> Dict[str, Any]:
+        """Stop workers from picking up new deliveries."""
+        return self._service_request('POST', '/api/metrics/queue/pause', {})
+    
+    def resume_queue(self) -> Dict[str, Any]:
+        """Let workers pick up deliveries again."""
+        return self._service_request('POST', '/api/metrics/queue/resume', {})
+    
+    def stream_queue_metrics(self) -> Iterator[Dict[str, Any]]:
+        """Yield queue metric snapshots pushed by the server (every few seconds)."""
+        return self._stream_json('/api/metrics/realtime', 'Queue metrics', ('message',))
+    
+    def get_dlq_stats(self) -> Dict[str, Any]:
+        """Get dead-letter queue totals by error category and user."""
+        return self._service_request('GET', '/api/dlq/stats')
+    
+    def get_dlq_jobs(self, limit: int = 50, offset: int = 0, error_category: Optional[str] = None,
+                     user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of dead-letter jobs, newest first."""
+        params: Dict[str, Any] = {'limit': limit, 'offset': offset}
+        if error_category:
+            params['errorCategory'] = error_category
+        if user_id:
+            params['userId'] = user_id
+        return self._service_request('GET', f'/api/dlq/jobs?{urlencode(params)}')
+    
+    def iter_dlq_jobs(self, page_size: int = 100, error_category: Optional[str] = None,
+                      user_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate dead-letter jobs, fetching each page only when the previous one is used up."""
+        offset = 0
+        seen: Set[str] = set()
+        while True:
+            page = self.get_dlq_jobs(page_size, offset, error_category, user_id)
+            jobs = page.get('jobs', [])
+            for job in jobs:
+                # Jobs added while paging shift later pages; skip repeats
+                job_id = str(job.get('id'))
+                if job_id not in seen:
+                    seen.add(job_id)
+                    yield job
+            offset += len(jobs)
+            if not jobs or not page.get('pagination', {}).get('hasMore', len(jobs) >= page_size):
+                return
+    
+    def retry_dlq_job(self, job_id: str) -> Dict[str, Any]:
+        """Move one dead-letter job back onto the retry queue."""
+        return self._service_request('POST', f"/api/dlq/retry/{quote(str(job_id), safe='')}", {})
+    
+    def retry_dlq_jobs(self, job_ids: List[str]) -> Dict[str, Any]:
+        """Retry up to DLQ_BULK_LIMIT dead-letter jobs in one request."""
+        if len(job_ids) > DLQ_BULK_LIMIT:
+            raise APIError(f"Cannot retry more than {DLQ_BULK_LIMIT} jobs per request")
+        return self._service_request('POST', '/api/dlq/retry/bulk', {'jobIds': list(job_ids)})
+    
+    def clear_old_dlq_jobs(self, days: int) -> Dict[str, Any]:
+        """Delete dead-letter jobs older than `days` days."""
+        return self._service_request('DELETE', f"/api/dlq/jobs/old?{urlencode({'days': days})}")
@@ -0,0 +1,175 @@
+"""
+Asyncio client for Daraja Developer Toolkit
+
+AsyncDarajaAPI mirrors the DarajaAPI surface but returns coroutines, so
+commands can fan requests out across environments or profiles and wait
+roughly one round trip instead of N.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import requests
+
+from .api import DarajaAPI, APIError, build_session, DEFAULT_POOL_SIZE
+
+T = TypeVar('T')
+
+DEFAULT_CONCURRENCY = DEFAULT_POOL_SIZE
+
+class AsyncDarajaAPI:
+    """Async client for Daraja API with bounded concurrency.
+
+    Requests run on a worker thread pool sized to the connection pool, so
+    concurrency is bounded twice: by the semaphore (queued coroutines) and
+    by the pool (open sockets). Several clients can share one pooled
+    session via ``session``.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        session: Optional[requests.Session] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self._owns_session = session is None
+        if session is None:
+            session = build_session(pool_size=max(self.max_concurrency, config.get('pool_size', DEFAULT_POOL_SIZE)))
+        self.sync = DarajaAPI(config, session=session)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix='daraja-api'
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __enter__(self) -> 'AsyncDarajaAPI':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'AsyncDarajaAPI':
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool and close pooled connections and the response cache.
+
+        A shared session or executor is left open for its owner to close.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        if self._owns_session:
+            self.sync.close()
+        elif self.sync._response_cache is not None:
+            self.sync._response_cache.close()
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.sync.user_id
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        # Created lazily so the semaphore binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def get_user_info(self) -> Dict[str, Any]:
+        """Get current user information."""
+        return await self._call(self.sync.get_user_info)
+
+    async def get_webhook_status(self) -> Dict[str, Any]:
+        """Get webhook status and statistics."""
+        return await self._call(self.sync.get_webhook_status)
+
+    async def get_webhook_logs(self, limit: int = 50, environment: Optional[str] = None,
+                               after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get webhook delivery logs, newest first."""
+        return await self._call(self.sync.get_webhook_logs, limit, environment, after)
+
+    async def send_test_webhook(self, environment: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send a test webhook to the specified environment."""
+        return await self._call(self.sync.send_test_webhook, environment, payload)
+
+    async def update_endpoint(self, environment: str, url: str) -> Dict[str, Any]:
+        """Update endpoint URL for an environment."""
+        return await self._call(self.sync.update_endpoint, environment, url)
+
+    async def get_environments(self) -> List[Dict[str, Any]]:
+        """Get all configured environments."""
+        return await self._call(self.sync.get_environments)
+
+    async def get_metrics(self, days: int = 7) -> Dict[str, Any]:
+        """Get webhook metrics for the specified number of days."""
+        return await self._call(self.sync.get_metrics, days)
+
+    async def replay_webhook(self, webhook_id: str) -> Dict[str, Any]:
+        """Replay a specific webhook delivery."""
+        return await self._call(self.sync.replay_webhook, webhook_id)
+
+    async def get_logs_by_environment(self, environments: Iterable[str], limit: int = 50) -> Dict[str, Any]:
+        """Fetch logs for several environments concurrently.
+
+        Values are log lists, or the APIError raised for that environment.
+        """
+        names = list(environments)
+        results = await gather_settled(self.get_webhook_logs(limit, name) for name in names)
+        return dict(zip(names, results))
+
+async def gather_settled(aws: Iterable[Awaitable[T]]) -> List[Any]:
+    """Await all awaitables concurrently, returning results or APIErrors in order.
+
+    Only APIError is captured; anything else is a bug and propagates.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, APIError):
+            raise result
+    return results
+
+def fan_out_profiles(
+    profiles: Dict[str, Dict[str, Any]],
+    method: str,
+    *args: Any,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Call one AsyncDarajaAPI method for every profile concurrently.
+
+    All clients share a single pooled session and worker pool. Profiles
+    that cannot build a client (e.g. no API key) map to their APIError.
+    """
+    async def run() -> List[Tuple[str, Any]]:
+        session = build_session(pool_size=max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='daraja-api')
+        names: List[str] = []
+        calls: List[Awaitable[Any]] = []
+        settled: List[Tuple[str, Any]] = []
+        clients: List[AsyncDarajaAPI] = []
+        try:
+            for name, config in profiles.items():
+                try:
+                    client = AsyncDarajaAPI(config, max_concurrency, session=session, executor=executor)
+                except APIError as e:
+                    settled.append((name, e))
+                    continue
+                clients.append(client)
+                names.append(name)
+                calls.append(getattr(client, method)(*args))
+            results = await gather_settled(calls)
+            return settled + list(zip(names, results))
+        finally:
+            for client in clients:
+                client.close()
+            executor.shutdown(wait=False)
+            session.close()
+
+    results = dict(asyncio.run(run()))
+    return {name: results[name] for name in profiles}
@@ -0,0 +1,151 @@
+"""
+Endpoint latency benchmark
+
+Sends realistic callback POSTs to an endpoint from a fixed number of
+workers, each holding one keep-alive connection. The first request on every
+connection is reported separately as a cold sample, so connection setup
+does not skew the warm distribution.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from .api import build_session
+from .payloads import make_payload
+from .stats import summarize
+
+# The delivery worker abandons a webhook after this long
+WORKER_TIMEOUT_MS = 25000
+
+class BenchResult:
+    """Cold and warm latency samples from a benchmark run."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.cold: List[float] = []
+        self.warm: List[float] = []
+        self.warmup = 0
+        self.errors: Dict[str, int] = {}
+        self.timeouts = 0
+        self.status_codes: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def measured(self) -> int:
+        return len(self.warm)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def server_errors(self) -> int:
+        """5xx responses; the delivery worker retries these like timeouts."""
+        return sum(count for code, count in self.status_codes.items() if code.startswith('5') and code.isdigit())
+
+    def over(self, threshold_ms: float = WORKER_TIMEOUT_MS) -> int:
+        """Requests that timed out or whose samples were slower than the threshold."""
+        slow = sum(1 for v in self.cold if v > threshold_ms) + sum(1 for v in self.warm if v > threshold_ms)
+        return slow + self.timeouts
+
+    def failed(self, threshold_ms: float = WORKER_TIMEOUT_MS) -> int:
+        """Requests the delivery worker would count as failed deliveries."""
+        return self.over(threshold_ms) + self.server_errors
+
+    def cold_summary(self) -> Dict[str, float]:
+        return summarize(self.cold)
+
+    def warm_summary(self) -> Dict[str, float]:
+        return summarize(self.warm, percentiles=(50, 90, 99))
+
+class EndpointBenchmark:
+    """Closed-loop benchmark: `concurrency` workers, one connection each."""
+
+    def __init__(self, url: str, payload_type: str = 'mixed', concurrency: int = 1,
+                 timeout: float = WORKER_TIMEOUT_MS / 1000, seed: Optional[int] = None):
+        self.url = url
+        self.payload_type = payload_type
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.seed = seed
+
+    def run(self, requests_count: int, warmup: int = 5,
+            on_progress: Optional[Callable[[BenchResult], None]] = None) -> BenchResult:
+        """Send `requests_count` measured requests after `warmup` discarded ones."""
+        result = BenchResult()
+        remaining = {'warmup': max(0, warmup), 'measured': max(0, requests_count)}
+        claim_lock = threading.Lock()
+
+        def claim() -> Optional[str]:
+            with claim_lock:
+                for kind in ('warmup', 'measured'):
+                    if remaining[kind] > 0:
+                        remaining[kind] -= 1
+                        return kind
+            return None
+
+        def worker(index: int) -> None:
+            rng = random.Random(None if self.seed is None else self.seed + index)
+            session = build_session(pool_size=1, max_retries=0)
+            first = True
+            reconnect = False
+            try:
+                while True:
+                    # The first request on each worker's connection is extra
+                    # and always cold; it does not use up a warmup or measured slot
+                    kind: Optional[str]
+                    if first:
+                        if not remaining['warmup'] and not remaining['measured']:
+                            return
+                        kind = 'cold'
+                    else:
+                        kind = claim()
+                        if kind is None:
+                            return
+                    payload = make_payload(self.payload_type, rng)
+                    start = time.perf_counter()
+                    error: Optional[str] = None
+                    timed_out = False
+                    try:
+                        response = session.post(self.url, json=payload, timeout=self.timeout)
+                        latency = (time.perf_counter() - start) * 1000
+                        status = str(response.status_code)
+                    except requests.exceptions.RequestException as e:
+                        latency = 0.0
+                        status = type(e).__name__
+                        error = status
+                        timed_out = isinstance(e, requests.exceptions.Timeout)
+                    with result.lock:
+                        result.status_codes[status] = result.status_codes.get(status, 0) + 1
+                        if error:
+                            result.errors[error] = result.errors.get(error, 0) + 1
+                            result.timeouts += timed_out
+                        elif kind == 'cold' or reconnect:
+                            # Requests after a transport error open a new connection
+                            result.cold.append(latency)
+                        elif kind == 'warmup':
+                            result.warmup += 1
+                        else:
+                            result.warm.append(latency)
+                    first = False
+                    reconnect = error is not None
+                    if on_progress:
+                        on_progress(result)
+            finally:
+                session.close()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='daraja-bench') as pool:
+            for future in [pool.submit(worker, i) for i in range(self.concurrency)]:
+                future.result()
+        result.finished = time.perf_counter()
+        return result
@@ -0,0 +1,211 @@
+"""
+Bulk operation engine
+
+Runs one API call per item through a bounded worker pool with a shared
+rate limit, per-item retries with backoff, and an append-only checkpoint
+of items that already succeeded.
+
+Calls may not be idempotent (a replay delivers a webhook again), so by
+default only failures the server cannot have acted on are retried.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TextIO
+
+from .api import APIError
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions per second."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate or 1)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available. No-op without a rate."""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+class Checkpoint:
+    """Append-only file of item ids that completed successfully."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.done: Set[str] = set()
+        self.lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        if path is not None and path.exists():
+            with open(path, 'r') as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.done
+
+    def mark(self, item: str) -> None:
+        if self.path is None:
+            return
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, 'a')
+            self._file.write(item + '\n')
+            self._file.flush()
+            self.done.add(item)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class BulkResult:
+    """Outcome of one item in a bulk run."""
+
+    __slots__ = ('item', 'ok', 'attempts', 'elapsed_ms', 'error', 'response')
+
+    def __init__(self, item: Any, ok: bool, attempts: int, elapsed_ms: float,
+                 error: Optional[str] = None, response: Any = None):
+        self.item = item
+        self.ok = ok
+        self.attempts = attempts
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+        self.response = response
+
+class BulkSummary:
+    """Running totals for a bulk run."""
+
+    def __init__(self, total: int = 0, skipped: int = 0):
+        self.total = total
+        self.skipped = skipped
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.started = time.perf_counter()
+        self.errors: Dict[str, int] = {}
+        self.failures: List[BulkResult] = []
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, result: BulkResult) -> None:
+        self.retries += result.attempts - 1
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+            self.failures.append(result)
+            key = result.error or 'Unknown error'
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+def is_retryable(error: APIError, retry_unsafe: bool = False) -> bool:
+    """Whether a failed call can be sent again.
+
+    Rate limiting (429) and connections that never opened are always safe.
+    Timeouts, dropped connections and 5xx responses may come after the
+    server already acted, so they are retried only with `retry_unsafe`.
+    """
+    code = getattr(error, 'status_code', None)
+    if code == 429 or getattr(error, 'not_sent', False):
+        return True
+    return retry_unsafe and (code is None or code >= 500)
+
+def _run_one(item: Any, fn: Callable[[Any], Any], limiter: RateLimiter,
+             retries: int, backoff: float, retry_unsafe: bool) -> BulkResult:
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        limiter.acquire()
+        try:
+            response = fn(item)
+            return BulkResult(item, True, attempt, (time.perf_counter() - start) * 1000, response=response)
+        except APIError as e:
+            if attempt > retries or not is_retryable(e, retry_unsafe):
+                return BulkResult(item, False, attempt, (time.perf_counter() - start) * 1000, error=str(e))
+            time.sleep(backoff * (2 ** (attempt - 1)))
+
+def run_bulk(
+    items: Iterable[Any],
+    fn: Callable[[Any], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    retry_unsafe: bool = False,
+    checkpoint: Optional[Checkpoint] = None,
+    summary: Optional[BulkSummary] = None,
+    on_result: Optional[Callable[[BulkResult, BulkSummary], None]] = None,
+) -> BulkSummary:
+    """Call `fn(item)` for every item using a bounded worker pool.
+
+    Items are submitted lazily, so at most `concurrency * 2` are in flight
+    and `items` may be a generator. Items already in the checkpoint are
+    skipped; successes are appended to it as they complete, including
+    calls still running when the run is interrupted.
+    """
+    summary = summary or BulkSummary()
+    limiter = RateLimiter(rate, burst=concurrency)
+    max_pending = max(1, concurrency) * 2
+    pending: Set['Future[BulkResult]'] = set()
+
+    def collect(done: Iterable['Future[BulkResult]']) -> None:
+        for future in done:
+            result = future.result()
+            if result.ok and checkpoint is not None:
+                checkpoint.mark(result.item)
+            summary.add(result)
+            if on_result:
+                on_result(result, summary)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='daraja-bulk') as pool:
+        try:
+            for item in items:
+                if checkpoint is not None and item in checkpoint:
+                    summary.skipped += 1
+                    continue
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(_run_one, item, fn, limiter, retries, backoff, retry_unsafe))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        except KeyboardInterrupt:
+            for future in pending:
+                future.cancel()
+            # Calls already running still complete; checkpoint them so a
+            # resumed run does not send them twice
+            collect(wait([f for f in pending if not f.cancelled()])[0])
+            raise
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+    return summary
@@ -0,0 +1,246 @@
+"""
+Local SQLite cache of webhook delivery logs
+
+Logs are synced incrementally with the cursor iterator and stored under
+~/.daraja/logs.db, so history and log queries are answered locally and
+still work offline.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .api import DarajaAPI, log_cursor
+from .config import get_config_dir
+from .records import DeliveryLog
+from .times import parse_timestamp
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ROWS = 1_000_000
+SYNC_PAGE_SIZE = 500
+INSERT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    profile TEXT NOT NULL,
+    webhook_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    environment TEXT,
+    status TEXT,
+    response_code INTEGER,
+    duration_ms INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (profile, webhook_id)
+);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs (profile, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_env_ts ON logs (profile, environment, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_status_ts ON logs (profile, status, ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    profile TEXT PRIMARY KEY,
+    cursor TEXT,
+    last_sync REAL
+);
+"""
+
+class CacheError(Exception):
+    """Log cache related errors"""
+    pass
+
+def get_cache_file() -> Path:
+    """Get the log cache database path."""
+    return get_config_dir() / 'logs.db'
+
+class LogCache:
+    """SQLite-backed, per-profile cache of webhook delivery logs."""
+
+    def __init__(
+        self,
+        profile: str = 'default',
+        path: Optional[Path] = None,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_rows: int = DEFAULT_MAX_ROWS,
+    ):
+        self.profile = profile
+        self.path = path or get_cache_file()
+        self.ttl_days = ttl_days
+        self.max_rows = max_rows
+        try:
+            # Rows keep the full log JSON, so keep the file private like config.json
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            os.chmod(self.path, 0o600)
+            self.conn = sqlite3.connect(str(self.path))
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise CacheError(f"Failed to open log cache: {e}")
+
+    @classmethod
+    def for_config(cls, config: Dict[str, Any]) -> 'LogCache':
+        """Build a cache for a loaded profile, honouring its cache settings."""
+        return cls(
+            profile=config.get('profile') or 'default',
+            ttl_days=config.get('log_cache_ttl_days', DEFAULT_TTL_DAYS),
+            max_rows=config.get('log_cache_max_rows', DEFAULT_MAX_ROWS),
+        )
+
+    def __enter__(self) -> 'LogCache':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get_cursor(self) -> Optional[str]:
+        row = self.conn.execute(
+            'SELECT cursor FROM sync_state WHERE profile = ?', (self.profile,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def last_sync(self) -> Optional[float]:
+        row = self.conn.execute(
+            'SELECT last_sync FROM sync_state WHERE profile = ?', (self.profile,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, api: DarajaAPI) -> int:
+        """Fetch logs newer than the stored cursor; returns rows written.
+
+        The first sync only reaches back as far as the TTL window.
+        """
+        cursor = self.get_cursor()
+        since = None
+        if cursor is None:
+            since = (datetime.now(timezone.utc) - timedelta(days=self.ttl_days)).isoformat(timespec='seconds')
+        pager = api.iter_webhook_logs(after=cursor, since=since, page_size=SYNC_PAGE_SIZE)
+
+        written = 0
+        batch: List[Dict[str, Any]] = []
+        for log in pager:
+            batch.append(log)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                written += self._insert(batch, pager.cursor)
+                batch = []
+        written += self._insert(batch, pager.cursor)
+        self.evict()
+        return written
+
+    def add(self, logs: Iterable[Dict[str, Any]]) -> int:
+        """Insert logs without touching the sync cursor."""
+        return self._insert(list(logs), None)
+
+    def _insert(self, logs: List[Dict[str, Any]], cursor: Optional[str]) -> int:
+        rows = []
+        for log in logs:
+            webhook_id = log_cursor(log)
+            if webhook_id is None:
+                continue
+            rows.append((
+                self.profile,
+                webhook_id,
+                parse_timestamp(log.get('timestamp')),
+                log.get('environment'),
+                log.get('status'),
+                log.get('response_code'),
+                log.get('duration_ms'),
+                json.dumps(log, separators=(',', ':')),
+            ))
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            written = self.conn.total_changes - before
+            if cursor is not None:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)',
+                    (self.profile, cursor, time.time()),
+                )
+        return written
+
+    def query_records(
+        self,
+        limit: int = 50,
+        environment: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> List[DeliveryLog]:
+        """Return cached logs, newest first, built from the indexed columns without decoding JSON."""
+        where, params = self._filters(environment, status, since)
+        sql = (f'SELECT webhook_id, ts, environment, status, response_code, duration_ms '
+               f'FROM logs WHERE {where} ORDER BY ts DESC LIMIT ?')
+        return [
+            DeliveryLog(webhook_id, round(ts * 1000), env, state, code, duration)
+            for webhook_id, ts, env, state, code, duration in self.conn.execute(sql, params + [limit])
+        ]
+
+    def _filters(self, environment: Optional[str], status: Optional[str],
+                 since: Optional[str]) -> Tuple[str, List[Any]]:
+        where = 'profile = ?'
+        params: List[Any] = [self.profile]
+        if environment:
+            where += ' AND environment = ?'
+            params.append(environment)
+        if status:
+            where += ' AND status = ?'
+            params.append(status)
+        if since:
+            where += ' AND ts >= ?'
+            params.append(parse_timestamp(since))
+        return where, params
+
+    def scan(self, since: Optional[float] = None, until: Optional[float] = None,
+             batch_size: int = 10000) -> Iterator[List[Tuple[Any, ...]]]:
+        """Yield batches of (ts, environment, status, response_code, duration_ms) rows.
+
+        Reads the indexed columns only, so aggregations skip decoding the
+        stored JSON.
+        """
+        sql = ('SELECT ts, environment, status, response_code, duration_ms '
+               'FROM logs WHERE profile = ?')
+        params: List[Any] = [self.profile]
+        if since is not None:
+            sql += ' AND ts >= ?'
+            params.append(since)
+        if until is not None:
+            sql += ' AND ts < ?'
+            params.append(until)
+        cursor = self.conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+    def count(self) -> int:
+        row = self.conn.execute('SELECT COUNT(*) FROM logs WHERE profile = ?', (self.profile,)).fetchone()
+        return int(row[0])
+
+    def evict(self) -> int:
+        """Drop rows past the TTL, then the oldest rows beyond max_rows."""
+        removed = 0
+        with self.conn:
+            cutoff = time.time() - self.ttl_days * 86400
+            removed += self.conn.execute(
+                'DELETE FROM logs WHERE profile = ? AND ts < ?', (self.profile, cutoff)
+            ).rowcount
+            excess = self.count() - self.max_rows
+            if excess > 0:
+                removed += self.conn.execute(
+                    'DELETE FROM logs WHERE rowid IN ('
+                    'SELECT rowid FROM logs WHERE profile = ? ORDER BY ts ASC LIMIT ?)',
+                    (self.profile, excess),
+                ).rowcount
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached log and the sync cursor for this profile."""
+        with self.conn:
+            self.conn.execute('DELETE FROM logs WHERE profile = ?', (self.profile,))
+            self.conn.execute('DELETE FROM sync_state WHERE profile = ?', (self.profile,))
@@ -0,0 +1,39 @@
+"""
+Terminal charts
+
+Sparklines drawn with Unicode block characters, so a series of any length
+fits in one table cell.
+"""
+
+from typing import List, Optional, Sequence
+
+BLOCKS = "▁▂▃▄▅▆▇█"
+
+def resample(values: Sequence[float], width: int) -> List[float]:
+    """Shrink a series to at most `width` points, keeping each bucket's peak.
+
+    Peaks are what matter in a queue depth chart; averaging would hide a
+    backlog that came and went between two samples.
+    """
+    if width <= 0 or len(values) <= width:
+        return list(values)
+    step = len(values) / width
+    return [max(values[int(i * step):max(int(i * step) + 1, int((i + 1) * step))]) for i in range(width)]
+
+def sparkline(values: Sequence[float], width: Optional[int] = None,
+              low: Optional[float] = None, high: Optional[float] = None) -> str:
+    """Draw a series as block characters, scaled between `low` and `high`.
+
+    The scale defaults to the series' own range; a flat series is drawn at
+    the bottom, or at mid height when it is not zero.
+    """
+    if not values:
+        return ''
+    points = resample(values, width) if width else list(values)
+    low = min(points) if low is None else low
+    high = max(points) if high is None else high
+    if high <= low:
+        return BLOCKS[len(BLOCKS) // 2 if high else 0] * len(points)
+    scale = (len(BLOCKS) - 1) / (high - low)
+    top = len(BLOCKS) - 1
+    return ''.join(BLOCKS[min(top, max(0, int(round((v - low) * scale))))] for v in points)
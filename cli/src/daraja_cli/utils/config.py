@@ -2,53 +2,282 @@
 Configuration management utilities
 """
 
+import copy
 import json
 import os
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-try:
-    import keyring
-except ImportError:
-    keyring = None  # type: ignore
+from typing import Callable, Dict, Any, Iterator, Optional, List, Tuple
+
+# keyring takes tens of milliseconds to import (it discovers backends), so it
+# is only imported by the first call that touches credentials
+_keyring: Any = None
+_keyring_loaded = False
+
+def get_keyring() -> Any:
+    """Return the keyring module, or None if it is not installed."""
+    global _keyring, _keyring_loaded
+    if not _keyring_loaded:
+        try:
+            import keyring
+            _keyring = keyring
+        except ImportError:
+            _keyring = None
+        _keyring_loaded = True
+    return _keyring
 
 class ConfigError(Exception):
     """Configuration related errors"""
     pass
 
+_config_dirs: Dict[Path, Path] = {}
+
 def get_config_dir() -> Path:
     """Get the configuration directory path."""
-    config_dir = Path.home() / '.daraja'
-    config_dir.mkdir(exist_ok=True)
+    home = Path.home()
+    config_dir = _config_dirs.get(home)
+    if config_dir is None:
+        config_dir = home / '.daraja'
+        config_dir.mkdir(exist_ok=True)
+        _config_dirs[home] = config_dir
     return config_dir
 
 def get_config_file() -> Path:
     """Get the configuration file path."""
     return get_config_dir() / 'config.json'
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+    import msvcrt
+
+LOCK_TIMEOUT = 10.0
+
+@contextmanager
+def _file_lock(path: Path, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+    """Hold an exclusive advisory lock on `path` (flock, or msvcrt on Windows)."""
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            return
+        # LK_NBLCK fails at once if the byte is held; poll until the timeout
+        deadline = time.monotonic() + timeout
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise ConfigError("Timed out waiting for the configuration lock")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _atomic_write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Write JSON to a temp file, fsync it and rename it over `path`."""
+    fd, tmp = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Persist the rename itself
+        dir_fd = os.open(str(path.parent), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+Mutator = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+class ConfigStore:
+    """In-process cache of config.json.
+
+    The file is parsed once and re-read only when its mtime, size or inode
+    changes, so a command that calls several config helpers reads it once.
+    Callers always get a deep copy, so mutating a result never leaks into
+    the cache.
+
+    Writes are read-modify-write: under an advisory lock the current file is
+    re-read, the change is applied to it, and the result is written
+    atomically. Concurrent CLI processes therefore never tear the file or
+    drop each other's changes. Changes made inside `batch()` are applied to
+    an in-memory view and written under a single lock at the end.
+    """
+
+    def __init__(self) -> None:
+        self._path: Optional[Path] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._batch_depth = 0
+        self._pending: List[Mutator] = []
+        self._view: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _load(self, path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, 'r') as f:
+                data: Dict[str, Any] = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"Invalid configuration file: {e}")
+        except Exception as e:
+            raise ConfigError(f"Failed to load configuration: {e}")
+        return data
+
+    def read(self, missing_message: str = "Configuration file not found.") -> Dict[str, Any]:
+        """Return the parsed config file, re-reading it only if it changed."""
+        if self._view is not None:
+            return copy.deepcopy(self._view)
+        path = get_config_file()
+        stamp = self._stat(path)
+        if stamp is None:
+            self.invalidate()
+            raise ConfigError(missing_message)
+        if self._data is None or stamp != self._stamp or path != self._path:
+            data = self._load(path)
+            self._path, self._data, self._stamp = path, data, stamp
+        return copy.deepcopy(self._data)
+
+    def update(self, mutator: Mutator) -> None:
+        """Apply `mutator` to the current config and save it.
+
+        The mutator gets the latest config (an empty dict if there is none)
+        and either edits it in place or returns a replacement.
+        """
+        if self._batch_depth:
+            if self._view is None:
+                try:
+                    self._view = self.read()
+                except ConfigError:
+                    self._view = {}
+            self._view = _apply(mutator, self._view)
+            self._pending.append(mutator)
+            return
+        self._commit([mutator])
+
+    def write(self, data: Dict[str, Any]) -> None:
+        """Replace the whole config."""
+        snapshot = copy.deepcopy(data)
+        self.update(lambda _: copy.deepcopy(snapshot))
+
+    def _commit(self, mutators: List[Mutator]) -> None:
+        path = get_config_file()
+        try:
+            with _file_lock(path.with_name('config.lock')):
+                # Always re-read under the lock; the cached copy may be stale
+                data = self._load(path) if path.exists() else {}
+                for mutator in mutators:
+                    data = _apply(mutator, data)
+                _atomic_write_json(path, data)
+        except ConfigError:
+            self.invalidate()
+            raise
+        except Exception as e:
+            self.invalidate()
+            raise ConfigError(f"Failed to save configuration: {e}")
+        self._path, self._data, self._stamp = path, data, self._stat(path)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group several changes into one locked write."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                pending, self._pending, self._view = self._pending, [], None
+                if pending:
+                    self._commit(pending)
+
+    def invalidate(self) -> None:
+        """Forget the cached copy; the next read goes to disk."""
+        self._path = self._data = self._stamp = None
+
+def _apply(mutator: Mutator, data: Dict[str, Any]) -> Dict[str, Any]:
+    result = mutator(data)
+    return data if result is None else result
+
+_store = ConfigStore()
+
+def config_batch() -> Any:
+    """Context manager that coalesces config writes into one."""
+    return _store.batch()
+
+# Memoized keyring lookups, per process: profile name -> API key
+_credentials: Dict[str, Optional[str]] = {}
+
+def _require_keyring() -> Any:
+    keyring = get_keyring()
+    if not keyring:
+        raise ConfigError("Secure storage (keyring) is not available. Please install 'keyring'.")
+    return keyring
+
+def get_credential(profile_name: str) -> Optional[str]:
+    """Return the API key stored for a profile."""
+    if profile_name not in _credentials:
+        _credentials[profile_name] = _require_keyring().get_password('daraja-cli', profile_name)
+    return _credentials[profile_name]
+
+def set_credential(profile_name: str, api_key: str) -> None:
+    """Store the API key for a profile."""
+    _require_keyring().set_password('daraja-cli', profile_name, api_key)
+    _credentials[profile_name] = api_key
+
+def delete_credential(profile_name: str) -> None:
+    """Remove the API key stored for a profile."""
+    _credentials.pop(profile_name, None)
+    keyring = get_keyring()
+    if keyring:
+        keyring.delete_password('daraja-cli', profile_name)
+
 def load_config() -> Dict[str, Any]:
     """Load configuration from file."""
-    config_file = get_config_file()
-    
-    if not config_file.exists():
-        raise ConfigError("Configuration file not found. Run 'daraja login' first.")
-    
-    try:
-        with open(config_file, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        raise ConfigError(f"Invalid configuration file: {e}")
-    except Exception as e:
-        raise ConfigError(f"Failed to load configuration: {e}")
+    return _store.read("Configuration file not found. Run 'daraja login' first.")
 
 def save_config(config: Dict[str, Any]) -> None:
-    """Save configuration to file."""
-    config_file = get_config_file()
-    
-    try:
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        raise ConfigError(f"Failed to save configuration: {e}")
+    """Save configuration to file.
+
+    A profile returned by load_profile() is merged back into its entry under
+    'profiles' (credentials stay in the keyring); anything else replaces the
+    whole file.
+    """
+    name = config.get('profile')
+    if not name:
+        _store.write(config)
+        return
+    data = {k: v for k, v in config.items() if k not in ('api_key', 'profile')}
+
+    def merge(all_conf: Dict[str, Any]) -> None:
+        all_conf.setdefault('profiles', {})[name] = copy.deepcopy(data)
+        all_conf.setdefault('current_profile', name)
+    _store.update(merge)
 
 def get_config_value(key: str, default: Any = None) -> Any:
     """Get a specific configuration value."""
@@ -60,48 +289,34 @@ def get_config_value(key: str, default: Any = None) -> Any:
 
 def set_config_value(key: str, value: Any) -> None:
     """Set a specific configuration value."""
-    try:
-        config = load_config()
-    except ConfigError:
-        config = {}
-    
-    config[key] = value
-    save_config(config)
+    _store.update(lambda config: config.__setitem__(key, value))
 
 def clear_config() -> None:
     """Clear all configuration."""
+    # Read the profile names before the file goes away
+    try:
+        names = list_profiles()
+    except ConfigError:
+        names = []
     config_file = get_config_file()
-    if config_file.exists():
-        config_file.unlink()
-    # Remove all stored credentials for all profiles
+    with _file_lock(config_file.with_name('config.lock')):
+        if config_file.exists():
+            config_file.unlink()
+    _store.invalidate()
     # Remove all stored credentials for all profiles
-    if keyring:
+    for name in names:
         try:
-            all_conf = load_all_config()
-            for name in all_conf.get('profiles', {}):
-                keyring.delete_password('daraja-cli', name)
-        except ConfigError:
+            delete_credential(name)
+        except Exception:
             pass
 
 def load_all_config() -> Dict[str, Any]:
     """Load the entire configuration including all profiles."""
-    config_file = get_config_file()
-    if not config_file.exists():
-        raise ConfigError("Configuration file not found.")
-    try:
-        with open(config_file, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        raise ConfigError(f"Failed to load configuration: {e}")
+    return _store.read()
 
 def save_all_config(all_conf: Dict[str, Any]) -> None:
     """Save the entire configuration including all profiles."""
-    config_file = get_config_file()
-    try:
-        with open(config_file, 'w') as f:
-            json.dump(all_conf, f, indent=2)
-    except Exception as e:
-        raise ConfigError(f"Failed to save configuration: {e}")
+    _store.write(all_conf)
 
 def list_profiles() -> List[str]:
     """Return a list of saved profile names."""
@@ -111,50 +326,42 @@ def list_profiles() -> List[str]:
 def get_current_profile_name() -> str:
     """Return the name of the currently active profile."""
     all_conf = load_all_config()
-    return all_conf.get('current_profile', 'default')
+    return str(all_conf.get('current_profile', 'default'))
 
 def switch_profile(profile_name: str) -> None:
     """Switch active profile to the given name."""
-    all_conf = load_all_config()
-    if profile_name not in all_conf.get('profiles', {}):
-        raise ConfigError(f"Profile '{profile_name}' not found.")
-    all_conf['current_profile'] = profile_name
-    save_all_config(all_conf)
+    def switch(all_conf: Dict[str, Any]) -> None:
+        if profile_name not in all_conf.get('profiles', {}):
+            raise ConfigError(f"Profile '{profile_name}' not found.")
+        all_conf['current_profile'] = profile_name
+
+    load_all_config()  # a missing file is reported as such
+    _store.update(switch)
 
 def load_profile(profile_name: Optional[str] = None) -> Dict[str, Any]:
     """Load a single profile, including credentials."""
     all_conf = load_all_config()
     name = profile_name or all_conf.get('current_profile')
     profiles = all_conf.get('profiles', {})
-    if name not in profiles:
+    if name is None or name not in profiles:
         raise ConfigError(f"Profile '{name}' not found.")
-    data = profiles[name].copy()
+    data: Dict[str, Any] = profiles[name]
     # retrieve api_key from secure store
-    if keyring:
-        api_key = keyring.get_password('daraja-cli', name)
-    else:
-        raise ConfigError("Secure storage (keyring) is not available. Please install 'keyring'.")
-    data['api_key'] = api_key
+    data['api_key'] = get_credential(name)
     data['profile'] = name
     return data
 
 def save_profile(profile_name: str, config: Dict[str, Any]) -> None:
     """Save a single profile, storing credentials securely."""
-    try:
-        all_conf = load_all_config()
-    except ConfigError:
-        all_conf = {'profiles': {}, 'current_profile': profile_name}
-    profiles = all_conf.get('profiles', {})
     # store api_key securely
     api_key = config.pop('api_key', None)
     if api_key is not None:
-        if keyring:
-            keyring.set_password('daraja-cli', profile_name, api_key)
-        else:
-            raise ConfigError("Secure storage (keyring) is not available. Please install 'keyring'.")
-    # save metadata
-    profiles[profile_name] = config.copy()
-    all_conf['profiles'] = profiles
-    all_conf['current_profile'] = profile_name
-    save_all_config(all_conf)
+        set_credential(profile_name, api_key)
+    # save metadata, merged into whatever other processes have written
+    metadata = copy.deepcopy(config)
+
+    def merge(all_conf: Dict[str, Any]) -> None:
+        all_conf.setdefault('profiles', {})[profile_name] = metadata
+        all_conf['current_profile'] = profile_name
+    _store.update(merge)
     # Optionally clear profiles in secure store (e.g., keyring) if implemented
@@ -0,0 +1,125 @@
+"""
+Callback payload corpora
+
+Streams recorded callback payloads from a JSON file, a JSONL file or a
+directory of either, one entry at a time, so corpora of any size can be
+replayed through the test-webhook endpoint. Records written by
+`daraja listen --record` are unwrapped to their payload.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .stats import summarize
+
+CORPUS_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+
+class CorpusEntry:
+    """One payload and where it came from."""
+
+    __slots__ = ('id', 'payload')
+
+    def __init__(self, entry_id: str, payload: Any):
+        self.id = entry_id
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return self.id
+
+def is_corpus(path: Path) -> bool:
+    """True for inputs that hold many payloads (directories and JSONL files)."""
+    return path.is_dir() or path.suffix in ('.jsonl', '.ndjson')
+
+def unwrap_record(record: Any) -> Any:
+    """Return the callback from a `daraja listen --record` line, else the record itself."""
+    if isinstance(record, dict) and 'payload' in record and 'event_type' in record:
+        return record['payload']
+    return record
+
+class CorpusReader:
+    """Iterates payloads from a file or directory, collecting parse errors."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.invalid: List[Tuple[str, str]] = []
+
+    def files(self) -> List[Path]:
+        if self.path.is_dir():
+            return sorted(p for p in self.path.rglob('*') if p.is_file() and p.suffix in CORPUS_SUFFIXES)
+        return [self.path]
+
+    def count(self) -> int:
+        """Cheap upper bound on the number of entries, for progress bars."""
+        total = 0
+        for file in self.files():
+            if file.suffix == '.json':
+                total += 1
+                continue
+            with open(file, 'rb') as f:
+                total += sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+        return total
+
+    def iter_raw(self) -> Iterator[Tuple[str, str]]:
+        """Yield (entry id, unparsed JSON text), leaving parsing to the caller."""
+        base = self.path if self.path.is_dir() else self.path.parent
+        for file in self.files():
+            name = str(file.relative_to(base))
+            if file.suffix == '.json':
+                with open(file, 'r') as f:
+                    yield name, f.read()
+                continue
+            with open(file, 'r') as f:
+                for line_no, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{name}:{line_no}", line
+
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        base = self.path if self.path.is_dir() else self.path.parent
+        for file in self.files():
+            name = str(file.relative_to(base))
+            if file.suffix == '.json':
+                try:
+                    with open(file, 'r') as f:
+                        yield CorpusEntry(name, unwrap_record(json.load(f)))
+                except (OSError, ValueError) as e:
+                    self.invalid.append((name, str(e)))
+                continue
+            with open(file, 'r') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    entry_id = f"{name}:{line_no}"
+                    try:
+                        yield CorpusEntry(entry_id, unwrap_record(json.loads(line)))
+                    except ValueError as e:
+                        self.invalid.append((entry_id, str(e)))
+
+class DispatchStats:
+    """Thread-safe tally of test-webhook responses."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.statuses: Dict[str, int] = {}
+        self.response_codes: Dict[str, int] = {}
+        self.response_times: List[float] = []
+        self.round_trips: List[float] = []
+
+    def add(self, response: Optional[Dict[str, Any]], round_trip_ms: float) -> None:
+        response = response if isinstance(response, dict) else {}
+        with self.lock:
+            status = str(response.get('status', 'unknown'))
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            code = response.get('response_code')
+            if code is not None:
+                self.response_codes[str(code)] = self.response_codes.get(str(code), 0) + 1
+            if isinstance(response.get('response_time_ms'), (int, float)):
+                self.response_times.append(float(response['response_time_ms']))
+            self.round_trips.append(round_trip_ms)
+
+    def response_time_summary(self) -> Dict[str, float]:
+        return summarize(self.response_times)
+
+    def round_trip_summary(self) -> Dict[str, float]:
+        return summarize(self.round_trips)
@@ -0,0 +1,108 @@
+"""
+Live dashboard state for `monitor top`
+
+Deliveries are kept per environment in a rolling window of small time
+buckets, each holding counts and a latency sketch. The window is filled
+once from the API and then fed only with logs newer than the last cursor,
+so every refresh costs one small request however long the dashboard
+runs. Expired buckets simply fall off the front.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from .times import parse_timestamp
+from .metrics import Rollup
+
+DEFAULT_WINDOW = 300
+BUCKET_SECONDS = 10
+
+class RollingWindow:
+    """Deliveries for one environment over the last `window` seconds."""
+
+    def __init__(self, window: float = DEFAULT_WINDOW, bucket: float = BUCKET_SECONDS):
+        self.window = window
+        self.bucket = bucket
+        self.buckets: Deque[Tuple[float, Rollup]] = deque()
+        self.last_seen: Optional[float] = None
+
+    def add(self, ts: float, status: Optional[str], duration_ms: Any) -> None:
+        if self.last_seen is not None and ts < self.last_seen - self.window:
+            return  # already outside the window
+        start = ts - ts % self.bucket
+        # Logs arrive roughly in order, so the target is almost always the last bucket
+        for bucket_start, rollup in reversed(self.buckets):
+            if bucket_start == start:
+                break
+            if bucket_start < start:
+                rollup = self._insert(start)
+                break
+        else:
+            rollup = self._insert(start)
+        rollup.count += 1
+        if status == 'delivered':
+            rollup.delivered += 1
+        elif status == 'failed':
+            rollup.failed += 1
+        if isinstance(duration_ms, (int, float)) and duration_ms >= 0:
+            rollup.latency.add(duration_ms)
+        if self.last_seen is None or ts > self.last_seen:
+            self.last_seen = ts
+
+    def _insert(self, start: float) -> Rollup:
+        rollup = Rollup()
+        index = len(self.buckets)
+        while index and self.buckets[index - 1][0] > start:
+            index -= 1
+        self.buckets.insert(index, (start, rollup))
+        return rollup
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self.buckets and self.buckets[0][0] + self.bucket <= cutoff:
+            self.buckets.popleft()
+
+    def snapshot(self, now: float) -> Rollup:
+        """Everything still inside the window, merged."""
+        self.expire(now)
+        total = Rollup()
+        for _, rollup in self.buckets:
+            total.merge(rollup)
+        return total
+
+class DashboardState:
+    """Rolling per-environment windows plus the latest queue stats."""
+
+    def __init__(self, window: float = DEFAULT_WINDOW, bucket: float = BUCKET_SECONDS):
+        self.window = window
+        self.bucket = bucket
+        self.environments: Dict[str, RollingWindow] = {}
+        self.queue: Optional[Dict[str, Any]] = None
+        self.queue_error: Optional[str] = None
+        self.log_error: Optional[str] = None
+        self.updated: Optional[float] = None
+        # Bumped on every change, so the view only redraws when needed
+        self.version = 0
+
+    def ingest(self, logs: Iterable[Dict[str, Any]]) -> int:
+        """Add new delivery logs; returns how many were added."""
+        added = 0
+        for log in logs:
+            env = log.get('environment') or 'N/A'
+            window = self.environments.get(env)
+            if window is None:
+                window = self.environments[env] = RollingWindow(self.window, self.bucket)
+            window.add(parse_timestamp(log.get('timestamp')), log.get('status'), log.get('duration_ms'))
+            added += 1
+        if added:
+            self.version += 1
+        return added
+
+    def set_queue(self, stats: Optional[Dict[str, Any]], error: Optional[str] = None) -> None:
+        if stats != self.queue or error != self.queue_error:
+            self.version += 1
+        self.queue = stats if error is None else self.queue
+        self.queue_error = error
+
+    def rows(self, now: float) -> Dict[str, Rollup]:
+        return {env: window.snapshot(now) for env, window in sorted(self.environments.items())}
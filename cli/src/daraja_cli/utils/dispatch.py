@@ -0,0 +1,102 @@
+"""
+Sending callback corpora as test webhooks
+
+Shared by `daraja test webhook` and `daraja monitor test` when the payload
+is a corpus; kept apart from utils/corpus.py so the reader stays free of
+the rich output it would otherwise drag into worker processes.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional, TextIO
+
+from rich.console import Console
+from rich.table import Table
+
+from .api import DarajaAPI
+from .bulk import DEFAULT_CONCURRENCY, BulkResult, BulkSummary
+from .corpus import CorpusReader, DispatchStats
+from .progress import print_bulk_summary, run_bulk_with_progress
+from .stats import log_histogram
+
+console = Console()
+
+
+def send_corpus(api: DarajaAPI, environment: str, path: Path, concurrency: int = DEFAULT_CONCURRENCY,
+                rate: Optional[float] = None, retries: int = 0, results: Optional[TextIO] = None) -> None:
+    """Send every payload in a corpus as a test webhook and summarize the deliveries."""
+    reader = CorpusReader(path)
+    total = reader.count()
+    if not total:
+        console.print(f"[yellow]⚠️  No payloads found in {path}[/yellow]")
+        return
+    console.print(f"[bold blue]🧪 Sending up to {total:,} test webhooks to {environment}[/bold blue]")
+    console.print(f"[dim]Corpus:[/dim] {path}")
+
+    stats = DispatchStats()
+
+    def record(result: BulkResult, summary: BulkSummary) -> None:
+        if result.ok:
+            stats.add(result.response, result.elapsed_ms)
+        if results is not None:
+            response = result.response if isinstance(result.response, dict) else {}
+            results.write(json.dumps({
+                'id': str(result.item),
+                'ok': result.ok,
+                'attempts': result.attempts,
+                'round_trip_ms': round(result.elapsed_ms, 1),
+                'webhook_id': response.get('webhook_id'),
+                'status': response.get('status'),
+                'response_code': response.get('response_code'),
+                'response_time_ms': response.get('response_time_ms'),
+                'error': result.error,
+            }) + '\n')
+
+    try:
+        summary = run_bulk_with_progress(
+            reader, lambda entry: api.send_test_webhook(environment, entry.payload),
+            "Sending test webhooks", total=total,
+            concurrency=concurrency, rate=rate, retries=retries, on_result=record,
+        )
+    except KeyboardInterrupt:
+        console.print("\n[yellow]⏸️  Interrupted.[/yellow]")
+        return
+    finally:
+        if results is not None:
+            results.flush()
+
+    summary.skipped = len(reader.invalid)
+    print_bulk_summary(summary, "Test Webhook")
+    print_corpus_summary(stats, reader)
+
+
+def print_corpus_summary(stats: DispatchStats, reader: CorpusReader) -> None:
+    """Delivery statuses, response codes and the response-time distribution."""
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Delivery Status", style="dim")
+    table.add_column("Count", justify="right")
+    for status, count in sorted(stats.statuses.items(), key=lambda kv: -kv[1]):
+        table.add_row(status, f"{count:,}")
+    for code, count in sorted(stats.response_codes.items()):
+        table.add_row(f"HTTP {code}", f"{count:,}")
+    console.print(table)
+
+    times = stats.response_time_summary()
+    trips = stats.round_trip_summary()
+    if times['count']:
+        console.print(
+            f"[bold]Endpoint response time:[/bold] p50 {times['p50']:.0f}ms  p90 {times['p90']:.0f}ms  "
+            f"p99 {times['p99']:.0f}ms  max {times['max']:.0f}ms"
+        )
+        buckets = log_histogram(stats.response_times)
+        peak = max(count for _, _, count in buckets)
+        for low, high, count in buckets:
+            bar = "█" * max(1 if count else 0, round(count / peak * 40))
+            console.print(f"  {low:>9.1f} – {high:<9.1f}ms │ [cyan]{bar}[/cyan] {count}")
+    if trips['count']:
+        console.print(f"[dim]API round trip: p50 {trips['p50']:.0f}ms  p99 {trips['p99']:.0f}ms[/dim]")
+
+    if reader.invalid:
+        console.print(f"[yellow]⚠️  Skipped {len(reader.invalid):,} unparseable payload(s):[/yellow]")
+        for entry_id, error in reader.invalid[:5]:
+            console.print(f"  [dim]{entry_id}:[/dim] {error}")
@@ -0,0 +1,66 @@
+"""
+Dead-letter queue helpers
+
+Client-side filtering of DLQ jobs as they stream in page by page, and
+batching of job ids for the bulk retry endpoint.
+"""
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .api import DLQ_BULK_LIMIT
+from .times import parse_timestamp
+
+def job_added_at(job: Dict[str, Any]) -> float:
+    """When a job was moved to the DLQ, as epoch seconds (0 if unknown)."""
+    metadata = (job.get('data') or {}).get('metadata') or {}
+    return parse_timestamp(job.get('addedAt') or metadata.get('movedToDLQAt'))
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields worth showing for a job, flattened."""
+    data = job.get('data') or {}
+    metadata = data.get('metadata') or {}
+    original = data.get('originalJob') or {}
+    return {
+        'id': str(job.get('id')),
+        'added_at': job_added_at(job),
+        'error_category': metadata.get('lastErrorCategory') or 'unknown',
+        'event_type': metadata.get('eventType') or 'unknown',
+        'user_id': metadata.get('userId'),
+        'attempts': metadata.get('totalAttempts', original.get('attempts', 0)),
+        'error': original.get('failedReason') or '',
+    }
+
+def job_filter(event_type: Optional[str] = None, before: Optional[float] = None,
+               after: Optional[float] = None, contains: Optional[str] = None) -> Callable[[Dict[str, Any]], bool]:
+    """Build a predicate for the filters the server cannot apply itself."""
+    needle = contains.lower() if contains else None
+
+    def matches(job: Dict[str, Any]) -> bool:
+        summary = job_summary(job)
+        if event_type and summary['event_type'] != event_type:
+            return False
+        if before is not None and summary['added_at'] >= before:
+            return False
+        if after is not None and summary['added_at'] < after:
+            return False
+        if needle and needle not in summary['error'].lower():
+            return False
+        return True
+    return matches
+
+def filter_jobs(jobs: Iterable[Dict[str, Any]], predicate: Callable[[Dict[str, Any]], bool],
+                limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield matching jobs; stops pulling pages once `limit` match."""
+    matching = (job for job in jobs if predicate(job))
+    return islice(matching, limit) if limit else matching
+
+def batched(items: Iterable[str], size: int = DLQ_BULK_LIMIT) -> Iterator[List[str]]:
+    """Split ids into lists of at most `size` (capped at the server limit)."""
+    size = max(1, min(size, DLQ_BULK_LIMIT))
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
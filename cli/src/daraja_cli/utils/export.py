@@ -0,0 +1,218 @@
+"""
+Streaming export of webhook delivery logs
+
+Records flow from the cursor iterator straight into a writer, so memory
+stays flat however many records are exported. A checkpoint file next to
+the output stores the cursor and byte offset, letting an interrupted
+export resume exactly where it stopped.
+"""
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+from .times import parse_timestamp
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+DEFAULT_FIELDS = ['webhook_id', 'timestamp', 'environment', 'status', 'response_code', 'duration_ms']
+INTEGER_FIELDS = ('response_code', 'duration_ms')
+CHECKPOINT_EVERY = 1000
+PROGRESS_EVERY = 500
+PARQUET_ROW_GROUP = 50000
+
+class ExportError(Exception):
+    """Export related errors"""
+    pass
+
+def checkpoint_path(output: Path) -> Path:
+    """Checkpoint file kept next to the export output."""
+    return output.with_name(output.name + '.checkpoint.json')
+
+def load_checkpoint(output: Path) -> Optional[Dict[str, Any]]:
+    path = checkpoint_path(output)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            state: Dict[str, Any] = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ExportError(f"Invalid export checkpoint {path}: {e}")
+    return state
+
+def save_checkpoint(output: Path, state: Dict[str, Any]) -> None:
+    path = checkpoint_path(output)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+class ExportWriter(ABC):
+    """Base class for streaming record writers."""
+
+    checkpoint_every = CHECKPOINT_EVERY
+
+    def __init__(self, output: Path, fields: List[str]):
+        self.output = output
+        self.fields = fields
+
+    @abstractmethod
+    def open(self, resume_from: Optional[Dict[str, Any]]) -> None:
+        ...
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def flush(self) -> Dict[str, Any]:
+        """Make written records durable; returns writer state for the checkpoint."""
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+class _FileWriter(ExportWriter):
+    """Append-only text writer that checkpoints its byte offset."""
+
+    def open(self, resume_from: Optional[Dict[str, Any]]) -> None:
+        offset = (resume_from or {}).get('offset', 0)
+        mode = 'r+' if offset and self.output.exists() else 'w'
+        self.file = open(self.output, mode, newline='', encoding='utf-8')
+        if offset:
+            # Drop anything written after the last checkpoint
+            self.file.seek(offset)
+            self.file.truncate()
+        self.resumed = bool(offset)
+
+    def flush(self) -> Dict[str, Any]:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'offset': self.file.tell()}
+
+    def close(self) -> None:
+        self.file.close()
+
+class JsonlWriter(_FileWriter):
+    """One JSON object per line, all fields kept."""
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record, separators=(',', ':')))
+        self.file.write('\n')
+
+class CsvWriter(_FileWriter):
+    """CSV with a fixed column set."""
+
+    def open(self, resume_from: Optional[Dict[str, Any]]) -> None:
+        super().open(resume_from)
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fields, extrasaction='ignore')
+        if not self.resumed:
+            self.writer.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.writer.writerow(record)
+
+class ParquetWriter(ExportWriter):
+    """Columnar export as a directory of Parquet part files.
+
+    Rows are buffered per column up to one row group, then written as a
+    new part, so a resumed export just continues at the next part index.
+    """
+
+    checkpoint_every = PARQUET_ROW_GROUP
+
+    def open(self, resume_from: Optional[Dict[str, Any]]) -> None:
+        if pa is None:
+            raise ExportError("Parquet export requires 'pyarrow'. Install it with 'pip install pyarrow'.")
+        self.output.mkdir(parents=True, exist_ok=True)
+        self.part = (resume_from or {}).get('part', 0)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.columns: Dict[str, List[Any]] = {name: [] for name in self.fields}
+        self.rows = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        # Keep each column a single type so pyarrow can infer the schema
+        for name in self.fields:
+            value = record.get(name)
+            if value is not None and name not in INTEGER_FIELDS:
+                value = str(value)
+            self.columns[name].append(value)
+        self.rows += 1
+
+    def flush(self) -> Dict[str, Any]:
+        if self.rows:
+            table = pa.table(self.columns)
+            pq.write_table(table, str(self.output / f'part-{self.part:05d}.parquet'))
+            self.part += 1
+            self._reset()
+        return {'part': self.part}
+
+    def close(self) -> None:
+        # Rows buffered since the last checkpoint are refetched on resume
+        self._reset()
+
+def make_writer(fmt: str, output: Path, fields: Optional[List[str]] = None) -> ExportWriter:
+    """Create the writer for an export format."""
+    writers: Dict[str, Type[ExportWriter]] = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+    if fmt not in writers:
+        raise ExportError(f"Unsupported export format: {fmt}")
+    return writers[fmt](output, fields or DEFAULT_FIELDS)
+
+def until_filter(records: Iterable[Dict[str, Any]], until: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Stop an oldest-first record stream at the first entry after `until`."""
+    # Compared as instants: `until` carries a UTC offset, record timestamps may not
+    cutoff = parse_timestamp(until) if until else None
+    for record in records:
+        if cutoff is not None and parse_timestamp(record.get('timestamp')) > cutoff:
+            return
+        yield record
+
+def export_records(
+    pager: Any,
+    writer: ExportWriter,
+    state: Dict[str, Any],
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+    on_progress: Optional[Any] = None,
+) -> int:
+    """Stream records from a LogIterator into a writer with checkpoints.
+
+    `state` is the checkpoint dict; it is updated in place and saved every
+    `writer.checkpoint_every` records and once at the end. Returns records
+    written in this run.
+    """
+    written = 0
+    base_count = state.get('count', 0)
+    writer.open(state.get('writer'))
+    try:
+        for record in records if records is not None else pager:
+            writer.write(record)
+            written += 1
+            if written % writer.checkpoint_every == 0:
+                _checkpoint(pager, writer, state, base_count + written)
+            if on_progress and written % PROGRESS_EVERY == 0:
+                on_progress(base_count + written)
+        _checkpoint(pager, writer, state, base_count + written)
+        state['complete'] = True
+        save_checkpoint(writer.output, state)
+    finally:
+        writer.close()
+    if on_progress:
+        on_progress(state['count'])
+    return written
+
+def _checkpoint(pager: Any, writer: ExportWriter, state: Dict[str, Any], count: int) -> None:
+    state['writer'] = writer.flush()
+    state['cursor'] = pager.cursor
+    state['count'] = count
+    save_checkpoint(writer.output, state)
@@ -0,0 +1,231 @@
+"""
+Endpoint health probing
+
+Probes webhook endpoints over a raw socket so each phase (DNS, connect,
+TLS, time to first byte) can be timed separately. All endpoints are probed
+concurrently under one deadline, and results are cached for a short TTL.
+"""
+
+import json
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from .config import get_config_dir
+
+DEFAULT_PROBE_TIMEOUT = 5.0
+DEFAULT_CACHE_TTL = 30
+SLOW_THRESHOLD_MS = 2000
+
+STATE_ICONS = {'up': '🟢', 'degraded': '🟡', 'down': '🔴'}
+
+class ProbeResult:
+    """Outcome and phase timings of one endpoint probe."""
+
+    __slots__ = ('url', 'state', 'status_code', 'dns_ms', 'connect_ms', 'tls_ms',
+                 'ttfb_ms', 'total_ms', 'error', 'checked_at')
+
+    def __init__(self, url: str, state: str = 'down', status_code: Optional[int] = None,
+                 dns_ms: Optional[float] = None, connect_ms: Optional[float] = None,
+                 tls_ms: Optional[float] = None, ttfb_ms: Optional[float] = None,
+                 total_ms: Optional[float] = None, error: Optional[str] = None,
+                 checked_at: Optional[float] = None):
+        self.url = url
+        self.state = state
+        self.status_code = status_code
+        self.dns_ms = dns_ms
+        self.connect_ms = connect_ms
+        self.tls_ms = tls_ms
+        self.ttfb_ms = ttfb_ms
+        self.total_ms = total_ms
+        self.error = error
+        self.checked_at = checked_at if checked_at is not None else time.time()
+
+    @property
+    def icon(self) -> str:
+        return STATE_ICONS.get(self.state, '⚪')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProbeResult':
+        fields: Dict[str, Any] = {name: data.get(name) for name in cls.__slots__}
+        return cls(**fields)
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+def probe(url: str, timeout: float = DEFAULT_PROBE_TIMEOUT) -> ProbeResult:
+    """Probe one endpoint with a GET, timing each phase."""
+    result = ProbeResult(url)
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        result.error = 'Invalid URL'
+        return result
+
+    https = parsed.scheme == 'https'
+    host = parsed.hostname
+    port = parsed.port or (443 if https else 80)
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+
+    deadline = time.perf_counter() + timeout
+    start = time.perf_counter()
+    sock = None
+    try:
+        phase = time.perf_counter()
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        result.dns_ms = _elapsed_ms(phase)
+
+        # Try each address in turn, as socket.create_connection does, so a
+        # dead IPv6 route does not mark a dual-stack endpoint as down
+        phase = time.perf_counter()
+        for i, (family, socktype, proto, _, address) in enumerate(addresses):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(max(deadline - time.perf_counter(), 0.001))
+                sock.connect(address)
+                break
+            except OSError:
+                sock.close()
+                sock = None
+                if i == len(addresses) - 1 or time.perf_counter() >= deadline:
+                    raise
+        if sock is None:
+            raise OSError('No addresses to connect to')
+        result.connect_ms = _elapsed_ms(phase)
+
+        if https:
+            phase = time.perf_counter()
+            context = ssl.create_default_context()
+            sock.settimeout(max(deadline - time.perf_counter(), 0.001))
+            sock = context.wrap_socket(sock, server_hostname=host)
+            result.tls_ms = _elapsed_ms(phase)
+
+        host_header = host if parsed.port is None else f"{host}:{parsed.port}"
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {host_header}\r\n"
+            f"User-Agent: daraja-cli/0.1.0\r\nAccept: */*\r\nConnection: close\r\n\r\n"
+        )
+        phase = time.perf_counter()
+        sock.settimeout(max(deadline - time.perf_counter(), 0.001))
+        sock.sendall(request.encode('latin-1'))
+        first = sock.recv(1024)
+        result.ttfb_ms = _elapsed_ms(phase)
+        if not first:
+            raise ConnectionError('Connection closed without a response')
+
+        status_line = first.split(b'\r\n', 1)[0].decode('latin-1')
+        result.status_code = int(status_line.split(' ')[1])
+        result.total_ms = _elapsed_ms(start)
+        if result.status_code >= 500 or result.total_ms > SLOW_THRESHOLD_MS:
+            result.state = 'degraded'
+        else:
+            result.state = 'up'
+    except socket.gaierror as e:
+        result.error = f"DNS lookup failed: {e.strerror or e}"
+    except socket.timeout:
+        result.error = f"Timed out after {timeout:g}s"
+    except ssl.SSLError as e:
+        result.error = f"TLS error: {e.reason or e}"
+    except OSError as e:
+        result.error = e.strerror or str(e) or type(e).__name__
+    except (ValueError, IndexError):
+        result.error = 'Invalid HTTP response'
+    finally:
+        if sock is not None:
+            sock.close()
+    if result.total_ms is None:
+        result.total_ms = _elapsed_ms(start)
+    return result
+
+class HealthCache:
+    """Short-lived on-disk cache of probe results keyed by URL."""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_CACHE_TTL):
+        self.path = path or get_config_dir() / 'health.json'
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if ttl > 0 and self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @classmethod
+    def for_config(cls, config: Dict[str, Any]) -> 'HealthCache':
+        """Build a cache honouring the profile's `health_cache_ttl` setting."""
+        return cls(ttl=config.get('health_cache_ttl', DEFAULT_CACHE_TTL))
+
+    def get(self, url: str) -> Optional[ProbeResult]:
+        entry = self.entries.get(url)
+        if entry is None or time.time() - entry.get('checked_at', 0) > self.ttl:
+            return None
+        return ProbeResult.from_dict(entry)
+
+    def put(self, result: ProbeResult) -> None:
+        self.entries[result.url] = result.to_dict()
+
+    def save(self) -> None:
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        live = {url: e for url, e in self.entries.items() if now - e.get('checked_at', 0) <= self.ttl}
+        try:
+            fd, tmp = tempfile.mkstemp(prefix='.health-', suffix='.tmp', dir=str(self.path.parent))
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(live, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+def probe_all(urls: Iterable[str], timeout: float = DEFAULT_PROBE_TIMEOUT,
+              cache: Optional[HealthCache] = None, refresh: bool = False) -> Dict[str, ProbeResult]:
+    """Probe every URL concurrently; the whole call takes at most about one timeout."""
+    results: Dict[str, ProbeResult] = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = cache.get(url) if cache is not None and not refresh else None
+        if cached is not None:
+            results[url] = cached
+        else:
+            pending.append(url)
+
+    if pending:
+        # Daemon threads rather than an executor: DNS lookups cannot be
+        # interrupted, and stragglers must not hold up interpreter exit
+        probed: Dict[str, ProbeResult] = {}
+        threads = [
+            threading.Thread(target=lambda u=url: probed.__setitem__(u, probe(u, timeout)),
+                             name='daraja-health', daemon=True)
+            for url in pending
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + timeout + 0.5
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        for url in pending:
+            results[url] = probed.get(url) or ProbeResult(
+                url, error=f"Timed out after {timeout:g}s", total_ms=timeout * 1000)
+
+        if cache is not None:
+            for url in pending:
+                cache.put(results[url])
+            cache.save()
+    return results
@@ -0,0 +1,281 @@
+"""
+Persistent cache of API read responses
+
+User info, environments, status and metrics change rarely, so DarajaAPI
+keeps their responses in ~/.daraja/responses.db. A fresh entry is served
+without a request; a stale one is revalidated with If-None-Match /
+If-Modified-Since, and a 304 costs only the headers. A broken or locked
+cache file is treated as a miss, never as a failed command.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from .config import get_config_dir
+
+# Seconds a response is served without asking the server, per endpoint.
+# Override with the profile key `response_cache_ttl`, e.g. {"status": 0}.
+DEFAULT_TTLS = {
+    'user': 300,
+    'environments': 60,
+    'status': 10,
+    'metrics': 60,
+}
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    max_age REAL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_responses_profile ON responses (profile);
+"""
+
+def get_response_cache_file() -> Path:
+    """Get the response cache database path."""
+    return get_config_dir() / 'responses.db'
+
+def freshness(cache_control: Optional[str], ttl: float) -> Optional[float]:
+    """Seconds a response may be reused, or None if it must not be stored.
+
+    The server can shorten the endpoint TTL with max-age or no-cache, but
+    never lengthen it.
+    """
+    directives = {}
+    for part in (cache_control or '').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    try:
+        return min(ttl, float(directives['max-age']))
+    except (KeyError, ValueError):
+        return ttl
+
+class CachedResponse:
+    """A stored response body and its validators."""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'stored_at', 'fresh_for')
+
+    def __init__(self, body: Any, etag: Optional[str], last_modified: Optional[str],
+                 stored_at: float, fresh_for: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.fresh_for = fresh_for
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.stored_at + self.fresh_for
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers; empty if the server gave no validators."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """SQLite-backed, per-profile LRU cache of GET responses.
+
+    Keys hash the profile, API key and URL, so profiles and accounts never
+    see each other's entries. Entries are evicted least recently used first
+    once the stored bodies exceed `max_bytes`. Safe to share between the
+    threads of one client.
+    """
+
+    def __init__(
+        self,
+        profile: str = 'default',
+        api_key: str = '',
+        path: Optional[Path] = None,
+        ttls: Optional[Mapping[str, float]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.profile = profile
+        self.api_key = api_key
+        self.path = path or get_response_cache_file()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+        # Nothing stored by this process since the last invalidate()
+        self._clean = False
+        self._lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        try:
+            # Bodies include account details, so keep the file private like config.json
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            os.chmod(self.path, 0o600)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(SCHEMA)
+        except (OSError, sqlite3.Error):
+            self._disable()
+
+    @classmethod
+    def for_config(cls, config: Dict[str, Any]) -> 'ResponseCache':
+        """Build a cache for a loaded profile, honouring its cache settings."""
+        return cls(
+            profile=config.get('profile') or 'default',
+            api_key=config.get('api_key') or '',
+            ttls=config.get('response_cache_ttl'),
+            max_bytes=config.get('response_cache_max_bytes', DEFAULT_MAX_BYTES),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def _disable(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+        self.conn = None
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(f"{self.profile}\0{self.api_key}\0{url}".encode()).hexdigest()
+
+    def ttl(self, endpoint: str) -> float:
+        return float(self.ttls.get(endpoint, 0))
+
+    def get(self, url: str, ttl: float) -> Optional[CachedResponse]:
+        """The stored response for `url`, fresh or not; marks it recently used.
+
+        Freshness uses the endpoint TTL in effect now, capped by the max-age
+        the server sent with the response.
+        """
+        with self._lock:
+            if self.conn is None:
+                return None
+            key = self._key(url)
+            try:
+                row = self.conn.execute(
+                    'SELECT body, etag, last_modified, stored_at, max_age FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+                self.conn.commit()
+                body, etag, last_modified, stored_at, max_age = row
+                entry = CachedResponse(json.loads(body), etag, last_modified, stored_at,
+                                       ttl if max_age is None else min(ttl, max_age))
+            except (sqlite3.Error, ValueError):
+                self._disable()
+                return None
+        if entry.fresh:
+            self.hits += 1
+        return entry
+
+    def store(self, url: str, body: str, headers: Mapping[str, str]) -> None:
+        """Store a 200 response body, unless Cache-Control forbids it."""
+        max_age = freshness(headers.get('Cache-Control'), math.inf)
+        self.fetched += 1
+        if max_age is None:
+            return
+        now = time.time()
+        with self._lock:
+            if self.conn is None:
+                return
+            try:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO responses '
+                    '(key, profile, url, etag, last_modified, stored_at, max_age, accessed_at, size, body) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (self._key(url), self.profile, url, headers.get('ETag'), headers.get('Last-Modified'),
+                     now, None if max_age == math.inf else max_age, now, len(body), body),
+                )
+                self._evict(self.conn)
+                self.conn.commit()
+                self._clean = False
+            except sqlite3.Error:
+                self._disable()
+
+    def refresh(self, url: str, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Record a 304: the stored body is valid for another freshness period."""
+        self.revalidated += 1
+        max_age = freshness(headers.get('Cache-Control'), math.inf)
+        with self._lock:
+            if self.conn is None:
+                return
+            try:
+                if max_age is None:
+                    self.conn.execute('DELETE FROM responses WHERE key = ?', (self._key(url),))
+                else:
+                    # A 304 may carry updated validators
+                    self.conn.execute(
+                        'UPDATE responses SET stored_at = ?, max_age = ?, etag = ?, last_modified = ? WHERE key = ?',
+                        (time.time(), None if max_age == math.inf else max_age, headers.get('ETag') or entry.etag,
+                         headers.get('Last-Modified') or entry.last_modified, self._key(url)),
+                    )
+                self.conn.commit()
+            except sqlite3.Error:
+                self._disable()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+    def invalidate(self) -> int:
+        """Drop this profile's entries, e.g. after a write; returns rows removed."""
+        with self._lock:
+            if self.conn is None or self._clean:
+                return 0
+            try:
+                removed = self.conn.execute('DELETE FROM responses WHERE profile = ?', (self.profile,)).rowcount
+                self.conn.commit()
+            except sqlite3.Error:
+                self._disable()
+                return 0
+            self._clean = True
+            return removed
+
+    def usage(self) -> Dict[str, int]:
+        """Entry count and stored bytes for this profile."""
+        with self._lock:
+            if self.conn is None:
+                return {'entries': 0, 'bytes': 0}
+            try:
+                count, size = self.conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE profile = ?', (self.profile,)
+                ).fetchone()
+            except sqlite3.Error:
+                return {'entries': 0, 'bytes': 0}
+            return {'entries': count, 'bytes': size}
@@ -0,0 +1,169 @@
+"""
+Webhook load generator
+
+Fires synthetic M-Pesa callbacks at a target URL following an open-loop
+arrival schedule (constant, ramp or burst) with bounded concurrency, and
+records latency and status for every request.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from .api import build_session
+from .payloads import make_payload
+from .stats import summarize
+
+PROFILES = ('constant', 'ramp', 'burst')
+
+# A request starting later than this after its scheduled time counts as late,
+# meaning the concurrency limit (not the target) was the bottleneck
+LATE_THRESHOLD = 0.010
+
+def schedule(profile: str, rate: float, duration: float, ramp_to: Optional[float] = None,
+             burst_size: int = 50, burst_interval: float = 5.0) -> Iterator[float]:
+    """Yield send offsets in seconds from the start of the run.
+
+    constant: `rate` requests per second.
+    ramp: rate grows linearly from `rate` to `ramp_to` over the run.
+    burst: `burst_size` requests at once every `burst_interval` seconds,
+    on top of a `rate` baseline.
+    """
+    if profile == 'constant':
+        if rate <= 0:
+            return
+        count = int(rate * duration)
+        for i in range(count):
+            yield i / rate
+    elif profile == 'ramp':
+        end_rate = rate if ramp_to is None else ramp_to
+        t = 0.0
+        while t < duration:
+            yield t
+            current = rate + (end_rate - rate) * (t / duration)
+            t += 1.0 / max(current, 0.1)
+    elif profile == 'burst':
+        if burst_interval <= 0:
+            raise ValueError("burst_interval must be greater than 0")
+        baseline = schedule('constant', rate, duration) if rate > 0 else iter(())
+        bursts = (
+            b * burst_interval
+            for b in range(int(duration // burst_interval) + 1)
+            if b * burst_interval < duration
+            for _ in range(burst_size)
+        )
+        yield from _merge(baseline, bursts)
+    else:
+        raise ValueError(f"Unknown load profile: {profile}")
+
+def _merge(a: Iterator[float], b: Iterator[float]) -> Iterator[float]:
+    """Merge two ascending iterators."""
+    sentinel = float('inf')
+    x, y = next(a, sentinel), next(b, sentinel)
+    while x != sentinel or y != sentinel:
+        if x <= y:
+            yield x
+            x = next(a, sentinel)
+        else:
+            yield y
+            y = next(b, sentinel)
+
+class LoadResult:
+    """Thread-safe counters and latencies for a load run."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.ok = 0
+        self.errors = 0
+        self.late = 0
+        self.status_codes: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, status: str, ok: bool, latency_ms: float) -> None:
+        with self.lock:
+            self.sent += 1
+            if ok:
+                self.ok += 1
+            else:
+                self.errors += 1
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+            self.latencies.append(latency_ms)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rps(self) -> float:
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.sent * 100 if self.sent else 0.0
+
+    def latency_summary(self) -> Dict[str, float]:
+        with self.lock:
+            values = list(self.latencies)
+        return summarize(values)
+
+class LoadGenerator:
+    """Open-loop HTTP load generator for webhook callbacks."""
+
+    def __init__(self, url: str, payload_type: str = 'mixed', concurrency: int = 20,
+                 timeout: float = 30.0, seed: Optional[int] = None,
+                 session: Optional[requests.Session] = None):
+        self.url = url
+        self.payload_type = payload_type
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.session = session or build_session(pool_size=self.concurrency, max_retries=0)
+
+    def _send(self, payload: Dict[str, Any], result: LoadResult, slots: threading.Semaphore) -> None:
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            latency = (time.perf_counter() - start) * 1000
+            result.record(str(response.status_code), response.status_code < 400, latency)
+        except requests.exceptions.RequestException as e:
+            latency = (time.perf_counter() - start) * 1000
+            result.record(type(e).__name__, False, latency)
+        finally:
+            slots.release()
+
+    def run(self, offsets: Iterator[float], on_tick: Optional[Callable[[LoadResult], None]] = None,
+            tick_interval: float = 0.25) -> LoadResult:
+        """Send one request per offset; blocks until all responses arrive."""
+        result = LoadResult()
+        slots = threading.Semaphore(self.concurrency)
+        last_tick = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='daraja-load') as pool:
+            start = result.started
+            for offset in offsets:
+                # Build the payload before waiting so it costs no send time
+                payload = make_payload(self.payload_type, self.rng)
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                slots.acquire()
+                if time.perf_counter() - (start + offset) > LATE_THRESHOLD:
+                    result.late += 1
+                pool.submit(self._send, payload, result, slots)
+                now = time.perf_counter()
+                if on_tick and now - last_tick >= tick_interval:
+                    on_tick(result)
+                    last_tick = now
+        result.finished = time.perf_counter()
+        if on_tick:
+            on_tick(result)
+        return result
+
+    def close(self) -> None:
+        self.session.close()
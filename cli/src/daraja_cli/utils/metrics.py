@@ -0,0 +1,408 @@
+"""
+Local delivery metrics
+
+Aggregates cached or exported delivery logs on this machine, so any time
+window and any grouping can be answered without a backend endpoint. Logs
+are loaded into typed array columns (with environment and status
+dictionary-encoded), grouped by hour, day, environment, status and
+response code, and latency percentiles come from mergeable quantile
+sketches rather than sorted copies of every sample.
+
+The group-by runs on NumPy when it is installed. Without it, a pure
+Python pass over the same columns gives the same result.
+"""
+
+import csv
+import json
+import math
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None  # type: ignore
+
+from .cache import LogCache
+from .times import parse_timestamp
+from .stats import QuantileSketch
+
+GROUP_KEYS = ('hour', 'day', 'environment', 'status', 'code')
+SKETCH_ACCURACY = 0.01
+LOAD_BATCH_SIZE = 10000
+
+# Placeholders for a missing response code and duration
+NO_CODE = -1
+NO_DURATION = -1.0
+
+class MetricsError(Exception):
+    """Local metrics related errors"""
+    pass
+
+def _to_int(value: Any) -> int:
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return NO_CODE
+
+def _to_float(value: Any) -> float:
+    if value is None or value == '':
+        return NO_DURATION
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return NO_DURATION
+    return value if value >= 0 else NO_DURATION
+
+class LogColumns:
+    """Delivery logs held column-wise in compact typed arrays.
+
+    Environment and status are stored as small integer codes into
+    `labels`, so grouping compares ints instead of strings.
+    """
+
+    def __init__(self) -> None:
+        self.ts = array('d')
+        self.duration = array('d')  # NO_DURATION when unknown
+        self.code = array('q')  # NO_CODE when unknown
+        self.environment = array('q')
+        self.status = array('q')
+        self.labels: Dict[str, List[str]] = {'environment': [], 'status': []}
+        self.codes: Dict[str, Dict[Any, int]] = {'environment': {}, 'status': {}}
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def lookup(self, column: str, label: str) -> Optional[int]:
+        """Code of a string value, or None if no row has it."""
+        return self.codes[column].get(label)
+
+    def _encode(self, column: str, values: Iterable[Any], default: str) -> List[int]:
+        codes = self.codes[column]
+        labels = self.labels[column]
+        encoded = []
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                label = str(value) if value else default
+                code = codes.get(label)
+                if code is None:
+                    code = len(labels)
+                    labels.append(label)
+                    codes[label] = code
+                codes[value] = code
+            encoded.append(code)
+        return encoded
+
+    def extend_rows(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        """Append (ts, environment, status, response_code, duration_ms) rows."""
+        if not rows:
+            return
+        ts, environments, statuses, codes, durations = zip(*rows)
+        self.ts.extend(ts)
+        self.environment.extend(self._encode('environment', environments, 'N/A'))
+        self.status.extend(self._encode('status', statuses, 'unknown'))
+        self.code.extend([_to_int(c) for c in codes])
+        self.duration.extend([_to_float(d) for d in durations])
+
+    def extend_logs(self, logs: Iterable[Dict[str, Any]]) -> None:
+        """Append delivery log records as returned by the API or exported."""
+        batch: List[Tuple[Any, ...]] = []
+        for log in logs:
+            batch.append((
+                parse_timestamp(log.get('timestamp')),
+                log.get('environment'),
+                log.get('status'),
+                log.get('response_code'),
+                log.get('duration_ms'),
+            ))
+            if len(batch) >= LOAD_BATCH_SIZE:
+                self.extend_rows(batch)
+                batch = []
+        self.extend_rows(batch)
+
+    @classmethod
+    def from_cache(cls, cache: LogCache, since: Optional[float] = None,
+                   until: Optional[float] = None) -> 'LogColumns':
+        """Load the indexed columns of cached logs, without decoding their JSON."""
+        columns = cls()
+        for rows in cache.scan(since, until, batch_size=LOAD_BATCH_SIZE):
+            columns.extend_rows(rows)
+        return columns
+
+    @classmethod
+    def from_export(cls, path: Path) -> 'LogColumns':
+        """Load a `monitor export` output: JSONL, CSV, or a Parquet directory."""
+        columns = cls()
+        if path.is_dir():
+            if pq is None:
+                raise MetricsError("Reading Parquet exports requires 'pyarrow'. Install it with 'pip install pyarrow'.")
+            table = pq.read_table(str(path))
+            names = ('timestamp', 'environment', 'status', 'response_code', 'duration_ms')
+            data = [table.column(n).to_pylist() if n in table.column_names else [None] * table.num_rows
+                    for n in names]
+            data[0] = [parse_timestamp(v) for v in data[0]]
+            columns.extend_rows(list(zip(*data)))
+            return columns
+        try:
+            with open(path, 'r', newline='') as f:
+                if path.suffix == '.csv':
+                    columns.extend_logs(csv.DictReader(f))
+                else:
+                    columns.extend_logs(json.loads(line) for line in f if line.strip())
+        except (OSError, ValueError) as e:
+            raise MetricsError(f"Failed to read {path}: {e}")
+        return columns
+
+class Rollup:
+    """Delivery counts and latency sketch for one group."""
+
+    __slots__ = ('count', 'delivered', 'failed', 'latency')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.delivered = 0
+        self.failed = 0
+        self.latency = QuantileSketch(SKETCH_ACCURACY)
+
+    @property
+    def success_rate(self) -> float:
+        return self.delivered / self.count * 100 if self.count else 0.0
+
+    def merge(self, other: 'Rollup') -> None:
+        self.count += other.count
+        self.delivered += other.delivered
+        self.failed += other.failed
+        self.latency.merge(other.latency)
+
+class Aggregation:
+    """Rollups keyed by the group-by labels, plus the overall total."""
+
+    def __init__(self, group_by: Sequence[str], groups: Dict[Tuple[str, ...], Rollup],
+                 rows: int, elapsed: float, engine: str, total: Optional[Rollup] = None):
+        self.group_by = tuple(group_by)
+        self.groups = groups
+        self.rows = rows
+        self.elapsed = elapsed
+        self.engine = engine
+        if total is None:
+            total = Rollup()
+            for rollup in groups.values():
+                total.merge(rollup)
+        self.total = total
+
+    def sorted(self) -> List[Tuple[Tuple[str, ...], Rollup]]:
+        return sorted(self.groups.items())
+
+# Partial results are keyed by (hour bucket, environment, status, response
+# code). Dimensions that are not grouped on are zeroed, except status, which
+# falls back to its outcome so delivered/failed counts survive.
+RawKey = Tuple[int, int, int, int]
+
+OUTCOME_OTHER, OUTCOME_DELIVERED, OUTCOME_FAILED = 0, 1, 2
+
+def _outcomes(columns: LogColumns) -> List[int]:
+    """Outcome of every status code."""
+    outcome = {'delivered': OUTCOME_DELIVERED, 'failed': OUTCOME_FAILED}
+    return [outcome.get(label, OUTCOME_OTHER) for label in columns.labels['status']]
+
+def _aggregate_python(columns: LogColumns, since: float, until: float, environment: Optional[int],
+                      status: Optional[int], dims: Sequence[str]) -> Tuple[Dict[RawKey, Rollup], Optional[Rollup]]:
+    by_time = int('hour' in dims or 'day' in dims)
+    by_env = int('environment' in dims)
+    by_code = int('code' in dims)
+    status_key = list(range(len(columns.labels['status']))) if 'status' in dims else _outcomes(columns)
+
+    # Bucket durations per group first; each group's sketch is then fed
+    # distinct values with their counts instead of one sample at a time
+    samples: Dict[RawKey, List[float]] = {}
+    get = samples.get
+    for ts, env, st, code, duration in zip(columns.ts, columns.environment, columns.status,
+                                           columns.code, columns.duration):
+        if ts < since or ts >= until:
+            continue
+        if (environment is not None and env != environment) or (status is not None and st != status):
+            continue
+        key = (int(ts // 3600) * by_time, env * by_env, status_key[st], code * by_code)
+        values = get(key)
+        if values is None:
+            values = samples[key] = []
+        values.append(duration)
+
+    groups: Dict[RawKey, Rollup] = {}
+    for key, values in samples.items():
+        rollup = groups[key] = Rollup()
+        rollup.count = len(values)
+        for value, count in Counter(values).items():
+            if value >= 0:
+                rollup.latency.add(value, count)
+    return groups, None
+
+def _dense(column: Any) -> Tuple[Any, Any]:
+    """(distinct values, index of each row's value) for a NumPy column."""
+    values, index = np.unique(column, return_inverse=True)
+    return values, index.reshape(-1)
+
+def _aggregate_numpy(columns: LogColumns, since: float, until: float, environment: Optional[int],
+                     status: Optional[int], dims: Sequence[str]) -> Tuple[Dict[RawKey, Rollup], Optional[Rollup]]:
+    ts = np.frombuffer(columns.ts, dtype=np.float64)
+    env = np.frombuffer(columns.environment, dtype=np.int64)
+    st = np.frombuffer(columns.status, dtype=np.int64)
+    mask = (ts >= since) & (ts < until)
+    if environment is not None:
+        mask &= env == environment
+    if status is not None:
+        mask &= st == status
+    if not mask.any():
+        return {}, None
+    count = int(mask.sum())
+    zero = np.zeros(count, dtype=np.int64)
+    hours = (ts[mask] // 3600).astype(np.int64) if 'hour' in dims or 'day' in dims else zero
+    env = env[mask] if 'environment' in dims else zero
+    st = st[mask]
+    if 'status' not in dims:
+        st = np.asarray(_outcomes(columns), dtype=np.int64)[st]
+    codes = np.frombuffer(columns.code, dtype=np.int64)[mask] if 'code' in dims else zero
+    durations = np.frombuffer(columns.duration, dtype=np.float64)[mask]
+
+    # Fold all four dimensions into one int64 key per row, then one unique
+    # pass. Environment and status are already dense codes and need no sort.
+    dimensions = [_dense(hours), (np.arange(int(env.max()) + 1), env),
+                  (np.arange(int(st.max()) + 1), st), _dense(codes)]
+    key = zero
+    for distinct_values, index in dimensions:
+        key = key * len(distinct_values) + index
+    keys, group = np.unique(key, return_inverse=True)
+    group = group.reshape(-1)
+    n_groups = len(keys)
+    counts = np.bincount(group, minlength=n_groups)
+
+    # Latency sketches: bucket every sample at once, then count (group, bucket) pairs
+    valid = durations >= 0
+    values, value_group = durations[valid], group[valid]
+    positive = values > 0
+    sample_counts = np.bincount(value_group, minlength=n_groups)
+    zeros = np.bincount(value_group[~positive], minlength=n_groups)
+    totals = np.bincount(value_group, weights=values, minlength=n_groups)
+    lows = np.full(n_groups, np.inf)
+    highs = np.full(n_groups, -np.inf)
+    np.minimum.at(lows, value_group, values)
+    np.maximum.at(highs, value_group, values)
+    bucket_counts: List[Dict[int, int]] = [{} for _ in range(n_groups)]
+    if positive.any():
+        log_gamma = QuantileSketch(SKETCH_ACCURACY).log_gamma
+        buckets = np.ceil(np.log(values[positive]) / log_gamma).astype(np.int64)
+        bucket_base = int(buckets.min())
+        span = int(buckets.max()) - bucket_base + 1
+        pairs, pair_counts = np.unique(value_group[positive] * span + (buckets - bucket_base),
+                                       return_counts=True)
+        pair_groups = pairs // span
+        pair_buckets = (pairs % span + bucket_base).tolist()
+        pair_counts = pair_counts.tolist()
+        bounds = np.searchsorted(pair_groups, np.arange(n_groups + 1)).tolist()
+        for g in range(n_groups):
+            low, high = bounds[g], bounds[g + 1]
+            if low < high:
+                bucket_counts[g] = dict(zip(pair_buckets[low:high], pair_counts[low:high]))
+
+    # Decode each group key back into its dimension values
+    decoded = []
+    remainder = keys
+    for distinct_values, _ in reversed(dimensions):
+        remainder, index = np.divmod(remainder, len(distinct_values))
+        decoded.append(distinct_values[index].tolist())
+    code_keys, status_keys, env_keys, hour_keys = decoded
+
+    # The overall total in one pass too, rather than merging every group's sketch
+    total = Rollup()
+    if len(values):
+        overall: Dict[int, int] = {}
+        if positive.any():
+            distinct, distinct_counts = np.unique(buckets, return_counts=True)
+            overall = dict(zip(distinct.tolist(), distinct_counts.tolist()))
+        total.latency.add_buckets(overall, int(zeros.sum()), float(values.sum()),
+                                  float(values.min()), float(values.max()))
+
+    groups: Dict[RawKey, Rollup] = {}
+    for g in range(n_groups):
+        rollup = Rollup()
+        rollup.count = int(counts[g])
+        if sample_counts[g]:
+            rollup.latency.add_buckets(bucket_counts[g], int(zeros[g]), float(totals[g]),
+                                       float(lows[g]), float(highs[g]))
+        groups[(hour_keys[g], env_keys[g], status_keys[g], code_keys[g])] = rollup
+    return groups, total
+
+def _time_labels(hour: int, cache: Dict[int, Tuple[str, str]]) -> Tuple[str, str]:
+    labels = cache.get(hour)
+    if labels is None:
+        start = datetime.fromtimestamp(hour * 3600)
+        labels = cache[hour] = (start.strftime('%Y-%m-%d %H:%M'), start.strftime('%Y-%m-%d'))
+    return labels
+
+def aggregate(columns: LogColumns, group_by: Sequence[str] = ('day',), since: Optional[float] = None,
+              until: Optional[float] = None, environment: Optional[str] = None,
+              status: Optional[str] = None, use_numpy: Optional[bool] = None) -> Aggregation:
+    """Roll logs in [since, until) up by the given keys (see GROUP_KEYS).
+
+    Hours and days are labelled in local time. `use_numpy` defaults to
+    whether NumPy is importable.
+    """
+    unknown = [name for name in group_by if name not in GROUP_KEYS]
+    if unknown:
+        raise MetricsError(f"Unknown group-by key(s): {', '.join(unknown)}")
+    started = time.perf_counter()
+    use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+
+    env_code = columns.lookup('environment', environment) if environment else None
+    status_code = columns.lookup('status', status) if status else None
+    raw: Dict[RawKey, Rollup] = {}
+    total: Optional[Rollup] = None
+    if len(columns) and (not environment or env_code is not None) and (not status or status_code is not None):
+        run = _aggregate_numpy if use_numpy else _aggregate_python
+        raw, total = run(columns, -math.inf if since is None else since, math.inf if until is None else until,
+                  env_code, status_code, group_by)
+
+    env_labels = columns.labels['environment']
+    status_labels = columns.labels['status']
+    time_cache: Dict[int, Tuple[str, str]] = {}
+    groups: Dict[Tuple[str, ...], Rollup] = {}
+    rows = 0
+    outcomes = _outcomes(columns)
+    for (hour, env, st, code), rollup in raw.items():
+        rows += rollup.count
+        outcome = outcomes[st] if 'status' in group_by else st
+        if outcome == OUTCOME_DELIVERED:
+            rollup.delivered = rollup.count
+        elif outcome == OUTCOME_FAILED:
+            rollup.failed = rollup.count
+        values = {
+            'environment': env_labels[env],
+            'status': status_labels[st] if 'status' in group_by else '',
+            'code': str(code) if code != NO_CODE else '-',
+        }
+        if 'hour' in group_by or 'day' in group_by:
+            values['hour'], values['day'] = _time_labels(hour, time_cache)
+        key = tuple(values[name] for name in group_by)
+        target = groups.get(key)
+        if target is None:
+            groups[key] = rollup
+        else:
+            target.merge(rollup)
+    if total is not None:
+        total.count = rows
+        total.delivered = sum(rollup.delivered for rollup in groups.values())
+        total.failed = sum(rollup.failed for rollup in groups.values())
+    return Aggregation(group_by, groups, rows, time.perf_counter() - started,
+                       'numpy' if use_numpy else 'python', total)
@@ -0,0 +1,488 @@
+"""
+Mock Daraja API server
+
+Serves the endpoints DarajaAPI calls from a synthetic delivery log, so the
+client can be tested and benchmarked with no network. Synthetic records
+are never stored: record N is derived from (seed, N) whenever it is asked
+for, so a dataset of millions costs no memory and every run with the same
+seed sees the same data. Records created while the server runs (test
+webhooks, replays and the optional live arrival rate) are kept in memory
+after the synthetic ones.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .times import parse_timestamp
+from .receiver import _response, serve_http
+
+DEFAULT_RECORDS = 1_000_000
+DEFAULT_DAYS = 30
+DEFAULT_USER_ID = 'mock-user'
+MAX_PAGE_SIZE = 1000
+ENVIRONMENTS = ('dev', 'staging', 'prod')
+EVENT_TYPES = ('stk_push_result', 'c2b_confirmation', 'timeout')
+ERROR_CODES = (500, 502, 503, 504, 400, 404)
+PENDING_RATE = 0.01
+# Summary endpoints estimate from this many evenly spaced records
+SAMPLE_SIZE = 10_000
+DAY_SAMPLE_SIZE = 500
+
+MASK64 = (1 << 64) - 1
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer: a well-spread 64-bit hash of x."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec='milliseconds')
+
+class MockError(Exception):
+    """A request the mock API rejects, with its HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class MockDataset:
+    """A lazily generated delivery log spread evenly over the last `days` days.
+
+    Synthetic records cycle through the environments, so the records of one
+    environment can be found by arithmetic instead of scanning. `seq` is
+    numbered within whatever stream is requested (all logs, or one
+    environment), so paging never reports false gaps.
+    """
+
+    def __init__(self, records: int = DEFAULT_RECORDS, days: float = DEFAULT_DAYS, seed: int = 0,
+                 failure_rate: float = 0.05, environments: Iterable[str] = ENVIRONMENTS,
+                 rate: float = 0.0, now: Optional[float] = None):
+        self.base = max(0, records)
+        self.environments = tuple(environments)
+        self.failure_rate = failure_rate
+        self.rate = rate
+        self.created = time.time() if now is None else now
+        self.span = days * 86400
+        self.start = self.created - self.span
+        self.step = self.span / max(self.base, 1)
+        self._salt = _mix(seed)
+        # Records added after startup, oldest first, with their timestamps
+        self.live: List[Dict[str, Any]] = []
+        self.live_ts: List[float] = []
+        self.live_by_env: Dict[str, List[int]] = {env: [] for env in self.environments}
+        self._arrived = 0
+        self.endpoints = {env: f"https://example.com/webhooks/{env}" for env in self.environments}
+
+    @property
+    def total(self) -> int:
+        return self.base + len(self.live)
+
+    @staticmethod
+    def webhook_id(index: int) -> str:
+        return f"wh_{index:012d}"
+
+    def index_of(self, webhook_id: str) -> Optional[int]:
+        if not webhook_id.startswith('wh_') or not webhook_id[3:].isdigit():
+            return None
+        index = int(webhook_id[3:])
+        return index if index < self.total else None
+
+    def grow(self, now: Optional[float] = None) -> None:
+        """Add the records that arrived at `rate` per second since startup."""
+        if not self.rate:
+            return
+        now = time.time() if now is None else now
+        due = int((now - self.created) * self.rate)
+        while self._arrived < due:
+            self._arrived += 1
+            index = self.total
+            self._append(index, self.created + self._arrived / self.rate,
+                         self.environments[index % len(self.environments)])
+
+    def add(self, environment: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Record a delivery created through the API (test webhook or replay)."""
+        self.grow(now)
+        index = self.total
+        return self._append(index, max(time.time() if now is None else now, self._last_ts()), environment)
+
+    def _last_ts(self) -> float:
+        return self.live_ts[-1] if self.live_ts else self.start + self.base * self.step
+
+    def _append(self, index: int, ts: float, environment: str) -> Dict[str, Any]:
+        record = self._synthetic(index, ts, environment)
+        self.live.append(record)
+        self.live_ts.append(ts)
+        self.live_by_env.setdefault(environment, []).append(index)
+        return record
+
+    def outcome(self, index: int) -> Tuple[str, Optional[int], int]:
+        """(status, response_code, duration_ms) of a record."""
+        h = _mix(index ^ self._salt)
+        u = (h & 0xFFFFFFFF) / 2 ** 32
+        # Exponential latency tail on top of a 40ms floor (mean ~160ms)
+        duration = 40 + int(-120 * math.log(((h >> 40) + 1) / 2 ** 24))
+        if u < self.failure_rate:
+            code = ERROR_CODES[(h >> 32) % len(ERROR_CODES)]
+            return 'failed', code, 25000 if code == 504 else duration
+        if u < self.failure_rate + PENDING_RATE:
+            return 'pending', None, 0
+        return 'delivered', 200, duration
+
+    def _synthetic(self, index: int, ts: float, environment: str) -> Dict[str, Any]:
+        status, code, duration = self.outcome(index)
+        h = _mix(index ^ ~self._salt & MASK64)
+        return {
+            'webhook_id': self.webhook_id(index),
+            'environment': environment,
+            'event_type': EVENT_TYPES[h % len(EVENT_TYPES)],
+            'status': status,
+            'response_code': code,
+            'duration_ms': duration,
+            'attempts': 1 if status == 'delivered' else 1 + (h >> 8) % 3,
+            'error': f"Endpoint returned HTTP {code}" if status == 'failed' else None,
+            'timestamp': _iso(ts),
+        }
+
+    def environment_of(self, index: int) -> str:
+        if index < self.base:
+            return self.environments[index % len(self.environments)]
+        return str(self.live[index - self.base]['environment'])
+
+    def timestamp_of(self, index: int) -> float:
+        return self.start + index * self.step if index < self.base else self.live_ts[index - self.base]
+
+    def record(self, index: int, environment: Optional[str] = None) -> Dict[str, Any]:
+        if index < self.base:
+            record = self._synthetic(index, self.timestamp_of(index), self.environment_of(index))
+        else:
+            record = dict(self.live[index - self.base])
+        record['seq'] = self.seq(index, environment)
+        return record
+
+    def seq(self, index: int, environment: Optional[str] = None) -> int:
+        """1-based position of a record in the stream of all logs, or of one environment."""
+        if environment is None:
+            return index + 1
+        n = len(self.environments)
+        slot = self.environments.index(environment) if environment in self.environments else None
+        in_base = (self.base - slot + n - 1) // n if slot is not None else 0
+        if index < self.base:
+            return index // n + 1
+        return in_base + bisect_left(self.live_by_env.get(environment, []), index) + 1
+
+    def first_at(self, ts: float) -> int:
+        """Index of the first record at or after `ts`."""
+        if ts <= self.start:
+            return 0
+        index = math.ceil((ts - self.start) / self.step) if self.base else 0
+        if index < self.base:
+            return index
+        return self.base + bisect_left(self.live_ts, ts)
+
+    def indices(self, lo: int, hi: int, environment: Optional[str] = None,
+                reverse: bool = False) -> Iterator[int]:
+        """Indices in [lo, hi) of one environment (or all), oldest or newest first."""
+        hi = min(hi, self.total)
+        if lo >= hi:
+            return iter(())
+        if environment is None:
+            return iter(range(hi - 1, lo - 1, -1) if reverse else range(lo, hi))
+        live = self.live_by_env.get(environment, [])
+        live_lo, live_hi = bisect_left(live, max(lo, self.base)), bisect_left(live, hi)
+        base: Iterable[int] = ()
+        if environment in self.environments and lo < self.base:
+            n, slot = len(self.environments), self.environments.index(environment)
+            top = min(hi, self.base) - 1
+            if reverse:
+                last = top - (top - slot) % n
+                base = range(last, lo - 1, -n)
+            else:
+                base = range(lo + (slot - lo) % n, top + 1, n)
+        if reverse:
+            return chain(reversed(live[live_lo:live_hi]), base)
+        return chain(base, live[live_lo:live_hi])
+
+    def page(self, limit: int, environment: Optional[str] = None, after: Optional[str] = None,
+             since: Optional[str] = None, order: str = 'desc') -> Dict[str, Any]:
+        """One page of logs in the shape of GET /user/{id}/webhook/logs."""
+        self.grow()
+        lo = 0
+        if after:
+            index = self.index_of(after)
+            if index is None:
+                raise MockError(410, f"Cursor '{after}' is not in this dataset")
+            lo = index + 1
+        elif since:
+            lo = self.first_at(parse_timestamp(since))
+        picked = list(islice(self.indices(lo, self.total, environment, reverse=order != 'asc'), limit + 1))
+        logs = [self.record(index, environment) for index in picked[:limit]]
+        page: Dict[str, Any] = {'logs': logs, 'has_more': len(picked) > limit}
+        if order == 'asc' and logs:
+            page['next_cursor'] = logs[-1]['webhook_id']
+        return page
+
+    def _sample(self, lo: int, hi: int, size: int) -> Tuple[List[Tuple[str, str, Optional[int], int]], float]:
+        """Evenly spaced (environment, status, code, duration) samples and the scale to the full range."""
+        count = max(0, min(hi, self.total) - lo)
+        if not count:
+            return [], 0.0
+        stride = max(1, count // size)
+        # A stride sharing a factor with the environment cycle would sample only some environments
+        while math.gcd(stride, len(self.environments)) > 1:
+            stride += 1
+        sample = [(self.environment_of(i),) + self.outcome(i) for i in range(lo, lo + count, stride)]
+        return sample, count / len(sample)
+
+    def status(self) -> Dict[str, Any]:
+        """Totals in the shape of GET /user/{id}/webhook/status (estimated from a sample)."""
+        self.grow()
+        sample, scale = self._sample(0, self.total, SAMPLE_SIZE)
+        counts = {'delivered': 0, 'failed': 0, 'pending': 0}
+        durations: List[int] = []
+        per_env: Dict[str, List[int]] = {}
+        for env, status, _, duration in sample:
+            counts[status] += 1
+            env_counts = per_env.setdefault(env, [0, 0])
+            env_counts[0] += 1
+            if status == 'delivered':
+                env_counts[1] += 1
+                durations.append(duration)
+        last_success = _iso(self._last_ts())
+        environments = {}
+        for env, (total, delivered) in sorted(per_env.items()):
+            rate = delivered / total * 100 if total else 0.0
+            environments[env] = {'status': 'healthy' if rate >= 80 else 'degraded',
+                                 'last_success': last_success, 'success_rate': round(rate, 1)}
+        return {
+            'total_webhooks': self.total,
+            'successful': round(counts['delivered'] * scale),
+            'failed': round(counts['failed'] * scale),
+            'pending': round(counts['pending'] * scale),
+            'success_rate': counts['delivered'] / len(sample) * 100 if sample else 0.0,
+            'avg_response_time': sum(durations) / len(durations) if durations else 0.0,
+            'environments': environments,
+        }
+
+    def metrics(self, days: int) -> Dict[str, Any]:
+        """Summary in the shape of GET /user/{id}/metrics (estimated from samples)."""
+        self.grow()
+        now = max(time.time(), self._last_ts())
+        lo = self.first_at(now - days * 86400)
+        sample, scale = self._sample(lo, self.total, SAMPLE_SIZE)
+        delivered = [d for _, status, _, d in sample if status == 'delivered']
+        errors: Dict[str, int] = {}
+        for _, status, code, _ in sample:
+            if status == 'failed':
+                key = 'timeout' if code == 504 else f"HTTP {code}"
+                errors[key] = errors.get(key, 0) + 1
+        daily = []
+        day_start = datetime.fromtimestamp(now - days * 86400).replace(hour=0, minute=0, second=0, microsecond=0)
+        while day_start.timestamp() <= now:
+            start = day_start.timestamp()
+            day_lo, day_hi = self.first_at(start), self.first_at(start + 86400)
+            day_sample, day_scale = self._sample(day_lo, day_hi, DAY_SAMPLE_SIZE)
+            ok = [d for _, status, _, d in day_sample if status == 'delivered']
+            if day_sample:
+                daily.append({
+                    'date': day_start.date().isoformat(),
+                    'total_webhooks': day_hi - day_lo,
+                    'success_rate': len(ok) / len(day_sample) * 100,
+                    'avg_response_time': sum(ok) / len(ok) if ok else 0.0,
+                })
+            day_start = datetime.fromtimestamp(start + 86400 + 3600).replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            'total_webhooks': self.total - lo,
+            'successful': round(len(delivered) * scale),
+            'failed': round(sum(errors.values()) * scale),
+            'success_rate': len(delivered) / len(sample) * 100 if sample else 0.0,
+            'avg_response_time': sum(delivered) / len(delivered) if delivered else 0.0,
+            'min_response_time': min(delivered, default=0),
+            'max_response_time': max(delivered, default=0),
+            'error_breakdown': {k: round(v * scale) for k, v in sorted(errors.items(), key=lambda kv: -kv[1])},
+            'daily_stats': daily,
+        }
+
+class MockServer:
+    """Asyncio HTTP server answering the Daraja API from a MockDataset."""
+
+    def __init__(self, dataset: Optional[MockDataset] = None, host: str = '127.0.0.1', port: int = 0,
+                 user_id: str = DEFAULT_USER_ID, api_key: Optional[str] = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, max_page_size: int = MAX_PAGE_SIZE, seed: Optional[int] = None):
+        self.dataset = dataset or MockDataset()
+        self.host = host
+        self.port = port
+        self.user_id = user_id
+        self.api_key = api_key
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_page_size = max_page_size
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.injected_errors = 0
+        self.not_modified = 0
+        self.by_route: Dict[str, int] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        sock = self.server.sockets[0] if self.server.sockets else None
+        if sock is not None:
+            self.port = sock.getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start_in_thread(self) -> 'MockServer':
+        """Serve from a background thread, for use from synchronous code."""
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(self.start())
+        self._loop = loop
+        self._thread = threading.Thread(target=loop.run_forever, name='daraja-mock', daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        if self._loop is None or self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    async def _stop_all(self) -> None:
+        await self.stop()
+        # Close keep-alive connections still waiting for their next request
+        for writer in list(self._writers):
+            writer.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            await serve_http(reader, writer, self._respond)
+        finally:
+            self._writers.discard(writer)
+
+    async def _respond(self, method: str, path: str, headers: Dict[str, str], body: bytes,
+                       writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        self.requests += 1
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + (self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+            await asyncio.sleep(max(delay, 0) / 1000)
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            status, payload = self.error_status, {'error': 'Injected error'}
+        else:
+            status, payload = self.handle(method, path, headers, body)
+        data = json.dumps(payload, separators=(',', ':')).encode()
+        extra = None
+        # Reads other than logs carry an ETag and answer If-None-Match with a 304
+        if method == 'GET' and status == 200 and '/webhook/logs' not in path:
+            etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+            extra = {'ETag': etag}
+            if headers.get('if-none-match') == etag:
+                self.not_modified += 1
+                status, data = 304, b''
+        writer.write(_response(status, data, keep_alive, extra))
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        """Route one request; returns (status, JSON body)."""
+        parts = urlsplit(path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        segments = [s for s in parts.path.split('/') if s]
+        route = '/'.join(segments[2:]) if len(segments) > 2 else '/'.join(segments)
+        self.by_route[f"{method} {route}"] = self.by_route.get(f"{method} {route}", 0) + 1
+
+        auth = headers.get('authorization', '')
+        if not auth.startswith('Bearer ') or (self.api_key and auth != f"Bearer {self.api_key}"):
+            return 401, {'error': 'Invalid API key'}
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {'message': 'Request body is not valid JSON'}
+        try:
+            if segments == ['user', 'me'] and method == 'GET':
+                return 200, {'id': self.user_id, 'name': 'Mock User', 'email': 'mock@example.com',
+                             'permanent_url': f"{self.url}/webhook/{self.user_id}"}
+            if len(segments) < 3 or segments[0] != 'user' or segments[1] != self.user_id:
+                return 404, {'error': 'Not found'}
+            return 200, self._route(method, route, query, data)
+        except MockError as e:
+            return e.status, {'message': str(e)}
+
+    def _route(self, method: str, route: str, query: Dict[str, str], data: Any) -> Any:
+        dataset = self.dataset
+        if route == 'webhook/logs' and method == 'GET':
+            try:
+                limit = min(max(int(query.get('limit', 50)), 1), self.max_page_size)
+            except ValueError:
+                raise MockError(400, 'limit must be an integer')
+            return dataset.page(limit, query.get('environment'), query.get('after'),
+                                query.get('since'), query.get('order', 'desc'))
+        if route == 'webhook/status' and method == 'GET':
+            return dataset.status()
+        if route == 'metrics' and method == 'GET':
+            try:
+                days = int(query.get('days', 7))
+            except ValueError:
+                raise MockError(400, 'days must be an integer')
+            if days < 1:
+                raise MockError(400, 'days must be at least 1')
+            return dataset.metrics(days)
+        if route == 'environments' and method == 'GET':
+            return {'environments': [{'name': env, 'url': url} for env, url in dataset.endpoints.items()]}
+        if route == 'endpoints' and method == 'PUT':
+            environment, url = data.get('environment'), data.get('url')
+            if not environment or not url:
+                raise MockError(400, 'environment and url are required')
+            dataset.endpoints[environment] = url
+            return {'success': True, 'environment': environment, 'url': url}
+        if route == 'webhook/test' and method == 'POST':
+            environment = data.get('environment')
+            if environment not in dataset.endpoints:
+                raise MockError(400, f"No endpoint configured for environment '{environment}'")
+            return self._delivery(dataset.add(environment))
+        if route == 'webhook/replay' and method == 'POST':
+            index = dataset.index_of(str(data.get('webhook_id', '')))
+            if index is None:
+                raise MockError(404, 'Webhook not found')
+            result = self._delivery(dataset.add(dataset.environment_of(index)))
+            result['original_webhook_id'] = dataset.webhook_id(index)
+            return result
+        raise MockError(404, f"No route for {method} /{route}")
+
+    @staticmethod
+    def _delivery(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'webhook_id': record['webhook_id'],
+            'environment': record['environment'],
+            'status': record['status'],
+            'response_code': record['response_code'],
+            'response_time_ms': record['duration_ms'],
+        }
@@ -0,0 +1,85 @@
+"""
+Synthetic M-Pesa callback payloads
+
+Shapes follow MpesaSTKCallback and MpesaC2BCallback in
+shared/src/types/webhook.ts. Generators take a random.Random so runs are
+reproducible with a seed.
+"""
+
+import random
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+PAYLOAD_TYPES = ('stk', 'c2b', 'mixed')
+
+# A few real STK result codes and their descriptions
+STK_RESULTS = [
+    (0, 'The service request is processed successfully.'),
+    (1, 'The balance is insufficient for the transaction.'),
+    (1032, 'Request cancelled by user.'),
+    (1037, 'DS timeout user cannot be reached.'),
+    (2001, 'The initiator information is invalid.'),
+]
+
+FIRST_NAMES = ['John', 'Jane', 'Wanjiku', 'Otieno', 'Achieng', 'Kamau', 'Njeri', 'Mwangi']
+LAST_NAMES = ['Doe', 'Kariuki', 'Odhiambo', 'Mutua', 'Wekesa', 'Chebet', 'Kiprop', 'Njoroge']
+
+def _ref(rng: random.Random, length: int = 10) -> str:
+    return ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(length))
+
+def _msisdn(rng: random.Random) -> str:
+    return f"2547{rng.randint(0, 99999999):08d}"
+
+def _trans_time(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now()).strftime('%Y%m%d%H%M%S')
+
+def stk_callback(rng: random.Random, success_rate: float = 0.9) -> Dict[str, Any]:
+    """Build an STK Push result callback (MpesaSTKCallback)."""
+    if rng.random() < success_rate:
+        code, desc = STK_RESULTS[0]
+    else:
+        code, desc = rng.choice(STK_RESULTS[1:])
+    callback: Dict[str, Any] = {
+        'MerchantRequestID': f"{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-1",
+        'CheckoutRequestID': f"ws_CO_{_trans_time()}{rng.randint(100000, 999999)}",
+        'ResultCode': code,
+        'ResultDesc': desc,
+    }
+    if code == 0:
+        callback['CallbackMetadata'] = {
+            'Item': [
+                {'Name': 'Amount', 'Value': rng.randint(1, 150000)},
+                {'Name': 'MpesaReceiptNumber', 'Value': _ref(rng)},
+                {'Name': 'TransactionDate', 'Value': int(_trans_time())},
+                {'Name': 'PhoneNumber', 'Value': int(_msisdn(rng))},
+            ]
+        }
+    return {'Body': {'stkCallback': callback}}
+
+def c2b_callback(rng: random.Random, shortcode: str = '600984') -> Dict[str, Any]:
+    """Build a C2B confirmation callback (MpesaC2BCallback)."""
+    return {
+        'TransactionType': rng.choice(['Pay Bill', 'Buy Goods']),
+        'TransID': _ref(rng),
+        'TransTime': _trans_time(),
+        'TransAmount': f"{rng.randint(1, 70000)}.00",
+        'BusinessShortCode': shortcode,
+        'BillRefNumber': f"INV{rng.randint(1000, 99999)}",
+        'InvoiceNumber': '',
+        'OrgAccountBalance': f"{rng.randint(0, 5000000)}.00",
+        'ThirdPartyTransID': '',
+        'MSISDN': _msisdn(rng),
+        'FirstName': rng.choice(FIRST_NAMES),
+        'MiddleName': '',
+        'LastName': rng.choice(LAST_NAMES),
+    }
+
+def make_payload(kind: str, rng: random.Random) -> Dict[str, Any]:
+    """Build a payload of the given type ('stk', 'c2b' or 'mixed')."""
+    if kind == 'mixed':
+        kind = 'stk' if rng.random() < 0.5 else 'c2b'
+    if kind == 'stk':
+        return stk_callback(rng)
+    if kind == 'c2b':
+        return c2b_callback(rng)
+    raise ValueError(f"Unknown payload type: {kind}")
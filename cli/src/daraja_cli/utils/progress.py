@@ -0,0 +1,79 @@
+"""
+Progress bars and summaries for bulk operations
+
+Commands that replay, send or retry many items show the same live progress
+bar and final summary table.
+"""
+
+from typing import Any, Iterable, Optional, Sized
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeRemainingColumn,
+)
+from rich.table import Table
+
+from .bulk import BulkResult, BulkSummary, run_bulk
+
+console = Console()
+
+
+def run_bulk_with_progress(items: Iterable[Any], fn: Any, description: str,
+                           total: Optional[int] = None, tally: Optional[BulkSummary] = None,
+                           **kwargs: Any) -> BulkSummary:
+    """Run a bulk operation with a live progress bar and throughput.
+
+    `tally` is shown instead of the per-item summary when each item stands
+    for several units of work (e.g. a batch of jobs) that `on_result` counts.
+    """
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("[green]{task.fields[ok]} ok[/green] [red]{task.fields[failed]} failed[/red]"),
+        TextColumn("[dim]{task.fields[rate]}[/dim]"),
+        TimeRemainingColumn(),
+        console=console
+    ) as progress:
+        if total is None and isinstance(items, Sized):
+            total = len(items)
+        task = progress.add_task(description, total=total, ok=0, failed=0, rate='')
+        extra = kwargs.pop('on_result', None)
+
+        def on_result(result: BulkResult, summary: BulkSummary) -> None:
+            if extra:
+                extra(result, summary)
+            shown = tally or summary
+            progress.update(
+                task, completed=shown.completed, ok=shown.succeeded,
+                failed=shown.failed, rate=f"{shown.throughput:,.1f}/s"
+            )
+
+        return run_bulk(items, fn, on_result=on_result, **kwargs)
+
+
+def print_bulk_summary(summary: BulkSummary, title: str) -> None:
+    """Print totals and the most common errors of a bulk run."""
+    console.print(Panel.fit(
+        f"[bold]Succeeded:[/bold] [green]{summary.succeeded:,}[/green]\n"
+        f"[bold]Failed:[/bold] [red]{summary.failed:,}[/red]\n"
+        f"[bold]Skipped:[/bold] {summary.skipped:,}\n"
+        f"[bold]Retries:[/bold] {summary.retries:,}\n\n"
+        f"[bold]Duration:[/bold] {summary.elapsed:.1f}s\n"
+        f"[bold]Throughput:[/bold] {summary.throughput:,.1f}/s",
+        title=f"{title} Summary"
+    ))
+    if summary.errors:
+        error_table = Table(show_header=True, header_style="bold red")
+        error_table.add_column("Error", style="dim")
+        error_table.add_column("Count", justify="right")
+        for error, count in sorted(summary.errors.items(), key=lambda kv: -kv[1])[:10]:
+            error_table.add_row(error, str(count))
+        console.print(error_table)
@@ -0,0 +1,204 @@
+"""
+Local webhook receiver
+
+A small asyncio HTTP/1.1 server that stands in for your app: it acks each
+callback immediately, then classifies and records it. Latency and error
+injection let you watch how the delivery worker retries.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, IO, Optional
+
+ACK_BODY = json.dumps({'ResultCode': 0, 'ResultDesc': 'Accepted'}).encode()
+REJECT_BODY = json.dumps({'ResultCode': 1, 'ResultDesc': 'Rejected'}).encode()
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 10 * 1024 * 1024
+INTERARRIVAL_WINDOW = 1000
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found',
+           405: 'Method Not Allowed', 410: 'Gone', 413: 'Payload Too Large', 429: 'Too Many Requests',
+           500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable'}
+
+# respond(method, path, headers, body, writer, keep_alive)
+Responder = Callable[[str, str, Dict[str, str], bytes, asyncio.StreamWriter, bool], Awaitable[None]]
+
+def detect_event_type(payload: Any) -> str:
+    """Classify a callback body the way the webhook service does."""
+    if not isinstance(payload, dict):
+        return 'unknown'
+    body = payload.get('Body')
+    if isinstance(body, dict) and isinstance(body.get('stkCallback'), dict):
+        return 'stk_push_result'
+    if 'TransID' in payload and 'TransactionType' in payload:
+        return 'c2b_confirmation'
+    if 'Result' in payload:
+        return 'timeout'
+    return 'unknown'
+
+def _response(status: int, body: bytes, keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> bytes:
+    # Headers and body go out in one write to avoid Nagle/delayed-ACK stalls
+    extra = ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"{extra}"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+async def serve_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, respond: Responder) -> None:
+    """Read keep-alive HTTP/1.1 requests off one connection and hand each to `respond`."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            if len(head) > MAX_HEADER_BYTES:
+                return
+            request_line, _, header_block = head.decode('latin-1').partition('\r\n')
+            parts = request_line.split(' ')
+            if len(parts) != 3:
+                writer.write(_response(400, b'{}', False))
+                return
+            method, path, version = parts
+            headers = {}
+            for line in header_block.split('\r\n'):
+                name, sep, value = line.partition(':')
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+
+            raw_length = headers.get('content-length', '0') or '0'
+            if not raw_length.isdigit():
+                # Covers negative and non-numeric values; the body cannot be framed
+                writer.write(_response(400, b'{}', False))
+                return
+            length = int(raw_length)
+            if length > MAX_BODY_BYTES:
+                writer.write(_response(413, b'{}', False))
+                return
+            body = await reader.readexactly(length) if length else b''
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+            await respond(method, path, headers, body, writer, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+    finally:
+        writer.close()
+
+class ReceiverStats:
+    """Counters for received callbacks."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.total = 0
+        self.injected_errors = 0
+        self.bytes = 0
+        self.by_type: Dict[str, int] = {}
+        self.last_arrival: Optional[float] = None
+        self.interarrival_ms: Deque[float] = deque(maxlen=INTERARRIVAL_WINDOW)
+        self.ack_us: Deque[float] = deque(maxlen=INTERARRIVAL_WINDOW)
+
+    def arrival(self, now: float) -> None:
+        if self.last_arrival is not None:
+            self.interarrival_ms.append((now - self.last_arrival) * 1000)
+        self.last_arrival = now
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+class WebhookReceiver:
+    """Asyncio HTTP server that acks and records forwarded webhooks."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8787, ring_size: int = 10000,
+                 record_file: Optional[IO[str]] = None, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, error_status: int = 500,
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self.record_file = record_file
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.stats = ReceiverStats()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        sock = self.server.sockets[0] if self.server.sockets else None
+        if sock is not None:
+            self.port = sock.getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.record_file is not None:
+            self.record_file.flush()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await serve_http(reader, writer, self._respond)
+
+    async def _respond(self, method: str, path: str, headers: Dict[str, str], body: bytes,
+                       writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        received = time.perf_counter()
+        if method != 'POST':
+            writer.write(_response(200, b'{"status":"listening"}', keep_alive))
+            return
+
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + (self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+        inject_error = self.error_rate > 0 and self.rng.random() < self.error_rate
+        status = self.error_status if inject_error else 200
+        writer.write(_response(status, REJECT_BODY if inject_error else ACK_BODY, keep_alive))
+        ack_us = (time.perf_counter() - received) * 1e6
+
+        # Everything below happens after the ack is queued
+        self._record(path, body, status, received, ack_us)
+
+    def _record(self, path: str, body: bytes, status: int, received: float, ack_us: float) -> None:
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        event_type = detect_event_type(payload)
+
+        stats = self.stats
+        stats.total += 1
+        stats.bytes += len(body)
+        stats.by_type[event_type] = stats.by_type.get(event_type, 0) + 1
+        if status != 200:
+            stats.injected_errors += 1
+        stats.arrival(received)
+        stats.ack_us.append(ack_us)
+
+        event = {
+            'received_at': time.time(),
+            'path': path,
+            'event_type': event_type,
+            'status': status,
+            'size': len(body),
+            'payload': payload,
+        }
+        self.events.append(event)
+        if self.record_file is not None:
+            self.record_file.write(json.dumps(event, separators=(',', ':')) + '\n')
@@ -0,0 +1,154 @@
+"""
+Latency statistics helpers
+"""
+
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linearly interpolated percentile (0-100) of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(math.floor(rank))
+    high = min(low + 1, len(sorted_values) - 1)
+    frac = rank - low
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * frac
+
+def summarize(values: Iterable[float], percentiles: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """Return count, min, mean, max and the requested percentiles."""
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        return {'count': 0, 'min': 0.0, 'mean': 0.0, 'max': 0.0,
+                **{f'p{p:g}': 0.0 for p in percentiles}}
+    summary = {
+        'count': len(ordered),
+        'min': ordered[0],
+        'mean': sum(ordered) / len(ordered),
+        'max': ordered[-1],
+    }
+    for p in percentiles:
+        summary[f'p{p:g}'] = percentile(ordered, p)
+    return summary
+
+def log_histogram(values: Iterable[float], sub_buckets: int = 2,
+                  floor: float = 0.001) -> List[Tuple[float, float, int]]:
+    """Bucket values on a log2 scale, HdrHistogram style.
+
+    Each power of two is split into `sub_buckets` equal-width buckets, so the
+    relative bucket width stays constant from sub-millisecond to minutes.
+    Values below `floor` count towards the lowest bucket. Returns
+    (low, high, count) for every bucket between the first and last non-empty one.
+    """
+    counts: Dict[int, int] = {}
+    for value in values:
+        value = max(value, floor)
+        exponent = int(math.floor(math.log2(value)))
+        base = 2.0 ** exponent
+        sub = min(int((value - base) / base * sub_buckets), sub_buckets - 1)
+        index = exponent * sub_buckets + sub
+        counts[index] = counts.get(index, 0) + 1
+    if not counts:
+        return []
+
+    buckets: List[Tuple[float, float, int]] = []
+    for index in range(min(counts), max(counts) + 1):
+        exponent, sub = divmod(index, sub_buckets)
+        base = 2.0 ** exponent
+        step = base / sub_buckets
+        buckets.append((base + sub * step, base + (sub + 1) * step, counts.get(index, 0)))
+    return buckets
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch with bounded relative error.
+
+    Values fall into logarithmic buckets (DDSketch style): every quantile is
+    within `relative_accuracy` of the true value, memory grows with the
+    value range rather than the count, and sketches built over separate
+    chunks merge exactly.
+    """
+
+    __slots__ = ('relative_accuracy', 'gamma', 'log_gamma', 'buckets', 'zeros',
+                 'count', 'total', 'min', 'max')
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def index(self, value: float) -> int:
+        """Bucket index for a positive value."""
+        return int(math.ceil(math.log(value) / self.log_gamma))
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value > 0:
+            index = self.index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        else:
+            self.zeros += count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_buckets(self, counts: Dict[int, int], zeros: int, total: float,
+                    low: float, high: float) -> None:
+        """Add pre-bucketed counts, e.g. computed for a whole column at once."""
+        buckets = self.buckets
+        if not buckets:
+            buckets.update(counts)
+        else:
+            for index, count in counts.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zeros += zeros
+        self.count += zeros + sum(counts.values())
+        self.total += total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.count:
+            self.add_buckets(other.buckets, other.zeros, other.total, other.min, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q (0-1); exact at the extremes, else within the accuracy bound."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+        """Same shape as summarize(), answered from the sketch."""
+        if not self.count:
+            return summarize([], percentiles)
+        result = {
+            'count': self.count,
+            'min': self.min,
+            'mean': self.total / self.count,
+            'max': self.max,
+        }
+        for p in percentiles:
+            result[f'p{p:g}'] = self.quantile(p / 100.0)
+        return result
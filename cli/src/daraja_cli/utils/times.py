@@ -0,0 +1,65 @@
+"""
+Time parsing and formatting shared by the commands
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+import click
+
+
+def format_ago(seconds: float) -> str:
+    """Compact age such as '45s ago', '12m ago' or '3.5h ago'."""
+    if seconds < 60:
+        return f"{seconds:.0f}s ago"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m ago"
+    return f"{seconds / 3600:.1f}h ago"
+
+
+def parse_timestamp(value: Any) -> float:
+    """Convert an ISO timestamp (or epoch number) to epoch seconds, 0 if invalid."""
+    if type(value) is str:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass  # Python < 3.11 rejects a 'Z' suffix
+    elif isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def resolve_since(value: Optional[str]) -> Optional[str]:
+    """Turn '30m', '12h', '7d' or an ISO timestamp into an ISO timestamp.
+
+    Relative times are given in UTC with an explicit offset, so the server
+    reads them the same way whatever the local timezone.
+    """
+    if not value:
+        return None
+    units = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    value = value.strip()
+    if value[:-1].isdigit() and value[-1:] in units:
+        delta = timedelta(**{units[value[-1]]: int(value[:-1])})
+        return (datetime.now(timezone.utc) - delta).isoformat(timespec='seconds')
+    try:
+        # Python < 3.11 rejects a 'Z' suffix
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        raise click.BadParameter(f"Invalid time '{value}'. Use an ISO timestamp or e.g. 30m, 12h, 7d.")
+
+
+def parse_since(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[str]:
+    """Click callback resolving a time option to an ISO timestamp."""
+    return resolve_since(value)
+
+
+def check_since(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[str]:
+    """Click callback validating a time option but keeping it as typed."""
+    resolve_since(value)
+    return value
@@ -0,0 +1,368 @@
+"""
+Command tracing
+
+`daraja --trace` records timed spans for module imports, keyring lookups,
+config file I/O, API requests and Rich rendering. The spans are installed by
+patching those functions when tracing starts and restored when it stops, so
+nothing is wrapped when the flag is off.
+"""
+
+import atexit
+import importlib.abc
+import importlib.machinery
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+CATEGORIES = ('import', 'keyring', 'config', 'network', 'render')
+
+# Flame summary rows below this share of the total are folded away
+MIN_SHARE = 0.01
+MAX_DEPTH = 4
+MAX_ROWS = 40
+BAR_WIDTH = 20
+PROFILE_ROWS = 25
+
+_ID_SEGMENT = re.compile(r'/[^/?]*\d[^/?]*')
+
+
+class Span:
+    """One timed call; times are perf_counter seconds."""
+
+    __slots__ = ('name', 'category', 'start', 'end', 'path', 'thread')
+
+    def __init__(self, name: str, category: str, start: float, path: Tuple[str, ...], thread: str):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = start
+        self.path = path
+        self.thread = thread
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """Collects spans from every thread, nested per thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._main = threading.get_ident()
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._finder: Optional[_ImportFinder] = None
+        self.root = Span(name, 'command', time.perf_counter(), (name,), 'MainThread')
+
+    def _stack(self) -> List[Tuple[str, ...]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            if threading.get_ident() == self._main:
+                stack = [self.root.path]
+            else:
+                stack = [(self.name, f"thread {threading.current_thread().name.rstrip('0123456789_-')}")]
+            self._local.stack = stack
+        return stack
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[Span]:
+        stack = self._stack()
+        path = stack[-1] + (name,)
+        span = Span(name, category, time.perf_counter(), path, threading.current_thread().name)
+        stack.append(path)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            self.spans.append(span)
+
+    def wrap(self, owner: Any, attr: str, category: str,
+             name: Optional[Callable[..., str]] = None) -> None:
+        """Replace owner.attr with a version that records a span per call."""
+        original = getattr(owner, attr)
+        label = f"{getattr(owner, '__name__', owner)}.{attr}"
+
+        @wraps(original)
+        def traced(*args: Any, **kwargs: Any) -> Any:
+            with self.span(name(*args, **kwargs) if name else label, category):
+                return original(*args, **kwargs)
+
+        self._patches.append((owner, attr, owner.__dict__[attr]))
+        setattr(owner, attr, traced)
+
+    def install(self) -> None:
+        """Start timing imports and patch the modules that are already loaded."""
+        self._finder = _ImportFinder(self)
+        sys.meta_path.insert(0, self._finder)
+        for module_name in _HOOKS:
+            if module_name in sys.modules:
+                _HOOKS[module_name](self, sys.modules[module_name])
+
+    def uninstall(self) -> None:
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+
+    def finish(self) -> None:
+        self.root.end = time.perf_counter()
+        self.uninstall()
+
+    def categories(self) -> Dict[str, float]:
+        """Exclusive seconds per category; time in no span counts as 'other'."""
+        child_time: Dict[Tuple[str, ...], float] = {}
+        for span in self.spans:
+            parent = span.path[:-1]
+            child_time[parent] = child_time.get(parent, 0.0) + span.duration
+        totals = {category: 0.0 for category in CATEGORIES}
+        for span in self.spans:
+            if span.thread != 'MainThread':
+                continue
+            exclusive = max(0.0, span.duration - child_time.get(span.path, 0.0))
+            totals[span.category] = totals.get(span.category, 0.0) + exclusive
+        totals['other'] = max(0.0, self.root.duration - sum(totals.values()))
+        return totals
+
+    def flame(self) -> List[Tuple[Tuple[str, ...], float, int]]:
+        """Total seconds and calls per call path, depth first, slowest child first.
+
+        Spans from worker threads are grouped under one node per thread
+        name, whose time is the sum over its threads.
+        """
+        totals: Dict[Tuple[str, ...], List[float]] = {self.root.path: [self.root.duration, 1]}
+        for span in self.spans:
+            paths = [span.path]
+            if len(span.path) == 3 and span.path[1].startswith('thread '):
+                paths.append(span.path[:2])
+            for path in paths:
+                entry = totals.setdefault(path, [0.0, 0])
+                entry[0] += span.duration
+                entry[1] += 1
+
+        def order(path: Tuple[str, ...]) -> Tuple[Tuple[float, str], ...]:
+            return tuple((-totals.get(path[:i], [0.0])[0], path[i - 1]) for i in range(1, len(path) + 1))
+
+        return [(path, totals[path][0], int(totals[path][1])) for path in sorted(totals, key=order)]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format, for chrome://tracing or Perfetto."""
+        origin = self.root.start
+        threads: Dict[str, int] = {'MainThread': 1}
+        events = []
+        for span in [self.root] + sorted(self.spans, key=lambda s: s.start):
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round((span.start - origin) * 1e6, 1),
+                'dur': round(span.duration * 1e6, 1),
+                'pid': 1,
+                'tid': tid,
+            })
+        for thread, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': thread}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'command': self.name}}
+
+    def write(self, path: Path) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader to time its execution."""
+
+    def __init__(self, loader: Any, tracer: Tracer):
+        self.loader = loader
+        self.tracer = tracer
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> Any:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        with self.tracer.span(module.__name__, 'import'):
+            self.loader.exec_module(module)
+        hook = _HOOKS.get(module.__name__)
+        if hook:
+            hook(self.tracer, module)
+
+    def __getattr__(self, name: str) -> Any:
+        # get_resource_reader, is_package and friends
+        return getattr(self.loader, name)
+
+
+class _ImportFinder(importlib.abc.MetaPathFinder):
+    """Finds modules with the other finders, then times their loaders."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Optional[importlib.machinery.ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.tracer)
+                return spec
+        return None
+
+
+def _request_name(api: Any, method: str, endpoint: str, *args: Any, **kwargs: Any) -> str:
+    # Ids in paths would give every replay its own row
+    return f"{method.upper()} {_ID_SEGMENT.sub('/:id', endpoint.split('?')[0])}"
+
+
+def _first_arg(fallback: str) -> Callable[..., str]:
+    def name(*args: Any, **kwargs: Any) -> str:
+        value = args[0] if args else next(iter(kwargs.values()), None)
+        return f"{fallback}({value or ''})"
+    return name
+
+
+def _hook_config(tracer: Tracer, module: Any) -> None:
+    tracer.wrap(module, 'load_profile', 'config', _first_arg('load_profile'))
+    tracer.wrap(module.ConfigStore, 'read', 'config', lambda *a, **k: 'read config.json')
+    tracer.wrap(module.ConfigStore, '_commit', 'config', lambda *a, **k: 'write config.json')
+    for attr in ('get_credential', 'set_credential', 'delete_credential'):
+        tracer.wrap(module, attr, 'keyring', _first_arg(attr))
+
+
+def _hook_api(tracer: Tracer, module: Any) -> None:
+    tracer.wrap(module.DarajaAPI, '_make_request', 'network', _request_name)
+
+
+def _hook_console(tracer: Tracer, module: Any) -> None:
+    tracer.wrap(module.Console, 'print', 'render', lambda *a, **k: 'Console.print')
+
+
+def _hook_live(tracer: Tracer, module: Any) -> None:
+    tracer.wrap(module.Live, 'refresh', 'render', lambda *a, **k: 'Live.refresh')
+
+
+# Module name -> function that patches it once it is imported
+_HOOKS: Dict[str, Callable[[Tracer, Any], None]] = {
+    f'{__package__}.config': _hook_config,
+    f'{__package__}.api': _hook_api,
+    'rich.console': _hook_console,
+    'rich.live': _hook_live,
+}
+
+
+class _Session:
+    """What the global flags asked for in this process."""
+
+    def __init__(self) -> None:
+        self.tracer: Optional[Tracer] = None
+        self.summary = False
+        self.output: Optional[Path] = None
+        self.profile: Optional[str] = None
+        self.profiler: Any = None
+
+
+_session: Optional[_Session] = None
+
+
+def enable(summary: bool = False, output: Optional[Path] = None, profile: Optional[str] = None) -> None:
+    """Turn on tracing and/or cProfile; later calls add to the running session."""
+    global _session
+    if _session is None:
+        _session = _Session()
+        # --help and other eager exits never close the click context
+        atexit.register(finish)
+    session = _session
+    if (summary or output) and session.tracer is None:
+        session.tracer = Tracer('daraja')
+        session.tracer.install()
+    session.summary = session.summary or summary
+    session.output = output or session.output
+    if profile and session.profiler is None:
+        import cProfile
+        session.profile = profile
+        session.profiler = cProfile.Profile()
+        session.profiler.enable()
+
+
+def active() -> Optional[Tracer]:
+    return _session.tracer if _session else None
+
+
+def finish(title: str = 'daraja') -> None:
+    """Stop everything, restore patched functions and report. Safe to call twice."""
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return
+    if session.profiler is not None:
+        session.profiler.disable()
+    if session.tracer is not None:
+        session.tracer.finish()
+
+    from rich.console import Console
+    console = Console(stderr=True)
+    if session.tracer is not None and session.summary:
+        print_summary(session.tracer, title, console)
+    if session.tracer is not None and session.output:
+        session.tracer.write(session.output)
+        console.print(f"[dim]Trace written to {session.output} (open in chrome://tracing or ui.perfetto.dev)[/dim]")
+    if session.profiler is not None:
+        _report_profile(session.profiler, session.profile, console)
+
+
+def _report_profile(profiler: Any, target: Optional[str], console: Any) -> None:
+    import io
+    import pstats
+    if target and target != '-':
+        profiler.dump_stats(target)
+        console.print(f"[dim]Profile written to {target} (python -m pstats {target})[/dim]")
+        return
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_ROWS)
+    console.print(out.getvalue(), markup=False, highlight=False)
+
+
+def print_summary(tracer: Tracer, title: str, console: Any) -> None:
+    """Flame-style tree of spans, plus exclusive time per phase."""
+    from rich.table import Table
+
+    total = tracer.root.duration or 1e-9
+    table = Table(show_header=True, header_style="bold magenta",
+                  title=f"⏱  {title} · {tracer.root.duration * 1000:,.1f}ms")
+    table.add_column("Span", no_wrap=True, overflow="ellipsis", max_width=40)
+    table.add_column("Time", justify="right", no_wrap=True, min_width=9)
+    table.add_column("Share", justify="right", no_wrap=True, min_width=5)
+    table.add_column("Calls", justify="right", no_wrap=True, min_width=5)
+    table.add_column("", style="cyan", no_wrap=True, max_width=BAR_WIDTH)
+    hidden = 0
+    for path, seconds, calls in tracer.flame():
+        share = seconds / total
+        if share < MIN_SHARE or len(path) > MAX_DEPTH or table.row_count >= MAX_ROWS:
+            hidden += 1
+            continue
+        table.add_row(
+            "  " * (len(path) - 1) + path[-1],
+            f"{seconds * 1000:,.1f}ms",
+            f"{share:.0%}",
+            f"{calls:,}",
+            "█" * max(1, round(min(share, 1.0) * BAR_WIDTH)),
+        )
+    if hidden:
+        table.caption = f"{hidden} smaller spans hidden"
+    console.print(table)
+
+    phases = tracer.categories()
+    console.print(" · ".join(
+        f"[bold]{name}[/bold] {seconds * 1000:,.1f}ms ({seconds / total:.0%})"
+        for name, seconds in phases.items()
+    ))
@@ -0,0 +1,262 @@
+"""
+Offline M-Pesa callback validation
+
+Mirrors the payload checks in shared/src/utils/validation.ts, which
+WebhookValidationService applies to incoming callbacks: STK push results
+and C2B confirmations. Queue timeout results follow the Daraja Result
+shape; the service does not accept them, so they are only checked when
+asked for explicitly and are otherwise reported as rejected. Each schema is
+compiled once into a flat list of (path, getter, type check) steps, so
+validating a payload is a handful of dict lookups with no per-call parsing.
+
+Large inputs are validated in chunks of raw JSONL lines on a process pool;
+workers parse and validate, and only small count dictionaries come back.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from multiprocessing import get_context
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .corpus import unwrap_record
+
+# (dotted field path, expected JS type) as checked by the service
+STK_FIELDS = (
+    ('Body.stkCallback.MerchantRequestID', 'string'),
+    ('Body.stkCallback.CheckoutRequestID', 'string'),
+    ('Body.stkCallback.ResultCode', 'number'),
+    ('Body.stkCallback.ResultDesc', 'string'),
+)
+
+C2B_FIELDS = (
+    ('TransactionType', 'string'),
+    ('TransID', 'string'),
+    ('TransTime', 'string'),
+    ('TransAmount', 'string'),
+    ('BusinessShortCode', 'string'),
+)
+
+# Queue timeout / result callbacks. validation.ts has no check for these and
+# detectWebhookType does not recognise them, so the service rejects them.
+TIMEOUT_FIELDS = (
+    ('Result.ResultCode', 'number'),
+    ('Result.ResultDesc', 'string'),
+    ('Result.OriginatorConversationID', 'string'),
+    ('Result.ConversationID', 'string'),
+)
+
+SCHEMAS = {
+    'stk_push_result': STK_FIELDS,
+    'c2b_confirmation': C2B_FIELDS,
+    'timeout': TIMEOUT_FIELDS,
+}
+
+# Types detectWebhookType recognises, in the order it tries them
+SERVICE_TYPES = ('stk_push_result', 'c2b_confirmation')
+
+NOT_ACCEPTED = 'payload: timeout results are not accepted by the webhook service'
+
+# Short names accepted on the command line
+TYPE_ALIASES = {'stk': 'stk_push_result', 'c2b': 'c2b_confirmation', 'timeout': 'timeout'}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+_MISSING = object()
+
+def _is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+def _is_number(value: Any) -> bool:
+    # typeof true is "boolean" in JS, so bools are not numbers here
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+TYPE_CHECKS = {'string': _is_string, 'number': _is_number}
+
+Step = Tuple[str, Callable[[Any], Any], Callable[[Any], bool], str]
+
+def _getter(path: str) -> Callable[[Any], Any]:
+    keys = tuple(path.split('.'))
+
+    def get(payload: Any) -> Any:
+        value = payload
+        for key in keys:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return get
+
+def compile_schema(fields: Sequence[Tuple[str, str]]) -> List[Step]:
+    """Turn (path, type) pairs into ready-to-run validation steps."""
+    return [(path, _getter(path), TYPE_CHECKS[kind], kind) for path, kind in fields]
+
+COMPILED = {name: compile_schema(fields) for name, fields in SCHEMAS.items()}
+
+def check(steps: List[Step], payload: Any) -> List[str]:
+    """Return 'field: problem' strings for every step the payload fails."""
+    errors = []
+    for path, get, is_type, kind in steps:
+        value = get(payload)
+        if value is _MISSING:
+            errors.append(f"{path}: missing")
+        elif not is_type(value):
+            errors.append(f"{path}: expected {kind}")
+    return errors
+
+def guess_type(payload: Any) -> Optional[str]:
+    """Which schema a payload is trying to match, from its top-level shape."""
+    if not isinstance(payload, dict):
+        return None
+    if 'Body' in payload:
+        return 'stk_push_result'
+    if 'TransID' in payload or 'TransactionType' in payload:
+        return 'c2b_confirmation'
+    if 'Result' in payload:
+        return 'timeout'
+    return None
+
+def validate_payload(payload: Any, expected: Optional[str] = None) -> Tuple[Optional[str], List[str]]:
+    """Validate one payload; returns (event type, errors).
+
+    Without `expected`, detection follows detectWebhookType: STK first, then
+    C2B. A payload matching neither is reported against the schema its shape
+    suggests; a timeout result is reported as not accepted by the service.
+    """
+    if expected is not None:
+        return expected, check(COMPILED[expected], payload)
+    for name in SERVICE_TYPES:
+        if not check(COMPILED[name], payload):
+            return name, []
+    guessed = guess_type(payload)
+    if guessed is None:
+        return None, ['payload: not an STK or C2B callback']
+    if guessed not in SERVICE_TYPES:
+        return guessed, [NOT_ACCEPTED]
+    return guessed, check(COMPILED[guessed], payload)
+
+class ValidationReport:
+    """Counts from validating many payloads; chunks merge into one report."""
+
+    SAMPLE_LIMIT = 20
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.valid = 0
+        self.parse_errors = 0
+        self.by_type: Dict[str, int] = {}
+        self.invalid_by_type: Dict[str, int] = {}
+        self.field_errors: Dict[str, int] = {}
+        self.samples: List[Tuple[str, str]] = []
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def invalid(self) -> int:
+        return self.total - self.valid
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, record_id: str, event_type: Optional[str], errors: List[str]) -> None:
+        self.total += 1
+        key = event_type or 'unknown'
+        if not errors:
+            self.valid += 1
+            self.by_type[key] = self.by_type.get(key, 0) + 1
+            return
+        self.invalid_by_type[key] = self.invalid_by_type.get(key, 0) + 1
+        for error in errors:
+            self.field_errors[error] = self.field_errors.get(error, 0) + 1
+        if len(self.samples) < self.SAMPLE_LIMIT:
+            self.samples.append((record_id, '; '.join(errors)))
+
+    def add_parse_error(self, record_id: str, message: str) -> None:
+        self.total += 1
+        self.parse_errors += 1
+        self.field_errors['<json>: unparseable'] = self.field_errors.get('<json>: unparseable', 0) + 1
+        if len(self.samples) < self.SAMPLE_LIMIT:
+            self.samples.append((record_id, message))
+
+    def merge(self, other: 'ValidationReport') -> None:
+        self.total += other.total
+        self.valid += other.valid
+        self.parse_errors += other.parse_errors
+        for target, source in ((self.by_type, other.by_type),
+                               (self.invalid_by_type, other.invalid_by_type),
+                               (self.field_errors, other.field_errors)):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+        room = self.SAMPLE_LIMIT - len(self.samples)
+        if room > 0:
+            self.samples.extend(other.samples[:room])
+
+Chunk = List[Tuple[str, str]]
+
+def validate_chunk(chunk: Chunk, expected: Optional[str] = None) -> ValidationReport:
+    """Parse and validate (record id, raw JSON) pairs. Runs in pool workers."""
+    report = ValidationReport()
+    loads = json.loads
+    for record_id, raw in chunk:
+        try:
+            payload = unwrap_record(loads(raw))
+        except ValueError as e:
+            report.add_parse_error(record_id, f"invalid JSON: {e}")
+            continue
+        event_type, errors = validate_payload(payload, expected)
+        report.add(record_id, event_type, errors)
+    return report
+
+def _chunks(records: Iterable[Tuple[str, str]], size: int) -> Iterator[Chunk]:
+    chunk: Chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def validate_records(records: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, expected: Optional[str] = None,
+                     on_progress: Optional[Callable[[ValidationReport], None]] = None) -> ValidationReport:
+    """Validate a stream of (record id, raw JSON) pairs.
+
+    With more than one worker, chunks go to a process pool with at most two
+    chunks per worker in flight, so memory stays flat however long the
+    input is.
+    """
+    workers = workers or os.cpu_count() or 1
+    report = ValidationReport()
+    chunks = _chunks(records, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            report.merge(validate_chunk(chunk, expected))
+            if on_progress:
+                on_progress(report)
+        report.finished = time.perf_counter()
+        return report
+
+    pending: Deque[Any] = deque()
+    with get_context('spawn' if os.name == 'nt' else None).Pool(workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.apply_async(validate_chunk, (chunk, expected)))
+            while len(pending) >= workers * 2:
+                report.merge(pending.popleft().get())
+                if on_progress:
+                    on_progress(report)
+        while pending:
+            report.merge(pending.popleft().get())
+            if on_progress:
+                on_progress(report)
+    report.finished = time.perf_counter()
+    return report
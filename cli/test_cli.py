@@ -73,8 +73,1240 @@ def test_profiles_command_error_without_config():
     assert 'not found' in result.output.lower() or 'error' in result.output.lower()
     print("✅ Profiles command errors appropriately without config")
 
+def test_api_reuses_pooled_connection(json_server):
+    """Test that DarajaAPI keeps one connection alive across requests"""
+    from daraja_cli.utils.api import APIError, DarajaAPI
+    server, url = json_server({'/user/u1/webhook/logs': {'logs': []}, '/user/me': [], '/api/dlq/stats': {'data': 'x'}})
+    with DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url, 'response_cache': False}) as api:
+        for _ in range(5):
+            assert api.get_webhook_logs(10) == []
+        stats = api.get_stats()
+        # Bodies of the wrong shape are API errors, not AttributeErrors in the caller
+        for call in (api.get_user_info, api.get_dlq_stats):
+            try:
+                call()
+                assert False, "malformed body should raise"
+            except APIError as e:
+                assert 'expected a JSON object' in str(e)
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4
+
+def test_async_api_fans_out_concurrently(json_server):
+    """Test that AsyncDarajaAPI overlaps requests across environments"""
+    import asyncio
+    import time
+    from daraja_cli.utils.async_api import AsyncDarajaAPI
+    server, url = json_server({'/user/u1/webhook/logs': {'logs': [{'webhook_id': 'w1'}]}}, delay=0.2)
+    envs = ['dev', 'staging', 'prod', 'qa', 'uat']
+
+    async def run():
+        async with AsyncDarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url}, max_concurrency=5) as api:
+            return await api.get_logs_by_environment(envs, limit=5)
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    assert sorted(results) == sorted(envs)
+    assert all(logs == [{'webhook_id': 'w1'}] for logs in results.values())
+    assert elapsed < 0.2 * len(envs) * 0.6
+
+def test_fan_out_profiles_closes_response_caches(json_server, monkeypatch):
+    """Test that every fanned-out client closes its response cache"""
+    from daraja_cli.utils import httpcache
+    from daraja_cli.utils.api import APIError
+    from daraja_cli.utils.async_api import fan_out_profiles
+    server, url = json_server({'/user/me': {'user_id': 'u1'}})
+    closed = []
+    original = httpcache.ResponseCache.close
+    monkeypatch.setattr(httpcache.ResponseCache, 'close', lambda self: closed.append(self) or original(self))
+
+    profiles = {name: {'api_key': 'k', 'user_id': 'u1', 'api_url': url} for name in ('a', 'b', 'c')}
+    profiles['none'] = {'api_url': url}
+    results = fan_out_profiles(profiles, 'get_user_info')
+    assert [results[name] for name in 'abc'] == [{'user_id': 'u1'}] * 3
+    assert isinstance(results['none'], APIError)
+    assert len(closed) == 3
+
+def test_sse_parser_and_stream_fallback(json_server):
+    """Test SSE parsing and that non-streaming servers raise StreamUnavailable"""
+    from daraja_cli.utils.api import DarajaAPI, StreamUnavailable, iter_sse
+    lines = [': heartbeat', 'retry: 1500', 'id: w1', 'data: {"webhook_id": "w1"}', '',
+             'event: log', 'id: w2', 'data: {"webhook_id":', 'data: "w2"}', '']
+    events = list(iter_sse(lines))
+    assert [e.get('id') for e in events] == ['w1', 'w2']
+    assert events[0]['retry'] == 1500
+    assert events[1]['event'] == 'log' and events[1]['data'] == '{"webhook_id":\n"w2"}'
+
+    server, url = json_server({})
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url})
+    try:
+        next(api.stream_webhook_logs())
+        assert False, "expected StreamUnavailable"
+    except StreamUnavailable:
+        pass
+
+    # A bad API key at startup is reported, not raised from the poll loop
+    import io
+    from collections import OrderedDict
+    from contextlib import redirect_stdout
+    from daraja_cli.commands.monitor import _poll_logs
+    server, url = json_server({'/user/u1/webhook/logs': lambda handler: (401, {})})
+    api = DarajaAPI({'api_key': 'bad', 'user_id': 'u1', 'api_url': url})
+    out = io.StringIO()
+    with redirect_stdout(out):
+        _poll_logs(api, None, OrderedDict(), None, 0)
+    assert 'Authentication failed' in out.getvalue()
+
+def test_log_iterator_pages_once_and_detects_gaps(fake_log_api):
+    """Test that the cursor iterator yields each entry once and records gaps"""
+    from daraja_cli.utils.api import LogIterator
+    # seq 4 is missing; entries 'w2' and 'w3' are repeated across pages
+    records = [{'webhook_id': f'w{n}', 'seq': n, 'timestamp': f'2025-01-01T10:00:0{n}'}
+               for n in (1, 2, 3, 5, 6)]
+
+    pager = LogIterator(fake_log_api(records, overlap=True), page_size=2)
+    assert [log['webhook_id'] for log in pager] == ['w1', 'w2', 'w3', 'w5', 'w6']
+    assert pager.cursor == 'w6'
+    assert pager.gaps == [{'after': 'w3', 'missing': 1, 'reason': 'sequence gap'}]
+    records.append({'webhook_id': 'w7', 'seq': 7, 'timestamp': '2025-01-01T10:00:07'})
+    assert [log['webhook_id'] for log in pager.drain()] == ['w7']
+
+def test_log_cache_syncs_incrementally(tmp_path, fake_log_api):
+    """Test that the SQLite log cache syncs deltas, filters and evicts"""
+    from datetime import datetime, timedelta, timezone
+    from daraja_cli.utils.cache import LogCache
+
+    now = datetime.now()
+    records = [{'webhook_id': f'w{n}', 'environment': 'prod' if n % 2 else 'dev',
+                'status': 'failed' if n % 3 == 0 else 'delivered',
+                'timestamp': (now - timedelta(minutes=10 - n)).isoformat()} for n in range(1, 7)]
+
+    api = fake_log_api(records)
+    with LogCache('p1', path=tmp_path / 'logs.db', max_rows=5) as cache:
+        assert cache.sync(api) == 6
+        assert cache.count() == 5  # oldest evicted by max_rows
+        assert cache.get_cursor() == 'w6'
+        records.append({'webhook_id': 'w7', 'environment': 'prod', 'status': 'delivered',
+                        'timestamp': now.isoformat()})
+        assert cache.sync(api) == 1
+        assert api.calls == [None, 'w6']
+        # The first sync reaches back one TTL in UTC, with an explicit offset
+        window = datetime.fromisoformat(api.windows[0])
+        assert api.windows[0].endswith('+00:00') and api.windows[1] is None
+        assert abs((datetime.now(timezone.utc) - window) - timedelta(days=30)) < timedelta(minutes=1)
+        assert [record.webhook_id for record in cache.query_records(3)] == ['w7', 'w6', 'w5']
+        assert [record.webhook_id for record in cache.query_records(10, environment='dev', status='failed')] == ['w6']
+    assert oct((tmp_path / 'logs.db').stat().st_mode & 0o777) == '0o600'
+
+def test_export_resumes_without_duplicates(tmp_path, fake_log_api, mock_server):
+    """Test that an interrupted JSONL export resumes from its checkpoint"""
+    import json
+    from pathlib import Path
+    from daraja_cli.utils.api import LogIterator
+    from daraja_cli.utils.export import ExportWriter, export_records, load_checkpoint, make_writer, until_filter
+
+    try:
+        ExportWriter(Path('unused'), [])  # type: ignore[abstract]
+        assert False, "the base writer is abstract"
+    except TypeError:
+        pass
+
+    records = [{'webhook_id': f'w{n:05d}', 'timestamp': f'2025-01-01T00:00:00.{n:06d}'} for n in range(2500)]
+    # Compared as instants, not strings: 01:00Z is after 03:00+03:00
+    stamped = [{'timestamp': '2024-12-31T23:59:59Z'}, {'timestamp': '2025-01-01T01:00:00Z'}]
+    assert list(until_filter(stamped, '2025-01-01T03:00:00+03:00')) == stamped[:1]
+
+    def interrupt_after(pager, n):
+        for i, record in enumerate(pager):
+            if i == n:
+                raise KeyboardInterrupt
+            yield record
+
+    output = tmp_path / 'logs.jsonl'
+    state = {'count': 0, 'cursor': None}
+    pager = LogIterator(fake_log_api(records), page_size=300)
+    try:
+        export_records(pager, make_writer('jsonl', output), state, interrupt_after(pager, 1500))
+        assert False, "expected interruption"
+    except KeyboardInterrupt:
+        pass
+
+    state = load_checkpoint(output)
+    assert state['count'] == 1000 and state['cursor'] == 'w00999'
+    pager = LogIterator(fake_log_api(records), after=state['cursor'], page_size=300)
+    assert export_records(pager, make_writer('jsonl', output), state) == 1500
+    with open(output) as f:
+        ids = [json.loads(line)['webhook_id'] for line in f]
+    assert ids == [r['webhook_id'] for r in records]
+    assert load_checkpoint(output)['complete'] is True
+
+    # A relative window is fingerprinted as typed, so re-running it resumes
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.mockserver import MockDataset
+    server = mock_server(MockDataset(records=500))
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'mock-user', 'api_url': server.url, 'response_cache': False})
+    obj = {'config': {'user_id': 'mock-user'}, 'api': api}
+    args = ['export', '-o', str(output.with_name('window.jsonl')), '--since', '30d', '--until', '1s']
+    result = CliRunner().invoke(monitor, args, obj=obj)
+    assert result.exit_code == 0 and 'Exported' in result.output, result.output
+    state = load_checkpoint(output.with_name('window.jsonl'))
+    assert state['options']['since'] == '30d' and state['since'].startswith('20')
+    result = CliRunner().invoke(monitor, args, obj=obj)
+    assert 'Export already complete' in result.output, result.output
+    api.close()
+
+def test_bulk_runner_retries_and_checkpoints(tmp_path, isolated_config, mock_server):
+    """Test bounded bulk runs with retries, permanent failures and checkpoints"""
+    import threading
+    import time
+    from daraja_cli.utils.api import APIError, DarajaAPI
+    from daraja_cli.utils.bulk import Checkpoint, is_retryable, run_bulk
+
+    lock = threading.Lock()
+    calls = {}
+    active = [0, 0]  # current, peak
+
+    def replay(item):
+        with lock:
+            calls[item] = calls.get(item, 0) + 1
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        try:
+            if item == 'bad':
+                raise APIError("Resource not found.", 404)
+            if item.endswith('0') and calls[item] == 1:
+                raise APIError("Server error. Please try again later.", 503)
+            return {'ok': True}
+        finally:
+            with lock:
+                active[0] -= 1
+
+    # A replay is not idempotent: only failures the server never saw are retried by default
+    assert is_retryable(APIError("Too many requests", 429)) and is_retryable(APIError("refused", not_sent=True))
+    assert not is_retryable(APIError("Request timed out.")) and not is_retryable(APIError("Server error", 503))
+    assert is_retryable(APIError("Server error", 503), retry_unsafe=True)
+    try:
+        DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': 'http://127.0.0.1:1', 'max_retries': 0}).replay_webhook('w1')
+        assert False, "nothing listens on port 1"
+    except APIError as e:
+        assert e.not_sent
+
+    path = tmp_path / 'replay.done'
+    items = [f'w{n}' for n in range(40)] + ['bad']
+    summary = run_bulk(items, replay, concurrency=4, retries=2, backoff=0, checkpoint=Checkpoint(path))
+    assert (summary.succeeded, summary.failed, summary.retries) == (36, 5, 0)
+    path.unlink()
+    calls.clear()
+    summary = run_bulk(items, replay, concurrency=4, retries=2, backoff=0, retry_unsafe=True,
+                       checkpoint=Checkpoint(path))
+    assert (summary.succeeded, summary.failed, summary.retries) == (40, 1, 4)
+    assert calls['bad'] == 1  # 4xx is not retried
+    assert active[1] <= 4
+
+    summary = run_bulk(items, replay, concurrency=4, backoff=0, checkpoint=Checkpoint(path))
+    assert (summary.skipped, summary.succeeded, summary.failed) == (40, 0, 1)
+
+    # Calls still running at Ctrl+C are checkpointed, so a resume sends nothing twice
+    sent = []
+
+    def slow_replay(item):
+        time.sleep(0.2)
+        with lock:
+            sent.append(item)
+
+    def interrupted(ids):
+        yield from ids[:4]
+        time.sleep(0.05)  # let the workers pick them up
+        raise KeyboardInterrupt
+
+    ids = [f'r{n}' for n in range(8)]
+    resume = tmp_path / 'resume.done'
+    try:
+        run_bulk(interrupted(ids), slow_replay, concurrency=4, checkpoint=Checkpoint(resume))
+        assert False, "expected interruption"
+    except KeyboardInterrupt:
+        pass
+    assert sorted(sent) == ids[:4] and sorted(resume.read_text().split()) == ids[:4]
+    summary = run_bulk(ids, slow_replay, concurrency=4, checkpoint=Checkpoint(resume))
+    assert summary.skipped == 4 and sorted(sent) == ids
+
+    # The default replay checkpoint is per profile and input, and kept only until all succeed
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.mockserver import MockDataset
+    dataset = MockDataset(records=50)
+    server = mock_server(dataset)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'mock-user', 'api_url': server.url, 'response_cache': False})
+    obj = {'config': {'profile': 'p1'}, 'api': api}
+    ids_file = tmp_path / 'ids.txt'
+    ids_file.write_text('\n'.join([dataset.webhook_id(0), dataset.webhook_id(1), 'missing']) + '\n')
+    result = CliRunner().invoke(monitor, ['replay', '--ids-file', str(ids_file), '-y', '--retries', '0'], obj=obj)
+    assert result.exit_code == 0, result.output
+    [kept] = (tmp_path / '.daraja' / 'replay').glob('p1-*.done')
+    assert sorted(kept.read_text().split()) == sorted([dataset.webhook_id(0), dataset.webhook_id(1)])
+    result = CliRunner().invoke(monitor, ['replay', '--ids-file', str(ids_file), '-y', '--retries', '0'], obj=obj)
+    assert 'Skipping 2 webhooks already replayed' in result.output, result.output
+
+    ids_file.write_text(dataset.webhook_id(2) + '\n')
+    for _ in range(2):
+        result = CliRunner().invoke(monitor, ['replay', '--ids-file', str(ids_file), '-y'], obj=obj)
+        assert 'already replayed' not in result.output, result.output
+    assert not list((tmp_path / '.daraja' / 'replay').glob('p1-*.done'))
+    api.close()
+
+def test_load_generator_schedules_and_reports(json_server):
+    """Test load schedules and a short run with valid M-Pesa payloads"""
+    from click.testing import CliRunner
+    from daraja_cli.main import cli
+    from daraja_cli.utils.loadgen import LoadGenerator, schedule
+
+    assert len(list(schedule('constant', 10, 2))) == 20
+    ramp = list(schedule('ramp', 1, 10, ramp_to=20))
+    assert ramp == sorted(ramp) and 50 < len(ramp) < 150
+    burst = list(schedule('burst', 0, 10, burst_size=5, burst_interval=5))
+    assert burst == [0.0] * 5 + [5.0] * 5
+    try:
+        list(schedule('burst', 0, 10, burst_interval=0))
+        assert False, "a zero burst interval should be rejected"
+    except ValueError as e:
+        assert 'burst_interval' in str(e)
+    result = CliRunner().invoke(cli, ['test', 'load', '--url', 'http://127.0.0.1:9', '--pattern', 'burst', '--burst-interval', '0'])
+    assert result.exit_code == 2 and '--burst-interval' in result.output
+
+    server, url = json_server({})
+    generator = LoadGenerator(url + '/callback', 'mixed', concurrency=4, seed=7)
+    result = generator.run(schedule('constant', 200, 0.2))
+    generator.close()
+    assert result.sent == 40 and result.errors == 0
+    assert result.status_codes == {'200': 40}
+    assert result.latency_summary()['p99'] > 0
+    for payload in server.posted:
+        if 'Body' in payload:
+            callback = payload['Body']['stkCallback']
+            assert isinstance(callback['ResultCode'], int) and callback['CheckoutRequestID']
+        else:
+            assert all(isinstance(payload[k], str) for k in ('TransID', 'TransAmount', 'BusinessShortCode'))
+
+def test_receiver_acks_records_and_injects_errors():
+    """Test the local receiver classifies, records and rejects callbacks"""
+    import asyncio
+    import io
+    import socket
+    import threading
+    from daraja_cli.utils.loadgen import LoadGenerator, schedule
+    from daraja_cli.utils.receiver import WebhookReceiver, detect_event_type
+
+    assert detect_event_type({'Body': {'stkCallback': {}}}) == 'stk_push_result'
+    assert detect_event_type({'TransID': 'X', 'TransactionType': 'Pay Bill'}) == 'c2b_confirmation'
+    assert detect_event_type('nope') == 'unknown'
+
+    record = io.StringIO()
+    receiver = WebhookReceiver(port=0, ring_size=25, record_file=record, error_rate=0.5, seed=3)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(receiver.start(), loop).result(5)
+        generator = LoadGenerator(receiver.url + '/mpesa', 'mixed', concurrency=4, seed=1)
+        result = generator.run(schedule('constant', 200, 0.2))
+        generator.close()
+        for length in ('abc', '-5'):
+            with socket.create_connection(('127.0.0.1', receiver.port), timeout=5) as sock:
+                sock.sendall(f"POST /mpesa HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+                assert sock.recv(1024).startswith(b'HTTP/1.1 400 ')
+        asyncio.run_coroutine_threadsafe(receiver.stop(), loop).result(5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    stats = receiver.stats
+    assert stats.total == result.sent == 40
+    assert set(stats.by_type) <= {'stk_push_result', 'c2b_confirmation'}
+    assert sum(stats.by_type.values()) == 40
+    assert 0 < stats.injected_errors < 40
+    assert result.status_codes.get('500') == stats.injected_errors
+    assert len(receiver.events) == 25 and len(stats.interarrival_ms) == 39
+    assert len(record.getvalue().splitlines()) == 40
+
+def test_health_probe_times_phases_and_caches(tmp_path, json_server):
+    """Test concurrent endpoint probes, phase timings and the TTL cache"""
+    import socket
+    import time
+    from daraja_cli.utils.health import HealthCache, probe_all
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        closed_url = f"http://127.0.0.1:{s.getsockname()[1]}/webhook"
+
+    server, url = json_server({}, delay=0.05)
+    cache = HealthCache(tmp_path / 'health.json', ttl=30)
+    start = time.perf_counter()
+    results = probe_all([url + '/a', url + '/b', url + '/c', closed_url], timeout=2, cache=cache)
+    assert time.perf_counter() - start < 1.0  # probed concurrently
+    up = results[url + '/a']
+    assert up.state == 'up' and up.status_code == 200
+    assert up.dns_ms is not None and up.connect_ms is not None and up.tls_ms is None
+    assert up.ttfb_ms >= 40 and up.total_ms >= up.ttfb_ms
+    assert results[closed_url].state == 'down' and results[closed_url].error
+
+    server.shutdown()
+    server.server_close()
+    cached = probe_all([url + '/a'], cache=HealthCache(tmp_path / 'health.json', ttl=30))
+    assert cached[url + '/a'].state == 'up'
+    expired = probe_all([url + '/a'], timeout=1, cache=HealthCache(tmp_path / 'health.json', ttl=0))
+    assert expired[url + '/a'].state == 'down'
+    assert [p.name for p in tmp_path.iterdir()] == ['health.json']
+
+def test_health_probe_falls_back_to_next_address(json_server, monkeypatch):
+    """Test that a refused first address does not mark the endpoint down"""
+    import socket
+    from daraja_cli.utils import health
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        closed_port = s.getsockname()[1]
+    server, url = json_server({})
+    port = server.server_address[1]
+    monkeypatch.setattr(health.socket, 'getaddrinfo', lambda *args, **kwargs: [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', closed_port)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port)),
+    ])
+    result = health.probe(url + '/a', timeout=2)
+    assert result.state == 'up' and result.status_code == 200
+
+    monkeypatch.setattr(health.socket, 'getaddrinfo', lambda *args, **kwargs: [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', closed_port)),
+    ])
+    assert health.probe(url + '/a', timeout=2).state == 'down'
+
+def test_endpoint_benchmark_separates_cold_and_warm(json_server):
+    """Test benchmark sample accounting and the log-scale histogram"""
+    from daraja_cli.utils.bench import EndpointBenchmark
+    from daraja_cli.utils.stats import log_histogram
+
+    buckets = log_histogram([0.6, 1.0, 1.4, 1.6, 3.0, 100.0])
+    assert buckets[0] == (0.5, 0.75, 1) and buckets[-1] == (96.0, 128.0, 1)
+    assert sum(count for _, _, count in buckets) == 6
+    assert all(high == nxt for (_, high, _), (nxt, _, _) in zip(buckets, buckets[1:]))
+
+    server, url = json_server({})
+    result = EndpointBenchmark(url + '/callback', 'stk', concurrency=3, seed=5).run(30, warmup=4)
+    assert len(result.cold) == 3 and len(result.warm) == 30 and result.warmup == 4
+    assert result.status_codes == {'200': 37} and result.over() == 0
+    assert len(server.posted) == 37
+    assert all('stkCallback' in payload['Body'] for payload in server.posted)
+    warm = result.warm_summary()
+    assert warm['min'] <= warm['p50'] <= warm['p90'] <= warm['p99'] <= warm['max']
+
+    down = EndpointBenchmark('http://127.0.0.1:1/', concurrency=2).run(3, warmup=1)
+    assert not down.warm and not down.cold and down.error_count == 2 + 3 + 1
+
+    # Timeouts and 5xx responses fail the verdict even though latencies look fine
+    import io
+    from contextlib import redirect_stdout
+    from daraja_cli.commands.test import _print_benchmark_report
+    server, url = json_server({'/callback': lambda handler: (503, {})})
+    slow, slow_url = json_server({}, delay=0.5)
+    failing = EndpointBenchmark(url + '/callback', concurrency=1).run(4, warmup=0)
+    stalled = EndpointBenchmark(slow_url, concurrency=1, timeout=0.1).run(1, warmup=0)
+    assert failing.server_errors == 5 and failing.failed() == 5
+    assert stalled.timeouts == 2 and stalled.over() == 2
+    for result, verdict in ((failing, '5xx response'), (stalled, 'timed out')):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            _print_benchmark_report(result)
+        assert verdict in out.getvalue() and '✅ All responses' not in out.getvalue()
+
+def test_version_starts_without_heavy_imports(monkeypatch):
+    """Test that 'daraja version' stays inside its import-time budget"""
+    import subprocess
+
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from daraja_cli.main import cli\n"
+        "cli(['version'], standalone_mode=False)\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = ['rich', 'requests', 'keyring', 'daraja_cli.commands.monitor', 'daraja_cli.utils.api']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+        "print(elapsed)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True,
+                            text=True, check=True).stdout.splitlines()
+    loaded, elapsed = output[-2], float(output[-1])
+    assert loaded == '', f"version imported {loaded}"
+    # Eager imports took ~300ms; the lazy path is ~30ms. Leave room for slow CI.
+    assert elapsed < 0.15, f"version took {elapsed * 1000:.0f}ms"
+
+    # Command modules do not pull each other in, so one command loads only its own graph
+    for module in ('queue', 'dlq'):
+        script = f"import sys\nimport daraja_cli.commands.{module}\nprint('daraja_cli.commands.monitor' in sys.modules)\n"
+        output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True,
+                                text=True, check=True).stdout.split()
+        assert output[-1] == 'False', f"commands.{module} imports commands.monitor"
+
+    # --help lists commands from the static table without importing them
+    script = ("import sys\nfrom daraja_cli.main import cli\n"
+              "try:\n    cli(['--help'])\nexcept SystemExit:\n    pass\n"
+              "print(sorted(m for m in sys.modules if m.startswith('daraja_cli.commands.')))\n")
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True,
+                            text=True, check=True).stdout.splitlines()
+    assert output[-1] == '[]', f"--help imported {output[-1]}"
+    assert 'monitor  Monitoring and logging commands.' in '\n'.join(output)
+
+    import importlib
+    from daraja_cli.main import LAZY_COMMANDS, CliState
+    for name, (target, short_help) in LAZY_COMMANDS.items():
+        module_name, attr = target.split(':')
+        command = getattr(importlib.import_module(f'daraja_cli.commands.{module_name}'), attr)
+        assert command.get_short_help_str(200) == short_help, f"stale help for '{name}'"
+
+    state = CliState(config={'user_id': 'u1'})
+    assert state.get('config') == {'user_id': 'u1'}
+    # The API client is built from the profile already loaded, not a second load_profile()
+    from daraja_cli.utils import config as cfg
+    calls = []
+    monkeypatch.setattr(cfg, 'load_profile', lambda *args, **kwargs: calls.append(1) or {'api_key': 'k', 'user_id': 'u1'})
+    state = CliState()
+    assert state.get('config')['user_id'] == 'u1'
+    assert state.get('api').user_id == 'u1' and calls == [1]
+    state['api'].close()
+
+def test_config_store_memoizes_reads_and_batches_writes(tmp_path, isolated_config, monkeypatch):
+    """Test config is parsed once per change, writes batch and keyring lookups are memoized"""
+    import json
+    import types
+    from daraja_cli.utils import config as cfg
+
+    calls = {'load': 0, 'dump': 0}
+
+    def counting_load(f):
+        calls['load'] += 1
+        return json.load(f)
+
+    def counting_dump(data, f, **kwargs):
+        calls['dump'] += 1
+        return json.dump(data, f, **kwargs)
+
+    monkeypatch.setattr(cfg, 'json', types.SimpleNamespace(load=counting_load, dump=counting_dump,
+                                                           JSONDecodeError=json.JSONDecodeError))
+    cfg.save_profile('work', {'email': 'a@b.c', 'api_key': 'k1', 'endpoints': {}})
+    cfg.save_profile('home', {'email': 'd@e.f', 'api_key': 'k2', 'endpoints': {}})
+    assert calls['dump'] == 2
+    calls['load'] = 0  # writes re-read the file under the lock
+
+    for _ in range(5):
+        assert cfg.list_profiles() == ['work', 'home']
+        assert cfg.get_current_profile_name() == 'home'
+        profile = cfg.load_profile('work')
+    assert calls['load'] == 0  # our own writes keep the cache warm
+    assert profile['api_key'] == 'k1' and cfg._keyring.lookups == 0
+
+    profile['email'] = 'changed'
+    assert cfg.load_profile('work')['email'] == 'a@b.c'  # results are copies
+
+    cfg._credentials.clear()
+    cfg.load_profile('work')
+    cfg.load_profile('work')
+    assert cfg._keyring.lookups == 1
+
+    # Another process rewrites the file: the change is picked up
+    config_file = tmp_path / '.daraja' / 'config.json'
+    data = json.loads(config_file.read_text())
+    data['current_profile'] = 'work'
+    data['profiles']['extra'] = {}
+    config_file.write_text(json.dumps(data))
+    assert cfg.get_current_profile_name() == 'work' and 'extra' in cfg.list_profiles()
+    assert calls['load'] == 1
+
+    with cfg.config_batch():
+        cfg.switch_profile('home')
+        cfg.switch_profile('extra')
+        assert cfg.get_current_profile_name() == 'extra'
+        assert calls['dump'] == 2
+    assert calls['dump'] == 3
+    assert json.loads(config_file.read_text())['current_profile'] == 'extra'
+
+def test_set_endpoint_reports_success_only_after_flush(isolated_config, monkeypatch):
+    """Test that a failed batched write is not reported as saved"""
+    from daraja_cli.commands.config import config
+    from daraja_cli.utils import config as cfg
+
+    def fail(self, mutators):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(cfg.ConfigStore, '_commit', fail)
+    result = CliRunner().invoke(config, ['set-endpoint', 'dev', 'https://example.com/hook'],
+                                obj={'config': {'api_key': 'k'}})
+    assert 'Failed to save configuration: disk full' in result.output
+    assert '✅' not in result.output
+
+def _config_stress_worker(args):
+    """Save and switch profiles repeatedly from a separate process"""
+    home, worker, rounds = args
+    from conftest import isolate_config
+    from daraja_cli.utils import config as cfg
+    isolate_config(home)
+    for i in range(rounds):
+        cfg.save_profile(f'w{worker}-{i}', {'email': f'{worker}@example.com', 'api_key': 'k', 'endpoints': {}})
+        cfg.switch_profile(f'w{worker}-0')
+        with cfg.config_batch():
+            cfg.set_config_value(f'last_{worker}', i)
+            cfg.switch_profile(f'w{worker}-{i}')
+    return worker
+
+def test_concurrent_config_writes_are_atomic(tmp_path):
+    """Test many processes saving and switching profiles lose no writes"""
+    import json
+    import multiprocessing
+
+    workers, rounds = 8, 15
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with multiprocessing.get_context(method).Pool(workers) as pool:
+        done = pool.map(_config_stress_worker, [(str(tmp_path), w, rounds) for w in range(workers)])
+    assert sorted(done) == list(range(workers))
+
+    config_dir = tmp_path / '.daraja'
+    data = json.loads((config_dir / 'config.json').read_text())
+    expected = {f'w{w}-{i}' for w in range(workers) for i in range(rounds)}
+    assert set(data['profiles']) == expected
+    assert data['current_profile'] in expected
+    assert all(data[f'last_{w}'] == rounds - 1 for w in range(workers))
+    assert not list(config_dir.glob('.config-*.tmp'))
+
+def test_corpus_dispatch_streams_and_summarizes(tmp_path, json_server):
+    """Test sending a directory corpus of payloads as test webhooks"""
+    import json
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.corpus import CorpusReader, is_corpus
+
+    corpus = tmp_path / 'corpus'
+    (corpus / 'nested').mkdir(parents=True)
+    (corpus / 'one.json').write_text(json.dumps({'TransID': 'A1', 'TransactionType': 'Pay Bill'}))
+    (corpus / 'nested' / 'many.jsonl').write_text(
+        json.dumps({'Body': {'stkCallback': {'ResultCode': 0}}}) + '\n'
+        + '{not json\n\n'
+        + json.dumps({'event_type': 'c2b_confirmation', 'payload': {'TransID': 'B2'}}) + '\n'
+    )
+    (corpus / 'notes.txt').write_text('ignored')
+    assert is_corpus(corpus) and not is_corpus(corpus / 'one.json')
+
+    reader = CorpusReader(corpus)
+    assert [e.id for e in reader] == ['nested/many.jsonl:1', 'nested/many.jsonl:4', 'one.json']
+    assert reader.invalid[0][0] == 'nested/many.jsonl:2' and reader.count() == 5
+
+    routes = {'/user/u1/webhook/test': {'webhook_id': 'w1', 'status': 'delivered',
+                                        'response_code': 200, 'response_time_ms': 12}}
+    server, url = json_server(routes)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url})
+    config = {'user_id': 'u1', 'endpoints': {'dev': 'http://localhost:3000'}}
+    results = tmp_path / 'results.jsonl'
+    result = CliRunner().invoke(
+        monitor, ['test', '-e', 'dev', '-p', str(corpus), '-c', '2', '--results', str(results)],
+        obj={'config': config, 'api': api})
+    api.close()
+    assert result.exit_code == 0, result.output
+    assert 'delivered' in result.output and 'Skipped 1 unparseable' in result.output
+    sent = sorted(json.dumps(p['payload'], sort_keys=True) for p in server.posted)
+    assert len(sent) == 3 and all(p['environment'] == 'dev' for p in server.posted)
+    assert json.dumps({'TransID': 'B2'}) in sent  # listen records are unwrapped
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert sorted(l['id'] for l in lines) == ['nested/many.jsonl:1', 'nested/many.jsonl:4', 'one.json']
+    assert all(l['ok'] and l['status'] == 'delivered' for l in lines)
+
+def test_payload_validation_matches_service_rules(tmp_path):
+    """Test offline validation of callback payloads, inline and on a pool"""
+    import json
+    from daraja_cli.commands.test import test
+    from daraja_cli.utils.corpus import CorpusReader
+    from daraja_cli.utils.validation import validate_payload, validate_records
+
+    stk = {'Body': {'stkCallback': {'MerchantRequestID': 'm', 'CheckoutRequestID': 'c',
+                                    'ResultCode': 0, 'ResultDesc': 'ok'}}}
+    c2b = {'TransactionType': 'Pay Bill', 'TransID': 'T1', 'TransTime': '20240101120000',
+           'TransAmount': '10.00', 'BusinessShortCode': '600000'}
+    timeout = {'Result': {'ResultCode': 1, 'ResultDesc': 'timeout',
+                          'OriginatorConversationID': 'o', 'ConversationID': 'c'}}
+    assert validate_payload(stk) == ('stk_push_result', [])
+    assert validate_payload(c2b) == ('c2b_confirmation', [])
+    # The service only detects STK and C2B; the timeout schema must be asked for
+    assert validate_payload(timeout) == ('timeout', ['payload: timeout results are not accepted by the webhook service'])
+    assert validate_payload(timeout, expected='timeout') == ('timeout', [])
+    # typeof true is not 'number', so the service rejects boolean result codes
+    bad_code = json.loads(json.dumps(stk))
+    bad_code['Body']['stkCallback']['ResultCode'] = True
+    assert validate_payload(bad_code)[1] == ['Body.stkCallback.ResultCode: expected number']
+    assert validate_payload(c2b, expected='stk_push_result')[1][0] == 'Body.stkCallback.MerchantRequestID: missing'
+    assert validate_payload({'hello': 1})[0] is None
+
+    source = tmp_path / 'callbacks.jsonl'
+    partial = dict(c2b)
+    del partial['TransAmount']
+    lines = [stk, c2b, timeout, bad_code, partial,
+             {'event_type': 'stk_push_result', 'payload': stk}] * 50
+    source.write_text('\n'.join(json.dumps(line) for line in lines) + '\n{broken\n')
+
+    inline = validate_records(CorpusReader(source).iter_raw(), workers=1, chunk_size=7)
+    pooled = validate_records(CorpusReader(source).iter_raw(), workers=2, chunk_size=7)
+    for report in (inline, pooled):
+        assert (report.total, report.valid, report.parse_errors) == (301, 150, 1)
+        assert report.by_type == {'stk_push_result': 100, 'c2b_confirmation': 50}
+        assert report.field_errors == {'Body.stkCallback.ResultCode: expected number': 50,
+                                       'TransAmount: missing': 50, '<json>: unparseable': 1,
+                                       'payload: timeout results are not accepted by the webhook service': 50}
+    assert inline.samples[:2] == pooled.samples[:2]
+    assert inline.samples[0][0] == 'callbacks.jsonl:3'
+
+    result = CliRunner().invoke(test, ['payload', str(source), '-w', '1', '--show', '2'])
+    assert result.exit_code == 1, result.output
+    assert 'Invalid: 151' in result.output and 'TransAmount' in result.output
+    assert 'callbacks.jsonl:4' in result.output and 'callbacks.jsonl:5' not in result.output
+    clean = tmp_path / 'clean.jsonl'
+    clean.write_text(json.dumps(stk) + '\n' + json.dumps(c2b) + '\n')
+    result = CliRunner().invoke(test, ['payload', str(clean), '-w', '1'])
+    assert result.exit_code == 0 and 'Invalid: 0' in result.output, result.output
+
+def test_local_metrics_aggregate_cache_and_exports(tmp_path):
+    """Test local metrics rollups, sketch percentiles and the --input command"""
+    import json
+    import random
+    import time
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.cache import LogCache
+    from daraja_cli.utils.metrics import LogColumns, aggregate
+
+    rng = random.Random(7)
+    now = time.time()
+    logs = []
+    for i in range(3000):
+        logs.append({
+            'webhook_id': f'w{i}',
+            'timestamp': now - rng.random() * 3 * 86400,
+            'environment': rng.choice(['dev', 'prod']),
+            'status': rng.choice(['delivered', 'delivered', 'delivered', 'failed', 'pending']),
+            'response_code': rng.choice([200, 500, None]),
+            'duration_ms': rng.choice([None, 0] + [int(rng.lognormvariate(5, 1)) for _ in range(8)]),
+        })
+
+    with LogCache('p1', path=tmp_path / 'logs.db') as cache:
+        cache.add(logs)
+        columns = LogColumns.from_cache(cache)
+    assert len(columns) == 3000
+
+    by_env = aggregate(columns, ['environment'], use_numpy=False)
+    for env in ('dev', 'prod'):
+        rows = [log for log in logs if log['environment'] == env]
+        rollup = by_env.groups[(env,)]
+        assert rollup.count == len(rows)
+        assert rollup.delivered == sum(1 for log in rows if log['status'] == 'delivered')
+        assert rollup.failed == sum(1 for log in rows if log['status'] == 'failed')
+        durations = sorted(log['duration_ms'] for log in rows if log['duration_ms'] is not None)
+        summary = rollup.latency.summary(percentiles=(50, 99))
+        assert summary['count'] == len(durations) and summary['max'] == durations[-1]
+        for p in (50, 99):
+            # Within the sketch's 1% relative accuracy of the sample at that rank
+            exact = durations[int(p / 100 * (len(durations) - 1))]
+            assert abs(summary[f'p{p:g}'] - exact) <= exact * 0.01 + 1e-9, (p, summary, exact)
+    assert by_env.total.count == 3000
+
+    # Arbitrary windows and filters; hour and day rollups agree on totals
+    since = now - 86400
+    window = aggregate(columns, ['day', 'status'], since=since, environment='prod', use_numpy=False)
+    assert window.rows == sum(1 for log in logs if log['timestamp'] >= since and log['environment'] == 'prod')
+    hourly = aggregate(columns, ['hour'], since=since, environment='prod', use_numpy=False)
+    assert hourly.total.count == window.total.count and len(hourly.groups) >= len(window.groups) // 3
+    assert aggregate(columns, ['code'], environment='staging').rows == 0
+
+    # An export is counted whole unless --days is given explicitly
+    export = tmp_path / 'export.jsonl'
+    old = dict(logs[0], webhook_id='old', timestamp=now - 30 * 86400)
+    export.write_text('\n'.join(json.dumps(log) for log in logs + [old]) + '\n')
+    result = CliRunner().invoke(monitor, ['metrics', '--input', str(export), '--by', 'environment,code'], obj={})
+    assert result.exit_code == 0, result.output
+    assert 'Local Metrics' in result.output and '3,001 of 3,001' in result.output
+    assert 'prod' in result.output and '500' in result.output
+    result = CliRunner().invoke(monitor, ['metrics', '--input', str(export), '--days', '7'], obj={})
+    assert '3,000 of 3,001' in result.output, result.output
+    result = CliRunner().invoke(monitor, ['metrics', '--local', '--by', 'week'], obj={})
+    assert result.exit_code != 0 and 'Unknown key' in result.output
+
+def test_numpy_rollups_match_pure_python():
+    """Test the vectorized group-by against pure Python, when numpy is installed"""
+    import math
+    import random
+    import time
+    from daraja_cli.utils.metrics import GROUP_KEYS, LogColumns, aggregate, np
+
+    if np is None:
+        pytest.skip("numpy is not installed")
+    rng = random.Random(11)
+    now = time.time()
+    columns = LogColumns()
+    columns.extend_rows([
+        (now - rng.random() * 5 * 86400, rng.choice(['dev', 'staging', 'prod', None]),
+         rng.choice(['delivered', 'failed', 'pending', '']), rng.choice([200, 404, 500, 502, None]),
+         rng.choice([None, 0, 0.4, rng.lognormvariate(5, 1.5)]))
+        for _ in range(20000)
+    ])
+    cases = [(list(GROUP_KEYS), {}), (['day', 'status'], {'since': now - 2 * 86400}),
+             (['hour'], {'since': now - 86400, 'until': now - 3600, 'environment': 'prod'}),
+             (['code'], {'status': 'failed'}), (['environment'], {'environment': 'missing'})]
+    for group_by, filters in cases:
+        vectorized = aggregate(columns, group_by, use_numpy=True, **filters)
+        pure = aggregate(columns, group_by, use_numpy=False, **filters)
+        assert (vectorized.engine, pure.engine) == ('numpy', 'python')
+        assert vectorized.rows == pure.rows and vectorized.groups.keys() == pure.groups.keys(), group_by
+        for key, expected in list(pure.groups.items()) + [(('total',), pure.total)]:
+            got = vectorized.total if key == ('total',) else vectorized.groups[key]
+            assert (got.count, got.delivered, got.failed) == (expected.count, expected.delivered, expected.failed)
+            assert got.latency.buckets == expected.latency.buckets, (group_by, key)
+            summary, reference = got.latency.summary(), expected.latency.summary()
+            # Sums are added in a different order, so means may differ in the last bit
+            assert all(math.isclose(summary[k], reference[k], rel_tol=1e-9) for k in reference), key
+
+def test_top_dashboard_rolls_window_and_renders(json_server):
+    """Test monitor top's rolling window, incremental polling and one-shot view"""
+    import time
+    from datetime import datetime
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.dashboard import DashboardState, RollingWindow
+
+    window = RollingWindow(window=60, bucket=10)
+    base = 1_000_000.0
+    for offset, status, duration in ((0, 'delivered', 100), (25, 'failed', 300),
+                                     (5, 'delivered', 200), (61, 'delivered', 50)):
+        window.add(base + offset, status, duration)
+    window.add(base - 100, 'delivered', 1)  # older than the window: ignored
+    snapshot = window.snapshot(base + 61)
+    assert (snapshot.count, snapshot.delivered, snapshot.failed) == (4, 3, 1)
+    assert [start for start, _ in window.buckets] == [base, base + 20, base + 60]
+    assert window.snapshot(base + 75).count == 2  # first bucket aged out
+    assert window.snapshot(base + 200).count == 0
+
+    now = time.time()
+    logs = [{'webhook_id': f'w{i}', 'seq': i, 'environment': 'prod' if i % 3 else 'dev',
+             'status': 'failed' if i % 10 == 0 else 'delivered', 'response_code': 200,
+             'duration_ms': 100 + i, 'timestamp': datetime.fromtimestamp(now - 100 + i).isoformat()}
+            for i in range(1, 61)]
+    routes = {
+        '/user/u1/webhook/logs': {'logs': logs, 'has_more': False},
+        '/api/metrics/queue/stats': {'success': True, 'data': {
+            'counts': {'waiting': 7, 'active': 2, 'delayed': 1, 'failed': 4},
+            'isPaused': True, 'processingRate': 42, 'failureRate': 1, 'averageJobDuration': 310}},
+    }
+    server, url = json_server(routes)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url})
+    assert api.get_queue_stats()['counts']['waiting'] == 7
+
+    state = DashboardState(window=300)
+    pager = api.iter_webhook_logs(since='2000-01-01T00:00:00')
+    assert state.ingest(pager.drain()) == 60
+    version = state.version
+    assert state.ingest(pager.drain()) == 0 and state.version == version  # nothing new
+    rows = state.rows(time.time())
+    assert rows['prod'].count == 40 and rows['dev'].count == 20
+    assert rows['dev'].failed + rows['prod'].failed == 6
+
+    result = CliRunner().invoke(monitor, ['top', '--once'], obj={'config': {}, 'api': api})
+    api.close()
+    assert result.exit_code == 0, result.output
+    assert 'PAUSED' in result.output and '7 waiting' in result.output
+    assert 'prod' in result.output and '40' in result.output
+
+def test_dlq_commands_page_filter_and_batch_retry(json_server):
+    """Test dlq list filtering and bulk retries batched at the server limit"""
+    from datetime import datetime, timedelta
+    from daraja_cli.commands.dlq import dlq
+    from daraja_cli.utils.api import DLQ_BULK_LIMIT, DarajaAPI
+    from daraja_cli.utils.dlq import batched
+
+    assert [len(b) for b in batched(map(str, range(250)), 500)] == [100, 100, 50]
+
+    now = datetime.now()
+    jobs = [{'id': f'j{i}', 'addedAt': (now - timedelta(days=i % 5)).isoformat(),
+             'data': {'originalJob': {'attempts': 3, 'failedReason': 'connect ECONNREFUSED' if i % 2 else 'timeout'},
+                      'metadata': {'eventType': 'payment.completed' if i % 3 else 'payment.failed',
+                                   'lastErrorCategory': 'NETWORK_ERROR', 'userId': 'u1'}}}
+            for i in range(250)]
+    pages = []
+
+    def jobs_page(handler):
+        from urllib.parse import parse_qs, urlparse
+        query = parse_qs(urlparse(handler.path).query)
+        limit, offset = int(query['limit'][0]), int(query['offset'][0])
+        pages.append(offset)
+        return {'success': True, 'data': {'jobs': jobs[offset:offset + limit],
+                                          'pagination': {'limit': limit, 'offset': offset,
+                                                         'hasMore': offset + limit < len(jobs)}}}
+
+    def bulk_retry(handler):
+        ids = handler.posted['jobIds']
+        if 'j199' in ids:
+            return 503, {'success': False, 'error': 'upstream timeout'}
+        return {'success': True, 'data': {'successful': [i for i in ids if i != 'j1'],
+                                          'failed': [{'id': 'j1', 'error': 'Job not found in DLQ'}] if 'j1' in ids else []}}
+
+    routes = {
+        '/api/dlq/jobs': jobs_page,
+        '/api/dlq/retry/bulk': bulk_retry,
+        '/api/dlq/stats': {'success': True, 'data': {'totalJobs': 250, 'jobsByErrorCategory': {'NETWORK_ERROR': 250},
+                                                     'jobsByUser': {'u1': 250}, 'oldestJob': None}},
+        '/api/dlq/jobs/old': {'success': True, 'data': {'clearedCount': 42, 'olderThanDays': 3}},
+    }
+    server, url = json_server(routes)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url})
+    obj = {'config': {}, 'api': api}
+    runner = CliRunner()
+
+    # The limit is reached on the first page, so no more pages are fetched
+    result = runner.invoke(dlq, ['list', '--ids-only', '--event-type', 'payment.failed', '-n', '5', '--page-size', '50'], obj=obj)
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ['j0', 'j3', 'j6', 'j9', 'j12']
+    assert pages == [0]
+
+    # --ids-only lists every match unless -n is given
+    result = runner.invoke(dlq, ['list', '--ids-only', '--category', 'NETWORK_ERROR'], obj=obj)
+    assert len(result.output.split()) == 250
+    result = runner.invoke(dlq, ['retry', '--ids-file', '-'], obj=obj, input='j1\nj2\n')
+    assert 'needs --yes' in result.output and len(server.posted) == 0
+
+    result = runner.invoke(dlq, ['retry', '--all', '--grep', 'econnrefused', '--older-than', '36h', '--dry-run'], obj=obj)
+    expected = [i for i in range(250) if i % 2 and i % 5 >= 2]
+    assert f"Would retry {len(expected)} jobs in 1 bulk requests" in result.output, result.output
+
+    result = runner.invoke(dlq, ['retry', '--all', '-y', '-c', '2'], obj=obj)
+    assert result.exit_code == 0, result.output
+    batches = [body['jobIds'] for body in server.posted]
+    assert all(len(batch) <= DLQ_BULK_LIMIT for batch in batches) and len(batches) == 3
+    assert sorted(sum(batches, []), key=lambda i: int(i[1:])) == [j['id'] for j in jobs]
+    # The batch that timed out is not re-sent: its jobs may already have left the DLQ
+    assert 'Succeeded:' in result.output and '149' in result.output and 'Job not found in DLQ' in result.output
+    assert 'upstream timeout' in result.output or 'Server error' in result.output
+
+    result = runner.invoke(dlq, ['retry', 'j1', 'j2', '-c', '1'], obj=obj, input='y\n')
+    assert server.posted[-1] == {'jobIds': ['j1', 'j2']}
+
+    result = runner.invoke(dlq, ['purge', '--days', '3', '-y'], obj=obj)
+    assert 'Deleted 42 DLQ jobs' in result.output and server.deleted == ['/api/dlq/jobs/old?days=3']
+    assert 'NETWORK_ERROR' in runner.invoke(dlq, ['stats'], obj=obj).output
+    api.close()
+
+def test_queue_commands_fetch_concurrently_and_chart(json_server):
+    """Test queue status fetching sections in parallel and sparkline charts"""
+    import time
+    from datetime import datetime, timedelta
+    from daraja_cli.commands.queue import queue
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.charts import BLOCKS, resample, sparkline
+
+    assert sparkline([0, 1, 2, 3, 4, 5, 6, 7]) == BLOCKS
+    assert sparkline([5, 5, 5]) == BLOCKS[4] * 3 and sparkline([]) == ''
+    assert resample(list(range(100)), 10) == [9, 19, 29, 39, 49, 59, 69, 79, 89, 99]  # peaks survive
+    assert len(sparkline(list(range(1000)), width=40)) == 40
+
+    start = datetime.now() - timedelta(minutes=30)
+    history = [{'timestamp': (start + timedelta(minutes=i)).isoformat(),
+                'data': {'queue': {'name': 'webhook-delivery', 'isPaused': False,
+                                   'counts': {'waiting': i * 10, 'active': 2, 'delayed': 0, 'failed': 1}},
+                         'performance': {'throughput': {'processedPerMinute': 60 - i, 'failedPerMinute': 1},
+                                         'averageProcessingTime': 250}}}
+               for i in range(30)]
+    limits = []
+
+    def history_route(handler):
+        from urllib.parse import parse_qs, urlparse
+        query = parse_qs(urlparse(handler.path).query)
+        limits.append((query['limit'][0], query['type'][0]))
+        return {'success': True, 'data': {'type': 'queue_metrics', 'history': history, 'count': len(history)}}
+
+    routes = {
+        '/api/metrics/queue/stats': {'success': True, 'data': {
+            'counts': {'waiting': 290, 'active': 2, 'completed': 10, 'failed': 1, 'delayed': 0}, 'isPaused': True,
+            'processingRate': 31, 'failureRate': 1, 'averageJobDuration': 250,
+            'recentFailures': [{'jobId': 'job-9', 'error': 'ECONNRESET', 'attempts': 3}]}},
+        '/api/metrics/workers': {'success': True, 'data': {
+            'workers': [{'workerId': 'worker-1', 'status': 'active', 'processedJobs': 12, 'failedJobs': 1,
+                         'currentJob': {'id': 'job-42', 'name': 'deliver', 'progress': 50,
+                                        'startedAt': datetime.now().isoformat()},
+                         'lastActivity': datetime.now().isoformat()}],
+            'summary': {'total': 1, 'active': 1, 'idle': 0, 'stalled': 0}}},
+        '/api/metrics/history': history_route,
+        '/api/metrics/queue/pause': {'success': True, 'message': 'Queue paused successfully'},
+        '/api/metrics/queue/resume': {'success': True, 'message': 'Queue resumed successfully'},
+    }
+    server, url = json_server(routes, delay=0.3)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'u1', 'api_url': url})
+    obj = {'config': {}, 'api': api}
+    runner = CliRunner()
+
+    began = time.perf_counter()
+    result = runner.invoke(queue, ['status', '-n', '30', '--width', '20'], obj=obj)
+    elapsed = time.perf_counter() - began
+    assert result.exit_code == 0, result.output
+    assert elapsed < 0.8, f"sections were fetched one after another ({elapsed:.2f}s)"
+    assert limits == [('30', 'queue_metrics')]
+    assert 'PAUSED' in result.output and 'ECONNRESET' in result.output
+    assert 'job-42' in result.output and '50%' in result.output
+    waiting = next(line for line in result.output.splitlines() if 'Waiting' in line)
+    assert BLOCKS[0] in waiting and BLOCKS[-1] in waiting and '290' in waiting
+    assert '30 samples over 29.0 min' in result.output
+
+    result = runner.invoke(queue, ['pause'], obj=obj, input='y\n')
+    assert 'Queue paused' in result.output and '290 waiting' in result.output
+    result = runner.invoke(queue, ['resume'], obj=obj)
+    assert 'Queue resumed' in result.output and len(server.posted) == 2
+
+    # The pause worked even if the follow-up counts cannot be fetched
+    routes['/api/metrics/queue/stats'] = lambda handler: (500, {})
+    result = runner.invoke(queue, ['pause', '-y'], obj=obj)
+    assert 'Queue paused' in result.output and 'Could not fetch queue counts' in result.output
+    assert 'Failed to pause' not in result.output
+
+    # A JSON reply where an event stream was expected means no real-time endpoint
+    result = runner.invoke(queue, ['watch'], obj=obj)
+    assert 'not available' in result.output, result.output
+    api.close()
+
+def test_mock_server_serves_client_offline(mock_server):
+    """Test the bundled mock API: lazy dataset, paging, writes and fault injection"""
+    import time
+    from datetime import datetime, timedelta
+    from daraja_cli.utils.api import DarajaAPI, APIError
+    from daraja_cli.utils.mockserver import MockDataset
+
+    dataset = MockDataset(records=2_000_000, days=30, seed=42)
+    assert MockDataset(records=2_000_000, seed=42, now=dataset.created).record(123_456) == dataset.record(123_456)
+    assert dataset.record(4)['environment'] == 'staging' and dataset.record(4, 'staging')['seq'] == 2
+
+    server = mock_server(dataset)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'mock-user', 'api_url': server.url})
+    assert api.get_user_info()['id'] == 'mock-user'
+
+    newest = api.get_webhook_logs(5, 'prod')
+    assert [log['seq'] for log in newest] == list(range(newest[0]['seq'], newest[0]['seq'] - 5, -1))
+    assert {log['environment'] for log in newest} == {'prod'}
+
+    # --since without the cache shows the newest logs in the window, not the oldest
+    from daraja_cli.commands.monitor import _fetch_logs
+    from daraja_cli.utils.times import resolve_since
+    window = resolve_since('3h')
+    assert window.endswith('+00:00')
+    assert resolve_since('2024-01-01T00:00:00Z') == '2024-01-01T00:00:00+00:00'
+    records = _fetch_logs({}, api, 5, 'prod', window, use_cache=False)
+    assert [record.webhook_id for record in records] == [log['webhook_id'] for log in newest]
+
+    # Forward paging over the last three hours of one environment: no gaps or repeats
+    since = (datetime.now() - timedelta(hours=3)).isoformat()
+    pager = api.iter_webhook_logs(environment='dev', since=since, page_size=1000)
+    logs = list(pager)
+    expected = sum(1 for i in range(dataset.first_at(datetime.fromisoformat(since).timestamp()), dataset.total)
+                   if i % 3 == 0)
+    assert len(logs) == expected and pager.pages > 1 and pager.gaps == []
+    assert len({log['webhook_id'] for log in logs}) == len(logs)
+    assert [log['timestamp'] for log in logs] == sorted(log['timestamp'] for log in logs)
+
+    # Writes land after the synthetic records and show up in the next poll
+    sent = api.send_test_webhook('dev', {'Body': {}})
+    replayed = api.replay_webhook(sent['webhook_id'])
+    assert [log['webhook_id'] for log in pager.drain()] == [sent['webhook_id'], replayed['webhook_id']]
+    assert pager.gaps == []
+    try:
+        api.replay_webhook('missing')
+        assert False, "unknown webhook should 404"
+    except APIError as e:
+        assert e.status_code == 404
+
+    status = api.get_webhook_status()
+    assert status['total_webhooks'] == 2_000_002 and set(status['environments']) == {'dev', 'staging', 'prod'}
+    assert 90 < status['success_rate'] < 97
+    metrics = api.get_metrics(7)
+    assert abs(metrics['total_webhooks'] - 2_000_000 * 7 / 30) < 1000 and len(metrics['daily_stats']) >= 7
+    for days in ('abc', '0', '-3'):
+        response = api.session.get(f"{server.url}/user/mock-user/metrics?days={days}",
+                                   headers={'Authorization': 'Bearer k'})
+        assert response.status_code == 400 and 'days must be' in response.json()['message']
+    api.update_endpoint('qa', 'http://127.0.0.1:9/hook')
+    assert {'name': 'qa', 'url': 'http://127.0.0.1:9/hook'} in api.get_environments()
+    api.close()
+
+    faulty = mock_server(MockDataset(records=100), latency_ms=50, error_rate=1.0, seed=1)
+    api = DarajaAPI({'api_key': 'k', 'user_id': 'mock-user', 'api_url': faulty.url})
+    began = time.perf_counter()
+    try:
+        api.get_webhook_logs(10)
+        assert False, "injected error should raise"
+    except APIError as e:
+        assert e.status_code == 500
+    assert time.perf_counter() - began >= 0.05 and faulty.injected_errors == 1
+    api.close()
+
+def test_trace_flag_records_phases_and_restores_patches(tmp_path, isolated_config, mock_server):
+    """Test --trace/--trace-file/--cprofile time each phase and leave nothing patched"""
+    import json
+    from click.testing import CliRunner
+    from rich.console import Console
+    from daraja_cli.main import cli
+    from daraja_cli.utils import api as api_module, config as cfg, trace
+
+    server = mock_server()
+    originals = (cfg.load_profile, cfg.get_credential, api_module.DarajaAPI._make_request, Console.print)
+    cfg.save_profile('default', {'api_key': 'k', 'user_id': 'mock-user', 'api_url': server.url})
+    cfg._credentials.clear()
+    cfg._store.invalidate()
+    result = CliRunner().invoke(cli, [
+        '--trace', '--trace-file', str(tmp_path / 'trace.json'), '--cprofile', str(tmp_path / 'run.prof'),
+        'monitor', 'logs', '-n', '20', '--no-cache',
+    ])
+    assert result.exit_code == 0, result.output
+    assert 'daraja monitor' in result.output and 'network' in result.output
+
+    events = json.load(open(tmp_path / 'trace.json'))['traceEvents']
+    spans = {(e['cat'], e['name']) for e in events if e['ph'] == 'X'}
+    assert ('network', 'GET /user/mock-user/webhook/logs') in spans
+    assert ('config', 'load_profile()') in spans and ('keyring', 'get_credential(default)') in spans
+    assert ('render', 'Console.print') in spans
+    assert (tmp_path / 'run.prof').stat().st_size > 0
+
+    # Nothing stays wrapped once the command ends, and no tracer is left running
+    assert (cfg.load_profile, cfg.get_credential, api_module.DarajaAPI._make_request, Console.print) == originals
+    assert trace.active() is None and not any(isinstance(f, trace._ImportFinder) for f in sys.meta_path)
+    result = CliRunner().invoke(cli, ['version'])
+    assert result.exit_code == 0 and '⏱' not in result.output
+    # --profile names a config profile (auth --profile), never a stats file
+    result = CliRunner().invoke(cli, ['--profile', 'prod', 'version'])
+    assert result.exit_code != 0 and 'No such option' in result.output
+
+    tracer = trace.Tracer('daraja')
+    with tracer.span('outer', 'config'):
+        with tracer.span('inner', 'network'):
+            pass
+    tracer.finish()
+    phases = tracer.categories()
+    assert abs(sum(phases.values()) - tracer.root.duration) < 1e-6
+    assert [path for path, _, _ in tracer.flame()] == [('daraja',), ('daraja', 'outer'), ('daraja', 'outer', 'inner')]
+
+def test_response_cache_revalidates_and_evicts(tmp_path, isolated_config, json_server, mock_server):
+    """Test the read response cache: fresh hits, 304 revalidation, write invalidation and LRU"""
+    import time
+    from daraja_cli.utils.api import DarajaAPI
+    from daraja_cli.utils.httpcache import ResponseCache, freshness
+
+    assert freshness('private, max-age=5', 60) == 5 and freshness('max-age=600', 60) == 60
+    assert freshness('no-cache', 60) == 0 and freshness('no-store', 60) is None and freshness(None, 30) == 30
+
+    server = mock_server()
+    base = {'api_key': 'k', 'user_id': 'mock-user', 'api_url': server.url, 'profile': 'a'}
+    with DarajaAPI(base) as api:
+        environments = api.get_environments()
+        requests_made = server.requests
+        assert api.get_environments() == environments and server.requests == requests_made
+        assert api.response_cache.hits == 1
+
+    # A new process (client) reuses the persisted entry; TTL 0 forces a conditional GET
+    with DarajaAPI({**base, 'response_cache_ttl': {'environments': 0}}) as api:
+        assert api.get_environments() == environments
+        assert server.not_modified == 1 and api.response_cache.revalidated == 1
+
+        # Writes invalidate the profile's entries, so the change is seen at once
+        api.update_endpoint('qa', 'http://127.0.0.1:9/hook')
+        assert {'name': 'qa', 'url': 'http://127.0.0.1:9/hook'} in api.get_environments()
+        assert server.not_modified == 1
+
+    # Entries are scoped per profile and per API key
+    with DarajaAPI({**base, 'profile': 'b'}) as api:
+        requests_made = server.requests
+        api.get_environments()
+        assert server.requests == requests_made + 1
+    with DarajaAPI({**base, 'response_cache': False}) as api:
+        assert api.response_cache is None
+        requests_made = server.requests
+        api.get_environments()
+        assert server.requests == requests_made + 1
+
+    assert oct((tmp_path / '.daraja' / 'responses.db').stat().st_mode & 0o777) == '0o600'
+
+    # Writes that cannot change cached reads never open the cache
+    server, url = json_server({'/api/metrics/queue/pause': {'success': True}})
+    with DarajaAPI({**base, 'api_url': url}) as api:
+        api.pause_queue()
+        assert api._response_cache is None
+
+    cache = ResponseCache('p', 'k', path=tmp_path / 'lru.db', max_bytes=130)
+    for n in range(3):
+        cache.store(f'http://x/{n}', '"' + 'x' * 38 + '"', {'ETag': f'"{n}"'})
+        time.sleep(0.01)
+    assert cache.get('http://x/0', 60).etag == '"0"'
+    cache.store('http://x/3', '"' + 'x' * 38 + '"', {})
+    assert cache.get('http://x/1', 60) is None and cache.get('http://x/0', 60) is not None
+    assert cache.usage() == {'entries': 3, 'bytes': 120}
+    cache.close()
+
+def test_delivery_log_records_parse_once_and_stay_compact(isolated_config):
+    """Test compact log records: timestamp parsing, interning, memory and the log views"""
+    import json
+    import tracemalloc
+    from datetime import datetime, timedelta
+    from daraja_cli.commands.monitor import monitor
+    from daraja_cli.utils.cache import LogCache
+    from daraja_cli.utils.times import parse_timestamp
+    from daraja_cli.utils.records import DeliveryLog, parse_epoch_ms
+
+    for value in ['2025-03-01T10:00:00', '2025-03-01T10:00:00.123456', '2025-03-01 10:00:00Z',
+                  '2025-03-01T10:00:00+03:00', '2025-03-01T10:00:00.9999', '2025-03-01',
+                  'garbage', '', None, 1740823200.5]:
+        assert parse_epoch_ms(value) == round(parse_timestamp(value) * 1000), value
+
+    now = datetime.now().replace(microsecond=0)
+    logs = [{'webhook_id': f'wh_{n:06d}', 'timestamp': (now - timedelta(seconds=n)).isoformat(),
+             'environment': ('dev', 'prod')[n % 2], 'status': ('delivered', 'failed')[n % 3 == 0],
+             'response_code': 500 if n % 3 == 0 else 200, 'duration_ms': n % 400,
+             'payload': {'amount': n, 'phone': '254700000000'}} for n in range(2000)]
+    # Decoded separately, as API responses are, so labels are not already shared
+    decoded = [json.loads(json.dumps(log)) for log in logs]
+
+    tracemalloc.start()
+    as_dicts = [json.loads(json.dumps(log)) for log in logs]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    records = DeliveryLog.from_dicts(decoded)
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert record_bytes * 3 < dict_bytes, (record_bytes, dict_bytes)
+    del as_dicts
+
+    assert records[0].environment is records[2].environment
+    assert records[1].status is records[2].status
+    assert sorted(records, key=lambda r: r.ts_ms)[0].webhook_id == 'wh_001999'
+    assert records[5].ts == parse_timestamp(logs[5]['timestamp'])
+    assert DeliveryLog.from_dict(records[5].to_dict()).ts_ms == records[5].ts_ms
+    blank = DeliveryLog.from_dict({'timestamp': 'not a time'})
+    assert (blank.ts_ms, blank.status, blank.environment, blank.strftime('%H:%M')) == (0, 'unknown', 'N/A', '-')
+
+    with LogCache('bench') as cache:
+        cache.add(logs)
+        fast = cache.query_records(50, environment='prod', status='failed')
+    # logs are already newest first
+    slow = [log for log in logs if log['environment'] == 'prod' and log['status'] == 'failed'][:50]
+    assert [r.webhook_id for r in fast] == [log['webhook_id'] for log in slow]
+    assert [r.ts_ms for r in fast] == [parse_epoch_ms(log['timestamp']) for log in slow]
+    assert fast[0].response_code == 500
+
+    result = CliRunner().invoke(monitor, ['logs', '-n', '5', '--offline'],
+                                obj={'config': {'profile': 'bench'}, 'api': None})
+    assert result.exit_code == 0, result.output
+    assert (now - timedelta(seconds=1)).strftime('%H:%M:%S %d/%m') in result.output
+    assert 'Showing 5' in result.output
+
 def run_all_tests():
-    """Run all tests and return success status"""
+    """Run all tests and return success status
+
+    Only the fixture-free smoke tests run here; the rest need pytest.
+    """
     print("🧪 Running CLI tests...")
     
     tests = [